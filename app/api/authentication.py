@@ -1,7 +1,7 @@
 from fastapi import HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlmodel import Session, select
-from app.services.data_service import DataService
+from app.services.data_service import get_shared_data_service
 from app.models.user import Cliente
 from app.core.database import get_session
 from typing import Optional
@@ -80,4 +80,4 @@ def get_current_active_user(current_user: Cliente = Depends(get_current_user)):
 
 # Dependência do serviço de dados
 def get_data_service():
-    return DataService(auto_load=True)
+    return get_shared_data_service()
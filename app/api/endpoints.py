@@ -1,14 +1,50 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from app.services.data_service import DataService
+from app.services.data_service import DataService, get_shared_data_service
+from app.services.snapshot import Snapshot, normalize_name
+from app.api.responses import (
+    CachedError,
+    ConditionalRoute,
+    FieldTree,
+    cached_fragment,
+    cached_list_response,
+    check_conditional,
+    cached_json_response,
+    decode_cursor,
+    encode_cursor,
+    encode_json,
+    encode_projection,
+    fragment_store,
+    items_response,
+    join_fragments,
+    join_object,
+    materialized_items,
+    ndjson_response,
+    parse_fields,
+    precompress,
+    representation_tag,
+    serialize_model,
+)
+from app.services.db_sync import query_metric, sync_state
+from app.services.export import EXPORT_FORMATS, export_snapshot
+from app.services.history_service import list_runs, unit_history
+from app.services.columnar import FILTER_OPERATORS, ColumnStore
+from app.services.numeric import parse_br_int
 from app.models.user import Cliente, UserCreate, Token
-from app.models.schemas import UnidadeData
+from app.models.schemas import LoteUnidades, UnidadeData
 from sqlmodel import Session, select
-from typing import List, Dict, Optional
+from pydantic import TypeAdapter
+from typing import List, Dict, Optional, Set, Tuple, Union
+from pathlib import Path
+import json
 import logging
+import threading
 
-from datetime import timedelta
+from bisect import bisect_right
+from datetime import timedelta, timezone
+from functools import partial
 
 from app.api.authentication import (
     authenticate_user,
@@ -23,7 +59,8 @@ from app.core.database import get_session
 router = APIRouter(
     prefix="/api/v1",
     tags=["unidades"],
-    responses={404: {"description": "Não encontrado"}}
+    responses={404: {"description": "Não encontrado"}},
+    route_class=ConditionalRoute
 )
 
 # Router de autenticação
@@ -37,11 +74,23 @@ router_auth = APIRouter(
 router_unidade = APIRouter(
     prefix="/api/v1/unidades",
     tags=["unidade específica"],
-    responses={404: {"description": "Unidade não encontrada"}}
+    responses={404: {"description": "Unidade não encontrada"}},
+    route_class=ConditionalRoute
 )
 
 logger = logging.getLogger(__name__)
 
+_validation_lock = threading.Lock()
+
+UNIDADE_ADAPTER = TypeAdapter(UnidadeData)
+UNIDADES_ADAPTER = TypeAdapter(List[UnidadeData])
+UNIDADE_FIELDS = tuple(UnidadeData.model_fields)
+FIELDS_DESCRIPTION = "Campos a retornar, separados por vírgula (ex.: acervo_total,processos_em_tramitacao.TOTAL)"
+
+# Tamanho de página padrão quando apenas o cursor é informado
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
 # Rotas de Autenticação
 @router_auth.post(
     "/token",
@@ -109,7 +158,61 @@ async def get_usuario_atual(current_user: Cliente = Depends(get_current_active_u
     return current_user
 
 def get_data_service():
-    return DataService(auto_load=True)
+    return get_shared_data_service()
+
+def get_export_dir(service: DataService = Depends(get_data_service)) -> Path:
+    return service.exports_dir
+
+def get_snapshot(service: DataService = Depends(get_data_service)) -> Snapshot:
+    return validate_snapshot(service.snapshot)
+
+def validate_snapshot(snapshot: Snapshot) -> Snapshot:
+    """
+    Valida todas as unidades contra UnidadeData uma única vez por snapshot
+
+    O corpo de cada unidade e o da lista completa ficam no cache já
+    codificados, de modo que as rotas que declaram response_model=UnidadeData
+    devolvem bytes prontos, sem validar nem serializar por requisição.
+    Unidades inválidas ficam registradas como erro 500, como antes. Corpos de
+    unidades sem alteração desde o snapshot anterior são reaproveitados.
+    """
+    if snapshot.validated:
+        return snapshot
+    with _validation_lock:
+        if snapshot.validated:
+            return snapshot
+
+        def encode(row: int):
+            unit = snapshot.units[row]
+            unit_id = unit.get("id")
+            try:
+                return encode_json(unidade_body(unit))
+            except Exception as e:
+                logger.error(f"Erro ao validar unidade {unit_id}: {str(e)}")
+                return CachedError(500, f"Erro ao processar unidade ID {unit_id}")
+
+        # Unidades inalteradas desde o snapshot anterior não são validadas de novo
+        fragments = fragment_store.refresh("unidade", snapshot.unit_digests(), encode)
+        for unit, body in zip(snapshot.units, fragments):
+            unit_id = unit.get("id")
+            # Com IDs repetidos, a rota por ID usa a primeira ocorrência
+            if snapshot.get_unit(unit_id) is unit:
+                snapshot.response_cache.setdefault(("unidade", unit_id), body)
+
+        if any(isinstance(body, CachedError) for body in fragments):
+            snapshot.response_cache.setdefault("unidades", CachedError(500, "Erro ao processar os dados das unidades"))
+        else:
+            snapshot.response_cache.setdefault("unidades", join_fragments(fragments))
+            # A lista completa é o maior corpo servido: é comprimida aqui (no
+            # threadpool, junto com a validação) e não na primeira requisição
+            precompress(snapshot, "unidades")
+            # Os mesmos corpos, um a um, para o modo NDJSON
+            snapshot.response_cache.setdefault(
+                ("itens", "unidades"),
+                [(unit.get("id"), body) for unit, body in zip(snapshot.units, fragments)],
+            )
+        snapshot.validated = True
+    return snapshot
 
 def transform_process_data(data: Dict) -> Dict:
     def safe_str(value):
@@ -180,61 +283,901 @@ def transform_controle_de_prisoes(data) -> Dict:
     # Caso seja None ou outro tipo, retorna vazio
     return {}
 
-def find_unit_by_id(data: List[Dict], unit_id: int) -> Dict:
-    unit = next((u for u in data if u.get("id") == unit_id), None)
+def conditional(section: Optional[str] = None):
+    """
+    Dependência que responde 304 Not Modified quando o cliente já tem a
+    versão atual dos dados da rota, antes de qualquer serialização
+
+    O ETag combina a versão do snapshot, o hash do conteúdo da seção (ou da
+    unidade, nas rotas com unit_id/nome) e o da representação pedida
+    (caminho e parâmetros de consulta); Last-Modified é a data de alteração
+    do snapshot.
+    """
+    def check(
+        request: Request,
+        snapshot: Snapshot = Depends(get_snapshot),
+        current_user: Cliente = Depends(get_current_active_user)
+    ):
+        if not snapshot.units:
+            return
+        # Rotas com a seção no caminho, ex.: /agregados/{secao}
+        secao = section or request.path_params.get("secao")
+        if section is None and secao is not None and secao not in snapshot.columns.rollup():
+            # Seção desconhecida: a rota responde 404, e nenhum hash é calculado
+            # (nem memorizado) para nomes arbitrários
+            return
+        unit_id = None
+        if "unit_id" in request.path_params:
+            try:
+                unit_id = int(request.path_params["unit_id"])
+            except ValueError:
+                return
+            if snapshot.get_unit(unit_id) is None:
+                return
+        elif "nome" in request.path_params:
+            unit = snapshot.get_unit_by_name(request.path_params["nome"])
+            if unit is None:
+                return
+            unit_id = unit.get("id")
+        elif secao is not None and has_metric_filters(request, snapshot):
+            # Os filtros selecionam as unidades por métricas de fora da seção
+            # (ex.: acervo_total__gt): o hash cobre as unidades inteiras
+            secao = None
+
+        etag = f'"{snapshot.version}-{snapshot.digest(secao, unit_id)}-{representation_tag(request)}"'
+        check_conditional(request, etag, snapshot.last_modified)
+
+    return check
+
+def conditional_db(
+    request: Request,
+    session: Session = Depends(get_session),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    """
+    Como conditional(), para as rotas que consultam as tabelas do banco: o
+    ETag e o Last-Modified vêm da última sincronização registrada, e não do
+    snapshot em memória
+    """
+    state = sync_state(session)
+    if state is None:
+        return
+    synced_at = state.sincronizado_em
+    if synced_at.tzinfo is None:
+        # O SQLite não guarda o fuso horário
+        synced_at = synced_at.replace(tzinfo=timezone.utc)
+    versao = state.chave or f"{synced_at.timestamp():.6f}"
+    etag = f'"db-{versao}-{representation_tag(request)}"'
+    check_conditional(request, etag, synced_at.timestamp())
+
+def parse_filter(columns: ColumnStore, name: str) -> Tuple[str, Optional[str], Optional[tuple]]:
+    """
+    Interpreta o nome de um parâmetro de filtro ("caminho__op" ou "caminho")
+
+    Returns:
+        (caminho, operador, coluna); a coluna é None se o caminho não for uma
+        métrica numérica, e o operador é None se o nome não tiver "__"
+    """
+    path, sep, operator = name.rpartition("__")
+    if not sep:
+        path, operator = name, None
+    key = columns.resolve(path)
+    if key is None or key not in columns.columns:
+        key = None
+    return path, operator, key
+
+def has_metric_filters(request: Request, snapshot: Snapshot) -> bool:
+    """Indica se a query string filtra as unidades por alguma métrica (veja filter_units)"""
+    return any(parse_filter(snapshot.columns, name)[2] is not None for name in request.query_params)
+
+def filter_units(
+    request: Request,
+    comarca: Optional[List[str]] = Query(None, description="Retorna apenas unidades das comarcas informadas"),
+    snapshot: Snapshot = Depends(get_snapshot)
+) -> Optional[Set[int]]:
+    """
+    Dependência que interpreta os filtros da query string e devolve os IDs
+    das unidades selecionadas (None quando não há filtro)
+
+    Aceita "caminho__op=valor", com op em gt, gte, lt, lte, eq e ne (ex.:
+    acervo_total__gt=5000), "caminho=valor" para igualdade e comarca=NOME.
+    Os filtros são avaliados sobre as colunas numéricas do snapshot.
+    """
+    columns = snapshot.columns
+    rows: Optional[Set[int]] = None
+    if comarca:
+        rows = set()
+        for nome in comarca:
+            rows.update(snapshot.comarca_rows.get(normalize_name(nome), ()))
+
+    for name, raw in request.query_params.multi_items():
+        path, operator, key = parse_filter(columns, name)
+        if key is None:
+            if operator is not None:
+                raise HTTPException(400, f"Filtro inválido: métrica '{path}' não encontrada")
+            continue  # outros parâmetros da rota (limit, fields...)
+        operator = operator or "eq"
+        if operator not in FILTER_OPERATORS:
+            raise HTTPException(400, f"Filtro inválido: operador '{operator}' não suportado")
+        value = parse_br_int(raw)
+        if value is None:
+            raise HTTPException(400, f"Filtro inválido: '{raw}' não é um número")
+        selected = columns.rows_where(key, operator, value)
+        rows = selected if rows is None else rows & selected
+
+    if rows is None:
+        return None
+    return {snapshot.units[row].get("id") for row in rows}
+
+def ndjson_format(
+    formato: str = Query(
+        "json",
+        pattern="^(json|ndjson)$",
+        description="ndjson: uma unidade por linha, enviada em streaming (application/x-ndjson)"
+    )
+) -> bool:
+    """Dependência que indica se a lista deve ser enviada como NDJSON"""
+    return formato == "ndjson"
+
+def unidade_body(unit: Dict) -> Dict:
+    """Corpo de uma unidade no formato UnidadeData (validado e com aliases)"""
+    return serialize_model(UNIDADE_ADAPTER, transform_unit_data(unit))
+
+def projected_unit(snapshot: Snapshot, unit: Dict, tree: FieldTree) -> bytes:
+    """
+    JSON da unidade contendo apenas os caminhos de `tree`
+
+    Cada caminho selecionado é codificado uma única vez por snapshot e
+    reaproveitado por todas as projeções que o incluam. Só os bytes ficam no
+    cache: o corpo UnidadeData decodificado serve apenas para montar os
+    caminhos ainda não codificados e é descartado ao fim da projeção.
+    """
+    unit_id = unit.get("id")
+    # Com IDs repetidos só a unidade indexada usa o cache (chaveado por ID)
+    cacheable = snapshot.get_unit(unit_id) is unit
+    document = None
+
+    def fragment(path):
+        nonlocal document
+        key = ("campo", unit_id, path)
+        if cacheable:
+            body = snapshot.response_cache.get(key)
+            if body is not None:
+                return body
+        if document is None:
+            if cacheable:
+                # Reaproveita o corpo já validado e codificado, sem validar de novo
+                document = json.loads(cached_fragment(snapshot, ("unidade", unit_id), partial(unidade_body, unit)))
+            else:
+                document = unidade_body(unit)
+        value = document
+        for segment in path:
+            if not isinstance(value, dict) or segment not in value:
+                return None
+            value = value[segment]
+        body = encode_json(value)
+        if cacheable:
+            snapshot.response_cache[key] = body
+        return body
+
+    return encode_projection(tree, fragment)
+
+def find_unit_by_id(data: Union[Snapshot, List[Dict]], unit_id: int) -> Dict:
+    if isinstance(data, Snapshot):
+        unit = data.get_unit(unit_id)
+    else:
+        unit = next((u for u in data if u.get("id") == unit_id), None)
     if not unit:
         raise HTTPException(404, f"Unidade com ID {unit_id} não encontrada")
     return unit
 
+def processos_body(unit: Dict, unit_id: int) -> Dict:
+    processos = {
+        k: transform_process_data(v)
+        for k, v in unit.get("processos_em_tramitacao", {}).items()
+    }
+    return processos
+
+def procedimentos_body(unit: Dict, unit_id: int) -> Dict:
+    procedimentos = unit.get("procedimentos_e_peticoes_em_tramitacao", None)
+    if procedimentos is None:
+        raise HTTPException(404, f"Nenhum dado de procedimentos/petições encontrado para a unidade {unit_id}")
+
+    return procedimentos
+
+def suspensos_body(unit: Dict, unit_id: int) -> Dict:
+    suspensos = unit.get("suspensos_arquivo_provisorio")
+    if suspensos is None:
+        raise HTTPException(404, f"Nenhum dado de suspensos/arquivo provisório encontrado para a unidade {unit_id}")
+
+    return suspensos
+
+def processos_conclusos_body(unit: Dict, unit_id: int) -> Dict:
+    conclusos = unit.get("processos_conclusos_por_tipo", {})
+
+    if not conclusos:
+        raise HTTPException(404, f"Dados de 'processos_conclusos_por_tipo' não encontrados para unidade ID {unit_id}")
+
+    def safe_str(value):
+        return str(value) if value is not None else ""
+
+    result = {
+        tipo: {
+            "Total": safe_str(dados.get("Total")),
+            "+60 dias": safe_str(dados.get("+60 dias")),
+            "+100 dias": safe_str(dados.get("+100 dias")),
+        }
+        for tipo, dados in conclusos.items()
+    }
+
+    return result
+
+def controle_de_prisoes_body(unit: Dict, unit_id: int) -> Dict:
+    controle = unit.get("controle_de_prisoes")
+    if controle is None:
+        raise HTTPException(404, f"Controle de prisões da unidade {unit_id} não encontrado")
+
+    controle_transformado = transform_controle_de_prisoes(controle)
+    return controle_transformado
+
+def controle_de_diligencias_body(unit: Dict, unit_id: int) -> Dict:
+    controle = unit.get("controle_de_diligencias")
+
+    if controle is None:
+        raise HTTPException(404, f"Controle de diligências não encontrado para a unidade {unit_id}")
+
+    return controle
+
+def distribuicoes_body(unit: Dict, unit_id: int) -> Dict:
+    distrib = unit.get("demonstrativo_de_distribuicoes")
+
+    if distrib is None:
+        raise HTTPException(404, f"Dados de demonstrativo de distribuições não encontrados para a unidade {unit_id}")
+
+    return distrib
+
+def processos_baixados_body(unit: Dict, unit_id: int) -> Dict:
+    processos_baixados = unit.get("processos_baixados")
+    if not processos_baixados:
+        raise HTTPException(404, f"Dados de 'processos baixados' não encontrados para a unidade {unit_id}")
+
+    return processos_baixados
+
+def atos_judiciais_body(unit: Dict, unit_id: int) -> Dict:
+    atos = unit.get("atos_judiciais_proferidos")
+
+    if atos is None:
+        raise HTTPException(404, f"A unidade {unit_id} não possui dados de atos judiciais proferidos")
+
+    return atos
+
+# Corpos das rotas /unidades/{unit_id}/<secao>, indexados pelo sufixo da rota
+# (que também é o prefixo da chave no cache de respostas)
+SECOES_UNIDADE = {
+    "unidade": lambda unit, unit_id: unidade_body(unit),
+    "processos": processos_body,
+    "procedimentos": procedimentos_body,
+    "suspensos": suspensos_body,
+    "processos_conclusos_por_tipo": processos_conclusos_body,
+    "controle_de_prisoes": controle_de_prisoes_body,
+    "controle_de_diligencias": controle_de_diligencias_body,
+    "distribuicoes": distribuicoes_body,
+    "processos_baixados": processos_baixados_body,
+    "atos_judiciais": atos_judiciais_body,
+}
+
+def processos_item(unit: Dict) -> Optional[Dict]:
+    processos = {
+        k: transform_process_data(v)
+        for k, v in unit.get("processos_em_tramitacao", {}).items()
+    }
+    return {
+        "id": unit.get("id"),
+        "unidade": unit.get("unidade"),
+        "processos_em_tramitacao": processos
+    }
+
+def procedimentos_item(unit: Dict) -> Optional[Dict]:
+    procedimentos = unit.get("procedimentos_e_peticoes_em_tramitacao")
+    if not procedimentos:  # filtra apenas os que têm dado
+        return None
+    return {
+        "id": unit.get("id"),
+        "unidade": unit.get("unidade"),
+        "procedimentos_e_peticoes_em_tramitacao": procedimentos
+    }
+
+def suspensos_item(unit: Dict) -> Optional[Dict]:
+    suspensos = unit.get("suspensos_arquivo_provisorio")
+    if not suspensos:
+        return None
+    return {
+        "id": unit.get("id"),
+        "unidade": unit.get("unidade"),
+        "suspensos_arquivo_provisorio": suspensos
+    }
+
+def processos_conclusos_item(unit: Dict) -> Optional[Dict]:
+    def safe_str(value):
+        return str(value) if value is not None else ""
+
+    conclusos = unit.get("processos_conclusos_por_tipo", {})
+    if not conclusos:
+        return None
+    dados_formatados = {
+        tipo: {
+            "Total": safe_str(d.get("Total")),
+            "+60 dias": safe_str(d.get("+60 dias")),
+            "+100 dias": safe_str(d.get("+100 dias")),
+        }
+        for tipo, d in conclusos.items()
+    }
+    return {
+        "id": unit.get("id"),
+        "unidade": unit.get("unidade"),
+        "processos_conclusos_por_tipo": dados_formatados
+    }
+
+def controle_de_prisoes_item(unit: Dict) -> Optional[Dict]:
+    controle = unit.get("controle_de_prisoes")
+    if not controle:
+        return None
+    return {
+        "id": unit.get("id"),
+        "unidade": unit.get("unidade"),
+        "controle_de_prisoes": transform_controle_de_prisoes(controle)
+    }
+
+def controle_de_diligencias_item(unit: Dict) -> Optional[Dict]:
+    controle = unit.get("controle_de_diligencias")
+    if not controle:
+        return None
+    return {
+        "id": unit.get("id"),
+        "unidade": unit.get("unidade"),
+        "controle_de_diligencias": controle
+    }
+
+def distribuicoes_item(unit: Dict) -> Optional[Dict]:
+    distrib = unit.get("demonstrativo_de_distribuicoes")
+    if not distrib:
+        return None
+    return {
+        "id": unit.get("id"),
+        "unidade": unit.get("unidade"),
+        "demonstrativo_de_distribuicoes": distrib
+    }
+
+def processos_baixados_item(unit: Dict) -> Optional[Dict]:
+    processos_baixados = unit.get("processos_baixados")
+    if not processos_baixados:
+        return None
+    return {
+        "id": unit.get("id"),
+        "unidade": unit.get("unidade"),
+        "processos_baixados": processos_baixados
+    }
+
+def atos_judiciais_item(unit: Dict) -> Optional[Dict]:
+    atos = unit.get("atos_judiciais_proferidos")
+    if not atos:
+        return None
+    return {
+        "id": unit.get("id"),
+        "unidade": unit.get("unidade"),
+        "atos_judiciais_proferidos": atos
+    }
+
+# Visões das rotas /unidades/<secao>: (campo de origem, item por unidade,
+# mensagem quando nenhuma unidade tem dados da seção)
+SECOES_LISTA = {
+    "processos": ("processos_em_tramitacao", processos_item, None),
+    "procedimentos": (
+        "procedimentos_e_peticoes_em_tramitacao", procedimentos_item,
+        "Nenhum dado de procedimentos/petições encontrado em nenhuma unidade"
+    ),
+    "suspensos": (
+        "suspensos_arquivo_provisorio", suspensos_item,
+        "Nenhum dado de suspensos/arquivo provisório encontrado em nenhuma unidade"
+    ),
+    "processos_conclusos_por_tipo": (
+        "processos_conclusos_por_tipo", processos_conclusos_item,
+        "Nenhum dado de processos conclusos por tipo encontrado"
+    ),
+    "controle_de_prisoes": (
+        "controle_de_prisoes", controle_de_prisoes_item, "Nenhum dado de controle de prisões encontrado"
+    ),
+    "controle_de_diligencias": (
+        "controle_de_diligencias", controle_de_diligencias_item, "Nenhum dado de controle de diligências encontrado"
+    ),
+    "distribuicoes": (
+        "demonstrativo_de_distribuicoes", distribuicoes_item, "Nenhum dado de distribuições encontrado"
+    ),
+    "processos_baixados": (
+        "processos_baixados", processos_baixados_item, "Nenhum dado de processos baixados encontrado"
+    ),
+    "atos_judiciais": (
+        "atos_judiciais_proferidos", atos_judiciais_item, "Nenhum dado de atos judiciais proferidos encontrado"
+    ),
+}
+
+def section_list_response(
+    snapshot: Snapshot,
+    key: str,
+    selecao: Optional[Set[int]] = None,
+    ndjson: bool = False,
+) -> Response:
+    """
+    Resposta de /unidades/<secao>, a partir da visão materializada da seção
+
+    Ao trocar de snapshot, só os itens das unidades cuja seção mudou são
+    recalculados (veja materialized_items).
+    """
+    section, item, empty_detail = SECOES_LISTA[key]
+    items = materialized_items(snapshot, key, section, item, empty_detail)
+    return items_response(snapshot, key, items, selecao, ndjson)
+
 @router.get(
     "/unidades",
+    dependencies=[Depends(conditional())],
     response_model=List[UnidadeData],
     summary="Lista todas as unidades",
     description="Retorna todos os dados coletados das unidades judiciárias"
 )
 async def list_unidades(
-    service: DataService = Depends(get_data_service),
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Quantidade de unidades por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devolvido em X-Next-Cursor pela página anterior"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    selecao: Optional[Set[int]] = Depends(filter_units),
+    ndjson: bool = Depends(ndjson_format),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
-    
-    service.debug_file_path()
-
-    if not service.data:
+    if not snapshot.units:
         raise HTTPException(404, "Nenhum dado encontrado. Execute o scraper primeiro.")
 
+    tree = parse_fields(fields, UNIDADE_FIELDS) if fields is not None else None
+
+    if limit is not None or cursor is not None:
+        return paginate_unidades(request, snapshot, limit or PAGE_SIZE, cursor, tree, selecao, ndjson)
+
+    # O corpo já foi validado contra UnidadeData em validate_snapshot; o
+    # response_model continua declarado para documentar o schema
+    def build():
+        return serialize_model(UNIDADES_ADAPTER, [transform_unit_data(unit) for unit in snapshot.units])
+
+    if ndjson:
+        try:
+            if tree is None:
+                return cached_list_response(snapshot, "unidades", build, selecao, ndjson=True)
+            # Os erros de validação precisam aparecer antes do início do streaming
+            cached_fragment(snapshot, "unidades", build)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Erro ao processar lista de unidades: {str(e)}")
+            raise HTTPException(500, "Erro ao processar os dados das unidades")
+        units = snapshot.units if selecao is None else (u for u in snapshot.units if u.get("id") in selecao)
+        return ndjson_response(projected_unit(snapshot, unit, tree) for unit in units)
+
+    if tree is not None or selecao is not None:
+        units = snapshot.units if selecao is None else [u for u in snapshot.units if u.get("id") in selecao]
+        try:
+            if tree is not None:
+                body = join_fragments(projected_unit(snapshot, unit, tree) for unit in units)
+            else:
+                body = join_fragments(
+                    cached_fragment(snapshot, ("unidade", unit.get("id")), partial(unidade_body, unit))
+                    for unit in units
+                )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Erro ao processar lista de unidades: {str(e)}")
+            raise HTTPException(500, "Erro ao processar os dados das unidades")
+        return Response(content=body, media_type="application/json")
+
     try:
-        return [transform_unit_data(unit) for unit in service.data]
+        return cached_json_response(snapshot, "unidades", build)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Erro ao processar lista de unidades: {str(e)}")
         raise HTTPException(500, "Erro ao processar os dados das unidades")
 
+def paginate_unidades(
+    request: Request,
+    snapshot: Snapshot,
+    limit: int,
+    cursor: Optional[str],
+    tree: Optional[FieldTree] = None,
+    selecao: Optional[Set[int]] = None,
+    ndjson: bool = False,
+) -> Response:
+    """
+    Página de unidades em ordem de ID, montada a partir dos corpos por unidade
+    já codificados (os mesmos de /unidades/unidades/{unit_id})
+
+    O cursor da próxima página vai no cabeçalho X-Next-Cursor (e em Link),
+    mantendo o corpo como uma lista de UnidadeData.
+    """
+    ids = snapshot.sorted_ids if selecao is None else [i for i in snapshot.sorted_ids if i in selecao]
+    start = bisect_right(ids, decode_cursor(cursor)) if cursor is not None else 0
+    page_ids = ids[start:start + limit]
+
+    try:
+        if tree is not None:
+            fragments = [projected_unit(snapshot, snapshot.get_unit(unit_id), tree) for unit_id in page_ids]
+        else:
+            fragments = [
+                cached_fragment(snapshot, ("unidade", unit_id), partial(unidade_body, snapshot.get_unit(unit_id)))
+                for unit_id in page_ids
+            ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao processar página de unidades: {str(e)}")
+        raise HTTPException(500, "Erro ao processar os dados das unidades")
+
+    headers = {"X-Total-Count": str(len(ids))}
+    if start + limit < len(ids):
+        next_cursor = encode_cursor(page_ids[-1])
+        next_url = request.url.include_query_params(limit=limit, cursor=next_cursor)
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    if ndjson:
+        return ndjson_response(fragments, headers)
+    return Response(content=join_fragments(fragments), media_type="application/json", headers=headers)
+
+@router.get(
+    "/unidades/numerico",
+    dependencies=[Depends(conditional())],
+    summary="Lista todas as unidades com valores numéricos",
+    description="Retorna os mesmos dados de /unidades, com os valores já convertidos para inteiros (\"1.825\" → 1825)"
+)
+async def list_unidades_numerico(
+    selecao: Optional[Set[int]] = Depends(filter_units),
+    ndjson: bool = Depends(ndjson_format),
+    snapshot: Snapshot = Depends(get_snapshot),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    if not snapshot.numeric_units:
+        raise HTTPException(404, "Nenhum dado encontrado. Execute o scraper primeiro.")
+    return cached_list_response(
+        snapshot, "unidades_numerico", lambda: [unit.to_dict() for unit in snapshot.numeric_units], selecao, ndjson
+    )
+
+@router.get(
+    "/unidades/busca",
+    dependencies=[Depends(conditional())],
+    summary="Busca unidades pelo nome",
+    description="Busca aproximada, sem diferenciar acentos e maiúsculas/minúsculas, com as unidades mais "
+                "relevantes primeiro. Aceita trechos do nome e siglas, ex.: q=natal jec ou q=mossoro familia"
+)
+async def buscar_unidades(
+    q: str = Query(..., min_length=1, max_length=200, description="Termos da busca"),
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    snapshot: Snapshot = Depends(get_snapshot),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    resultados = snapshot.search(q, limit)
+    if not resultados:
+        raise HTTPException(404, f"Nenhuma unidade encontrada para '{q}'")
+    return Response(
+        content=encode_json([
+            {"id": unit.get("id"), "unidade": unit.get("unidade"), "pontuacao": round(score, 3)}
+            for unit, score in resultados
+        ]),
+        media_type="application/json",
+    )
+
+@router.post(
+    "/unidades/lote",
+    summary="Obtém várias seções de várias unidades",
+    description="Retorna, em uma única resposta, as seções pedidas (os mesmos corpos das rotas "
+                "/unidades/{unit_id}/<secao>) de cada unidade. Seções sem dados aparecem em \"erros\""
+)
+async def get_lote(
+    pedido: LoteUnidades,
+    snapshot: Snapshot = Depends(get_snapshot),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    invalidas = [secao for secao in pedido.secoes if secao not in SECOES_UNIDADE]
+    if invalidas:
+        raise HTTPException(
+            400, f"Seções inválidas: {', '.join(invalidas)}. Disponíveis: {', '.join(SECOES_UNIDADE)}"
+        )
+
+    try:
+        secoes = list(dict.fromkeys(pedido.secoes))
+        itens = []
+        for unit_id in dict.fromkeys(pedido.unidades):
+            unit = snapshot.get_unit(unit_id)
+            if unit is None:
+                erro = {"status": 404, "detail": f"Unidade com ID {unit_id} não encontrada"}
+                itens.append(encode_json({"id": unit_id, "erros": {"unidade": erro}}))
+                continue
+
+            membros = [("id", encode_json(unit_id))]
+            erros = {}
+            for secao in secoes:
+                # Mesma chave de cache das rotas por unidade: o corpo é codificado uma única vez
+                build = partial(SECOES_UNIDADE[secao], unit, unit_id)
+                try:
+                    membros.append((secao, cached_fragment(snapshot, (secao, unit_id), build)))
+                except HTTPException as e:
+                    erros[secao] = {"status": e.status_code, "detail": e.detail}
+            if erros:
+                membros.append(("erros", encode_json(erros)))
+            itens.append(join_object(membros))
+
+        return Response(content=join_fragments(itens), media_type="application/json")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao processar lote de unidades: {str(e)}")
+        raise HTTPException(500, "Erro ao processar lote de unidades")
+
+@router.get(
+    "/metricas",
+    dependencies=[Depends(conditional_db)],
+    summary="Consulta uma métrica em todas as unidades",
+    description="Filtra e soma uma métrica (seção, categoria e faixa) diretamente no banco de dados, "
+                "ex.: secao=processos_em_tramitacao&categoria=TOTAL&faixa=%2B100 dias&minimo=50"
+)
+async def consultar_metrica(
+    secao: str,
+    categoria: str,
+    faixa: str = "Total",
+    subcategoria: Optional[str] = None,
+    minimo: Optional[int] = None,
+    maximo: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    session: Session = Depends(get_session),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    resultado = query_metric(session, secao, categoria, faixa, subcategoria, minimo, maximo, limit)
+    if not resultado["quantidade"]:
+        raise HTTPException(404, "Nenhum valor encontrado para a métrica informada")
+    return {"secao": secao, "categoria": categoria, "subcategoria": subcategoria, "faixa": faixa, **resultado}
+
+@router.get(
+    "/agregados",
+    dependencies=[Depends(conditional())],
+    summary="Totais de todo o TJRN (1º grau)",
+    description="Soma de todas as métricas entre as unidades, no mesmo formato de /unidades/numerico; "
+                "as séries mensais são somadas mês a mês"
+)
+async def get_agregados(
+    snapshot: Snapshot = Depends(get_snapshot),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    if not snapshot.units:
+        raise HTTPException(404, "Nenhum dado encontrado. Execute o scraper primeiro.")
+    return cached_json_response(
+        snapshot, "agregados", lambda: {"unidades": len(snapshot.units), **snapshot.columns.rollup()}
+    )
+
+@router.get(
+    "/agregados/metrica",
+    dependencies=[Depends(conditional())],
+    summary="Total de uma métrica em todas as unidades",
+    description="Soma, quantidade de unidades com valor e média de uma métrica, "
+                "ex.: caminho=processos_em_tramitacao.TOTAL.%2B100 dias"
+)
+async def get_agregado_metrica(
+    caminho: str,
+    snapshot: Snapshot = Depends(get_snapshot),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    columns = snapshot.columns
+    path = columns.resolve(caminho)
+    if path is None:
+        raise HTTPException(404, f"Métrica '{caminho}' não encontrada")
+
+    def build():
+        if path in columns.monthly:
+            mensal = columns.monthly_sum(path)
+            return {"caminho": caminho, "mensal": mensal, "total": sum(mensal.values())}
+        total = columns.sum(path)
+        quantidade = columns.count(path)
+        return {
+            "caminho": caminho,
+            "total": total,
+            "unidades": quantidade,
+            "media": round(total / quantidade, 2) if quantidade else None,
+        }
+
+    return cached_json_response(snapshot, ("agregado", caminho), build)
+
+@router.get(
+    "/agregados/{secao}",
+    dependencies=[Depends(conditional())],
+    summary="Totais de uma seção em todo o TJRN (1º grau)",
+    description="Soma das métricas de uma seção (ex.: processos_em_tramitacao) entre todas as unidades"
+)
+async def get_agregados_secao(
+    secao: str,
+    snapshot: Snapshot = Depends(get_snapshot),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    totais = snapshot.columns.rollup().get(secao)
+    if totais is None:
+        raise HTTPException(404, f"Seção '{secao}' não encontrada")
+    return cached_json_response(snapshot, ("agregados", secao), lambda: totais)
+
+@router.get(
+    "/rankings",
+    dependencies=[Depends(conditional())],
+    summary="Ranking de unidades por uma métrica",
+    description="As unidades com os maiores (ou menores) valores de uma métrica numérica, "
+                "ex.: caminho=processos_conclusos_por_tipo.Total de processos conclusos.%2B100 dias&limit=20"
+)
+async def get_ranking(
+    caminho: str,
+    ordem: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    snapshot: Snapshot = Depends(get_snapshot),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    columns = snapshot.columns
+    path = columns.resolve(caminho)
+    if path is None or path not in columns.columns:
+        raise HTTPException(404, f"Métrica '{caminho}' não encontrada")
+
+    def build():
+        column = columns.column(path)
+        rows = columns.ranking(path, descending=ordem == "desc")
+        return {
+            "caminho": caminho,
+            "ordem": ordem,
+            "unidades": [
+                {
+                    "posicao": posicao,
+                    "id": snapshot.units[row].get("id"),
+                    "unidade": snapshot.units[row].get("unidade"),
+                    "valor": column[row],
+                }
+                for posicao, row in enumerate(rows[:limit], start=1)
+            ],
+        }
+
+    return cached_json_response(snapshot, ("ranking", path, ordem, limit), build)
+
+@router.get(
+    "/comarcas",
+    dependencies=[Depends(conditional())],
+    summary="Lista as comarcas",
+    description="Comarcas identificadas pelo padrão \"COMARCA - VARA\" do nome das unidades, com a quantidade de unidades"
+)
+async def list_comarcas(
+    snapshot: Snapshot = Depends(get_snapshot),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    def build():
+        if not snapshot.comarcas:
+            raise HTTPException(404, "Nenhum dado encontrado. Execute o scraper primeiro.")
+        return [
+            {"comarca": snapshot.comarcas[key], "unidades": len(snapshot.comarca_rows[key])}
+            for key in sorted(snapshot.comarcas)
+        ]
+
+    return cached_json_response(snapshot, "comarcas", build)
+
+@router.get(
+    "/comarcas/{comarca}",
+    dependencies=[Depends(conditional())],
+    summary="Totais e unidades de uma comarca",
+    description="Soma de todas as métricas das unidades da comarca e a lista dessas unidades"
+)
+async def get_comarca(
+    comarca: str,
+    snapshot: Snapshot = Depends(get_snapshot),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    unidades = snapshot.get_comarca_units(comarca)
+    if unidades is None:
+        raise HTTPException(404, f"Comarca '{comarca}' não encontrada")
+
+    def build():
+        return {
+            "comarca": snapshot.comarcas[normalize_name(comarca)],
+            "unidades": [{"id": unit.get("id"), "unidade": unit.get("unidade")} for unit in unidades],
+            "totais": snapshot.get_comarca_rollup(comarca),
+        }
+
+    return cached_json_response(snapshot, ("comarca", normalize_name(comarca)), build)
+
+@router.get(
+    "/comarcas/{comarca}/{secao}",
+    dependencies=[Depends(conditional())],
+    summary="Totais de uma seção em uma comarca",
+    description="Soma das métricas de uma seção (ex.: processos_em_tramitacao) entre as unidades da comarca"
+)
+async def get_comarca_secao(
+    comarca: str,
+    secao: str,
+    snapshot: Snapshot = Depends(get_snapshot),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    totais = snapshot.get_comarca_rollup(comarca)
+    if totais is None:
+        raise HTTPException(404, f"Comarca '{comarca}' não encontrada")
+    if secao not in totais:
+        raise HTTPException(404, f"Seção '{secao}' não encontrada na comarca '{comarca}'")
+    return cached_json_response(snapshot, ("comarca", normalize_name(comarca), secao), lambda: totais[secao])
+
+@router.get(
+    "/exportacao/{formato}",
+    dependencies=[Depends(conditional())],
+    summary="Exporta todos os dados em formato tabular",
+    description="Uma linha por valor coletado (unidade, seção, categoria, faixa ou mês, valor), em CSV ou "
+                "Parquet. O arquivo é gerado uma vez por versão dos dados e reaproveitado nos downloads seguintes"
+)
+async def exportar_dados(
+    formato: str,
+    export_dir: Path = Depends(get_export_dir),
+    snapshot: Snapshot = Depends(get_snapshot),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    if formato not in EXPORT_FORMATS:
+        raise HTTPException(404, f"Formato '{formato}' não suportado. Disponíveis: {', '.join(EXPORT_FORMATS)}")
+    if not snapshot.units:
+        raise HTTPException(404, "Nenhum dado encontrado. Execute o scraper primeiro.")
+
+    try:
+        # A geração (só na primeira vez por versão) roda fora do event loop
+        path = await run_in_threadpool(export_snapshot, snapshot, formato, export_dir)
+    except Exception as e:
+        logger.error(f"Erro ao exportar dados em {formato}: {str(e)}")
+        raise HTTPException(500, "Erro ao exportar os dados")
+
+    suffix, _, media_type = EXPORT_FORMATS[formato]
+    return FileResponse(path, media_type=media_type, filename=f"dados_tjrn{suffix}")
+
+@router.get(
+    "/historico/coletas",
+    summary="Coletas registradas no histórico",
+    description="Lista as execuções do scraper guardadas no histórico, em ordem cronológica"
+)
+async def listar_coletas(
+    session: Session = Depends(get_session),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    return list_runs(session)
+
+@router.get(
+    "/historico/unidades/{unit_id}",
+    summary="Evolução histórica de uma unidade",
+    description="Retorna, para cada coleta, os valores da unidade. Use `caminho` para limitar a uma seção "
+                "ou métrica, ex.: caminho=processos_em_tramitacao.TOTAL"
+)
+async def historico_unidade(
+    unit_id: int,
+    caminho: Optional[str] = None,
+    session: Session = Depends(get_session),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    serie = unit_history(session, unit_id, caminho)
+    if not serie:
+        raise HTTPException(404, f"Nenhum histórico encontrado para a unidade {unit_id}")
+    return serie
+
 @router.get(
     "/unidades/processos",
+    dependencies=[Depends(conditional("processos_em_tramitacao"))],
     summary="Processos em tramitação de todas as unidades",
     description="Retorna os dados de processos em tramitação para todas as unidades"
 )
 async def get_processos(
-    service: DataService = Depends(),
+    selecao: Optional[Set[int]] = Depends(filter_units),
+    ndjson: bool = Depends(ndjson_format),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
     try:
-        resultados = []
-
-        for unit in service.data:
-            processos = {
-                k: transform_process_data(v)
-                for k, v in unit.get("processos_em_tramitacao", {}).items()
-            }
-            resultados.append({
-                "id": unit.get("id"),
-                "unidade": unit.get("unidade"),
-                "processos_em_tramitacao": processos
-            })
-
-        return JSONResponse(content=resultados)
-    
+        return section_list_response(snapshot, "processos", selecao, ndjson)
     except HTTPException:
         raise
     except Exception as e:
@@ -243,30 +1186,18 @@ async def get_processos(
 
 @router.get(
     "/unidades/procedimentos",
+    dependencies=[Depends(conditional("procedimentos_e_peticoes_em_tramitacao"))],
     summary="Procedimentos e petições em tramitação de todas as unidades",
     description="Retorna os dados de procedimentos e petições em tramitação para todas as unidades"
 )
 async def get_procedimentos(
-    service: DataService = Depends(get_data_service),
+    selecao: Optional[Set[int]] = Depends(filter_units),
+    ndjson: bool = Depends(ndjson_format),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
     try:
-        resultados = []
-
-        for unit in service.data:
-            procedimentos = unit.get("procedimentos_e_peticoes_em_tramitacao")
-            if procedimentos:  # filtra apenas os que têm dado
-                resultados.append({
-                    "id": unit.get("id"),
-                    "unidade": unit.get("unidade"),
-                    "procedimentos_e_peticoes_em_tramitacao": procedimentos
-                })
-
-        if not resultados:
-            raise HTTPException(404, "Nenhum dado de procedimentos/petições encontrado em nenhuma unidade")
-
-        return JSONResponse(content=resultados)
-
+        return section_list_response(snapshot, "procedimentos", selecao, ndjson)
     except HTTPException:
         raise
     except Exception as e:
@@ -275,30 +1206,18 @@ async def get_procedimentos(
 
 @router.get(
     "/unidades/suspensos",
+    dependencies=[Depends(conditional("suspensos_arquivo_provisorio"))],
     summary="Suspensos / Arquivo provisório de todas as unidades",
     description="Retorna os dados de processos suspensos ou em arquivo provisório para todas as unidades"
 )
 async def get_suspensos_arquivo_provisorio(
-    service: DataService = Depends(get_data_service),
+    selecao: Optional[Set[int]] = Depends(filter_units),
+    ndjson: bool = Depends(ndjson_format),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
     try:
-        resultados = []
-
-        for unit in service.data:
-            suspensos = unit.get("suspensos_arquivo_provisorio")
-            if suspensos:
-                resultados.append({
-                    "id": unit.get("id"),
-                    "unidade": unit.get("unidade"),
-                    "suspensos_arquivo_provisorio": suspensos
-                })
-
-        if not resultados:
-            raise HTTPException(404, "Nenhum dado de suspensos/arquivo provisório encontrado em nenhuma unidade")
-
-        return JSONResponse(content=resultados)
-
+        return section_list_response(snapshot, "suspensos", selecao, ndjson)
     except HTTPException:
         raise
     except Exception as e:
@@ -307,42 +1226,18 @@ async def get_suspensos_arquivo_provisorio(
 
 @router.get(
     "/unidades/processos_conclusos_por_tipo",
+    dependencies=[Depends(conditional("processos_conclusos_por_tipo"))],
     summary="Processos conclusos por tipo de todas as unidades",
     description="Retorna os dados de processos conclusos por tipo para todas as unidades judiciárias"
 )
 async def get_processos_conclusos_por_tipo(
-    service: DataService = Depends(get_data_service),
+    selecao: Optional[Set[int]] = Depends(filter_units),
+    ndjson: bool = Depends(ndjson_format),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
     try:
-        def safe_str(value):
-            return str(value) if value is not None else ""
-
-        resultados = []
-
-        for unit in service.data:
-            conclusos = unit.get("processos_conclusos_por_tipo", {})
-            if conclusos:
-                dados_formatados = {
-                    tipo: {
-                        "Total": safe_str(d.get("Total")),
-                        "+60 dias": safe_str(d.get("+60 dias")),
-                        "+100 dias": safe_str(d.get("+100 dias")),
-                    }
-                    for tipo, d in conclusos.items()
-                }
-
-                resultados.append({
-                    "id": unit.get("id"),
-                    "unidade": unit.get("unidade"),
-                    "processos_conclusos_por_tipo": dados_formatados
-                })
-
-        if not resultados:
-            raise HTTPException(404, "Nenhum dado de processos conclusos por tipo encontrado")
-
-        return JSONResponse(content=resultados)
-
+        return section_list_response(snapshot, "processos_conclusos_por_tipo", selecao, ndjson)
     except HTTPException:
         raise
     except Exception as e:
@@ -351,31 +1246,18 @@ async def get_processos_conclusos_por_tipo(
     
 @router.get(
     "/unidades/controle_de_prisoes",
+    dependencies=[Depends(conditional("controle_de_prisoes"))],
     summary="Controle de prisões de todas as unidades",
     description="Retorna os dados da tabela de Controle de Prisões de todas as unidades judiciárias"
 )
 async def get_controle_de_prisoes(
-    service: DataService = Depends(get_data_service),
+    selecao: Optional[Set[int]] = Depends(filter_units),
+    ndjson: bool = Depends(ndjson_format),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
     try:
-        resultados = []
-
-        for unit in service.data:
-            controle = unit.get("controle_de_prisoes")
-            if controle:
-                controle_transformado = transform_controle_de_prisoes(controle)
-                resultados.append({
-                    "id": unit.get("id"),
-                    "unidade": unit.get("unidade"),
-                    "controle_de_prisoes": controle_transformado
-                })
-
-        if not resultados:
-            raise HTTPException(404, "Nenhum dado de controle de prisões encontrado")
-
-        return JSONResponse(content=resultados)
-    
+        return section_list_response(snapshot, "controle_de_prisoes", selecao, ndjson)
     except HTTPException:
         raise
     except Exception as e:
@@ -384,30 +1266,18 @@ async def get_controle_de_prisoes(
 
 @router.get(
     "/unidades/controle_de_diligencias",
+    dependencies=[Depends(conditional("controle_de_diligencias"))],
     summary="Controle de diligências de todas as unidades",
     description="Retorna os dados da tabela de Controle de Diligências (PJe) de todas as unidades"
 )
 async def get_controle_de_diligencias(
-    service: DataService = Depends(get_data_service),
+    selecao: Optional[Set[int]] = Depends(filter_units),
+    ndjson: bool = Depends(ndjson_format),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
     try:
-        resultados = []
-
-        for unit in service.data:
-            controle = unit.get("controle_de_diligencias")
-            if controle:
-                resultados.append({
-                    "id": unit.get("id"),
-                    "unidade": unit.get("unidade"),
-                    "controle_de_diligencias": controle
-                })
-
-        if not resultados:
-            raise HTTPException(404, "Nenhum dado de controle de diligências encontrado")
-
-        return JSONResponse(content=resultados)
-
+        return section_list_response(snapshot, "controle_de_diligencias", selecao, ndjson)
     except HTTPException:
         raise
     except Exception as e:
@@ -416,30 +1286,18 @@ async def get_controle_de_diligencias(
 
 @router.get(
     "/unidades/distribuicoes",
+    dependencies=[Depends(conditional("demonstrativo_de_distribuicoes"))],
     summary="Demonstrativo de distribuições de todas as unidades",
     description="Retorna os dados do Demonstrativo de Distribuições (últimos 12 meses) de todas as unidades"
 )
 async def get_distribuicoes(
-    service: DataService = Depends(get_data_service),
+    selecao: Optional[Set[int]] = Depends(filter_units),
+    ndjson: bool = Depends(ndjson_format),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
     try:
-        resultados = []
-
-        for unit in service.data:
-            distrib = unit.get("demonstrativo_de_distribuicoes")
-            if distrib:
-                resultados.append({
-                    "id": unit.get("id"),
-                    "unidade": unit.get("unidade"),
-                    "demonstrativo_de_distribuicoes": distrib
-                })
-
-        if not resultados:
-            raise HTTPException(404, "Nenhum dado de distribuições encontrado")
-
-        return JSONResponse(content=resultados)
-
+        return section_list_response(snapshot, "distribuicoes", selecao, ndjson)
     except HTTPException:
         raise
     except Exception as e:
@@ -448,30 +1306,18 @@ async def get_distribuicoes(
 
 @router.get(
     "/unidades/processos_baixados",
+    dependencies=[Depends(conditional("processos_baixados"))],
     summary="Processos baixados de todas as unidades",
     description="Retorna os dados da tabela de processos baixados (últimos 12 meses) de todas as unidades"
 )
 async def get_processos_baixados(
-    service: DataService = Depends(get_data_service),
+    selecao: Optional[Set[int]] = Depends(filter_units),
+    ndjson: bool = Depends(ndjson_format),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
     try:
-        resultados = []
-
-        for unit in service.data:
-            processos_baixados = unit.get("processos_baixados")
-            if processos_baixados:
-                resultados.append({
-                    "id": unit.get("id"),
-                    "unidade": unit.get("unidade"),
-                    "processos_baixados": processos_baixados
-                })
-
-        if not resultados:
-            raise HTTPException(404, "Nenhum dado de processos baixados encontrado")
-
-        return JSONResponse(content=resultados)
-
+        return section_list_response(snapshot, "processos_baixados", selecao, ndjson)
     except HTTPException:
         raise
     except Exception as e:
@@ -480,30 +1326,18 @@ async def get_processos_baixados(
 
 @router.get(
     "/unidades/atos_judiciais",
+    dependencies=[Depends(conditional("atos_judiciais_proferidos"))],
     summary="Atos judiciais proferidos de todas as unidades",
     description="Retorna os dados da tabela de atos judiciais proferidos (últimos 12 meses) de todas as unidades"
 )
 async def get_atos_judiciais_proferidos(
-    service: DataService = Depends(get_data_service),
+    selecao: Optional[Set[int]] = Depends(filter_units),
+    ndjson: bool = Depends(ndjson_format),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
     try:
-        resultados = []
-
-        for unit in service.data:
-            atos = unit.get("atos_judiciais_proferidos")
-            if atos:
-                resultados.append({
-                    "id": unit.get("id"),
-                    "unidade": unit.get("unidade"),
-                    "atos_judiciais_proferidos": atos
-                })
-
-        if not resultados:
-            raise HTTPException(404, "Nenhum dado de atos judiciais proferidos encontrado")
-
-        return JSONResponse(content=resultados)
-
+        return section_list_response(snapshot, "atos_judiciais", selecao, ndjson)
     except HTTPException:
         raise
     except Exception as e:
@@ -512,41 +1346,84 @@ async def get_atos_judiciais_proferidos(
 
 @router_unidade.get(
     "/unidades/{unit_id}",
+    dependencies=[Depends(conditional())],
     response_model=UnidadeData,
     summary="Obtém uma unidade específica"
 )
 async def get_unidade(
     unit_id: int,
-    service: DataService = Depends(get_data_service),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
+    unit = find_unit_by_id(snapshot, unit_id)
     try:
-        unit = find_unit_by_id(service.data, unit_id)
-        return transform_unit_data(unit)
+        if fields is not None:
+            tree = parse_fields(fields, UNIDADE_FIELDS)
+            return Response(content=projected_unit(snapshot, unit, tree), media_type="application/json")
+        return cached_json_response(
+            snapshot,
+            ("unidade", unit_id),
+            lambda: unidade_body(unit)
+        )
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Erro ao processar unidade {unit_id}: {str(e)}")
         raise HTTPException(500, f"Erro ao processar unidade ID {unit_id}")
 
+@router_unidade.get(
+    "/unidades/nome/{nome}",
+    dependencies=[Depends(conditional())],
+    response_model=UnidadeData,
+    summary="Obtém uma unidade pelo nome",
+    description="Busca exata pelo nome da unidade, ignorando acentos, maiúsculas/minúsculas e espaços extras"
+)
+async def get_unidade_por_nome(
+    nome: str,
+    snapshot: Snapshot = Depends(get_snapshot),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    unit = snapshot.get_unit_by_name(nome)
+    if not unit:
+        raise HTTPException(404, f"Unidade '{nome}' não encontrada")
+    return cached_json_response(
+        snapshot,
+        ("unidade", unit.get("id")),
+        lambda: unidade_body(unit)
+    )
+
+@router_unidade.get(
+    "/unidades/{unit_id}/numerico",
+    dependencies=[Depends(conditional())],
+    summary="Obtém uma unidade específica com valores numéricos",
+    description="Retorna os dados da unidade com os valores já convertidos para inteiros"
+)
+async def get_unidade_numerico(
+    unit_id: int,
+    snapshot: Snapshot = Depends(get_snapshot),
+    current_user: Cliente = Depends(get_current_active_user)
+):
+    unit = snapshot.get_numeric_unit(unit_id)
+    if not unit:
+        raise HTTPException(404, f"Unidade com ID {unit_id} não encontrada")
+    return cached_json_response(snapshot, ("numerico", unit_id), unit.to_dict)
+
 @router_unidade.get(
     "/unidades/{unit_id}/processos",
+    dependencies=[Depends(conditional("processos_em_tramitacao"))],
     summary="Processos em tramitação de uma unidade específica",
     description="Retorna apenas os dados de processos em tramitação"
 )
 async def get_processos_unidade(
     unit_id: int,
-    service: DataService = Depends(get_data_service),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
+    unit = find_unit_by_id(snapshot, unit_id)
+
     try:
-        unit = find_unit_by_id(service.data, unit_id)
-        processos = {
-            k: transform_process_data(v)
-            for k, v in unit.get("processos_em_tramitacao", {}).items()
-        }
-        return JSONResponse(content=processos)
-    
+        return cached_json_response(snapshot, ("processos", unit_id), partial(processos_body, unit, unit_id))
     except HTTPException:
         raise
     except Exception as e:
@@ -555,23 +1432,19 @@ async def get_processos_unidade(
 
 @router_unidade.get(
     "/unidades/{unit_id}/procedimentos",
+    dependencies=[Depends(conditional("procedimentos_e_peticoes_em_tramitacao"))],
     summary="Procedimentos e petições em tramitação de uma unidade específica",
     description="Retorna apenas os dados de procedimentos e petições em tramitação"
 )
 async def get_procedimentos_unidade(
     unit_id: int,
-    service: DataService = Depends(get_data_service),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
-    try:
-        unit = find_unit_by_id(service.data, unit_id)
-
-        procedimentos = unit.get("procedimentos_e_peticoes_em_tramitacao", None)
-        if procedimentos is None:
-            raise HTTPException(404, f"Nenhum dado de procedimentos/petições encontrado para a unidade {unit_id}")
-
-        return JSONResponse(content=procedimentos)
+    unit = find_unit_by_id(snapshot, unit_id)
 
+    try:
+        return cached_json_response(snapshot, ("procedimentos", unit_id), partial(procedimentos_body, unit, unit_id))
     except HTTPException:
         raise
     except Exception as e:
@@ -580,23 +1453,19 @@ async def get_procedimentos_unidade(
 
 @router_unidade.get(
     "/unidades/{unit_id}/suspensos",
+    dependencies=[Depends(conditional("suspensos_arquivo_provisorio"))],
     summary="Suspensos / Arquivo provisório de uma unidade específica",
     description="Retorna os dados de processos suspensos ou em arquivo provisório de uma unidade judiciária"
 )
 async def get_suspensos_arquivo_provisorio_unidade(
     unit_id: int,
-    service: DataService = Depends(get_data_service),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
-    try:
-        unit = find_unit_by_id(service.data, unit_id)
-
-        suspensos = unit.get("suspensos_arquivo_provisorio")
-        if suspensos is None:
-            raise HTTPException(404, f"Nenhum dado de suspensos/arquivo provisório encontrado para a unidade {unit_id}")
-
-        return JSONResponse(content=suspensos)
+    unit = find_unit_by_id(snapshot, unit_id)
 
+    try:
+        return cached_json_response(snapshot, ("suspensos", unit_id), partial(suspensos_body, unit, unit_id))
     except HTTPException:
         raise
     except Exception as e:
@@ -605,35 +1474,19 @@ async def get_suspensos_arquivo_provisorio_unidade(
 
 @router_unidade.get(
     "/unidades/{unit_id}/processos_conclusos_por_tipo",
+    dependencies=[Depends(conditional("processos_conclusos_por_tipo"))],
     summary="Processos conclusos por tipo de uma unidade específica",
     description="Retorna os dados de processos conclusos por tipo para uma unidade judiciária específica"
 )
 async def get_processos_conclusos_por_tipo(
     unit_id: int,
-    service: DataService = Depends(get_data_service),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
-    try:
-        unit = find_unit_by_id(service.data, unit_id)
-        conclusos = unit.get("processos_conclusos_por_tipo", {})
-
-        if not conclusos:
-            raise HTTPException(404, f"Dados de 'processos_conclusos_por_tipo' não encontrados para unidade ID {unit_id}")
-
-        def safe_str(value):
-            return str(value) if value is not None else ""
-
-        result = {
-            tipo: {
-                "Total": safe_str(dados.get("Total")),
-                "+60 dias": safe_str(dados.get("+60 dias")),
-                "+100 dias": safe_str(dados.get("+100 dias")),
-            }
-            for tipo, dados in conclusos.items()
-        }
-
-        return JSONResponse(content=result)
+    unit = find_unit_by_id(snapshot, unit_id)
 
+    try:
+        return cached_json_response(snapshot, ("processos_conclusos_por_tipo", unit_id), partial(processos_conclusos_body, unit, unit_id))
     except HTTPException:
         raise
     except Exception as e:
@@ -642,24 +1495,20 @@ async def get_processos_conclusos_por_tipo(
 
 @router_unidade.get(
     "/unidades/{unit_id}/controle_de_prisoes",
+    dependencies=[Depends(conditional("controle_de_prisoes"))],
     summary="Controle de prisões de uma unidade específica",
     description="Retorna os dados da tabela de Controle de Prisões da unidade especificada"
 )
 
 async def get_controle_de_prisoes(
     unit_id: int,
-    service: DataService = Depends(get_data_service),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
-    try:
-        unit = find_unit_by_id(service.data, unit_id)
-        controle = unit.get("controle_de_prisoes")
-        if controle is None:
-            raise HTTPException(404, f"Controle de prisões da unidade {unit_id} não encontrado")
+    unit = find_unit_by_id(snapshot, unit_id)
 
-        controle_transformado = transform_controle_de_prisoes(controle)
-        return JSONResponse(content=controle_transformado)
-    
+    try:
+        return cached_json_response(snapshot, ("controle_de_prisoes", unit_id), partial(controle_de_prisoes_body, unit, unit_id))
     except HTTPException:
         raise
     except Exception as e:
@@ -668,23 +1517,19 @@ async def get_controle_de_prisoes(
     
 @router_unidade.get(
     "/unidades/{unit_id}/controle_de_diligencias",
+    dependencies=[Depends(conditional("controle_de_diligencias"))],
     summary="Controle de diligências de uma unidade específica",
     description="Retorna os dados da tabela de Controle de Diligências (PJe) da unidade especificada"
 )
 async def get_controle_de_diligencias_unidade(
     unit_id: int,
-    service: DataService = Depends(get_data_service),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
-    try:
-        unit = find_unit_by_id(service.data, unit_id)
-        controle = unit.get("controle_de_diligencias")
-
-        if controle is None:
-            raise HTTPException(404, f"Controle de diligências não encontrado para a unidade {unit_id}")
-
-        return JSONResponse(content=controle)
+    unit = find_unit_by_id(snapshot, unit_id)
 
+    try:
+        return cached_json_response(snapshot, ("controle_de_diligencias", unit_id), partial(controle_de_diligencias_body, unit, unit_id))
     except HTTPException:
         raise
     except Exception as e:
@@ -693,23 +1538,19 @@ async def get_controle_de_diligencias_unidade(
 
 @router_unidade.get(
     "/unidades/{unit_id}/distribuicoes",
+    dependencies=[Depends(conditional("demonstrativo_de_distribuicoes"))],
     summary="Demonstrativo de distribuições da unidade",
     description="Retorna apenas os dados do Demonstrativo de Distribuições (últimos 12 meses)"
 )
 async def get_distribuicoes_unidade(
     unit_id: int,
-    service: DataService = Depends(get_data_service),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
-    try:
-        unit = find_unit_by_id(service.data, unit_id)
-        distrib = unit.get("demonstrativo_de_distribuicoes")
-
-        if distrib is None:
-            raise HTTPException(404, f"Dados de demonstrativo de distribuições não encontrados para a unidade {unit_id}")
+    unit = find_unit_by_id(snapshot, unit_id)
 
-        return JSONResponse(content=distrib)
-    
+    try:
+        return cached_json_response(snapshot, ("distribuicoes", unit_id), partial(distribuicoes_body, unit, unit_id))
     except HTTPException:
         raise
     except Exception as e:
@@ -718,23 +1559,19 @@ async def get_distribuicoes_unidade(
 
 @router_unidade.get(
     "/unidades/{unit_id}/processos_baixados",
+    dependencies=[Depends(conditional("processos_baixados"))],
     summary="Processos baixados de uma unidade específica",
     description="Retorna apenas os dados da tabela de processos baixados nos últimos 12 meses"
 )
 async def get_processos_baixados_unidade(
     unit_id: int,
-    service: DataService = Depends(get_data_service),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
-    try:
-        unit = find_unit_by_id(service.data, unit_id)
-
-        processos_baixados = unit.get("processos_baixados")
-        if not processos_baixados:
-            raise HTTPException(404, f"Dados de 'processos baixados' não encontrados para a unidade {unit_id}")
+    unit = find_unit_by_id(snapshot, unit_id)
 
-        return JSONResponse(content=processos_baixados)
-    
+    try:
+        return cached_json_response(snapshot, ("processos_baixados", unit_id), partial(processos_baixados_body, unit, unit_id))
     except HTTPException:
         raise
     except Exception as e:
@@ -743,23 +1580,19 @@ async def get_processos_baixados_unidade(
 
 @router_unidade.get(
     "/unidades/{unit_id}/atos_judiciais",
+    dependencies=[Depends(conditional("atos_judiciais_proferidos"))],
     summary="Atos judiciais proferidos de uma unidade específica",
     description="Retorna apenas os dados da tabela de atos judiciais proferidos nos últimos 12 meses"
 )
 async def get_atos_judiciais_proferidos_unidade(
     unit_id: int,
-    service: DataService = Depends(get_data_service),
+    snapshot: Snapshot = Depends(get_snapshot),
     current_user: Cliente = Depends(get_current_active_user)
 ):
-    try:
-        unit = find_unit_by_id(service.data, unit_id)
-        atos = unit.get("atos_judiciais_proferidos")
-
-        if atos is None:
-            raise HTTPException(404, f"A unidade {unit_id} não possui dados de atos judiciais proferidos")
+    unit = find_unit_by_id(snapshot, unit_id)
 
-        return JSONResponse(content=atos)
-    
+    try:
+        return cached_json_response(snapshot, ("atos_judiciais", unit_id), partial(atos_judiciais_body, unit, unit_id))
     except HTTPException:
         raise
     except Exception as e:
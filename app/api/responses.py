@@ -0,0 +1,488 @@
+import base64
+import gzip
+import hashlib
+import json
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Collection, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+
+from app.services.snapshot import Snapshot
+
+try:
+    import brotli
+except ImportError:  # dependência opcional: sem ela, apenas gzip é oferecido
+    brotli = None
+
+# Compressores disponíveis, em ordem de preferência do servidor
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=9)
+COMPRESSORS["gzip"] = lambda body: gzip.compress(body, compresslevel=9, mtime=0)
+
+# Corpos menores que isso não compensam a compressão
+MIN_COMPRESS_SIZE = 500
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class CachedError(NamedTuple):
+    """Erro HTTP memorizado no cache (ex.: seção sem dados em nenhuma unidade)"""
+    status_code: int
+    detail: Any
+
+
+def encode_json(content: Any) -> bytes:
+    """Serializa o conteúdo exatamente como o JSONResponse faria"""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def serialize_model(adapter: TypeAdapter, content: Any) -> Any:
+    """Valida o conteúdo contra o modelo e devolve sua forma JSON (com aliases), como o response_model faria"""
+    return adapter.dump_python(adapter.validate_python(content), mode="json", by_alias=True)
+
+
+def cached_fragment(snapshot: Snapshot, key: Hashable, build: Callable[[], Any]) -> bytes:
+    """
+    Devolve o JSON já codificado para `key`, construindo-o apenas na primeira
+    vez em que é pedido contra este snapshot.
+
+    Um HTTPException levantado por `build` também é memorizado, para que uma
+    seção vazia não seja recalculada a cada chamada.
+    """
+    entry = snapshot.response_cache.get(key)
+    if entry is None:
+        try:
+            entry = encode_json(build())
+        except HTTPException as e:
+            entry = CachedError(e.status_code, e.detail)
+        snapshot.response_cache[key] = entry
+
+    if isinstance(entry, CachedError):
+        raise HTTPException(entry.status_code, entry.detail)
+    return entry
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Escolhe, entre COMPRESSORS, a codificação aceita pelo cliente
+
+    Respeita os pesos "q" do cabeçalho Accept-Encoding (q=0 recusa) e, em
+    caso de empate, a ordem de preferência do servidor.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in COMPRESSORS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compressed_variant(snapshot: Snapshot, key: Hashable, body: bytes, encoding: str) -> Optional[bytes]:
+    """
+    Variante comprimida do corpo memorizado para `key`, produzida uma única vez
+    por snapshot; None se a compressão não reduzir o tamanho
+    """
+    cache_key = ("comprimido", encoding, key)
+    variant = snapshot.response_cache.get(cache_key)
+    if variant is None:
+        variant = COMPRESSORS[encoding](body)
+        if len(variant) >= len(body):
+            variant = b""
+        snapshot.response_cache[cache_key] = variant
+    return variant or None
+
+
+def precompress(snapshot: Snapshot, key: Hashable) -> None:
+    """
+    Gera de antemão as variantes comprimidas do corpo memorizado para `key`,
+    para corpos grandes cuja compressão não deve ficar para a primeira requisição
+    """
+    body = snapshot.response_cache.get(key)
+    if isinstance(body, bytes) and len(body) >= MIN_COMPRESS_SIZE:
+        for encoding in COMPRESSORS:
+            compressed_variant(snapshot, key, body, encoding)
+
+
+class CachedJSONResponse(Response):
+    """
+    Resposta JSON com corpo memorizado no snapshot
+
+    A codificação (gzip/br) é escolhida no envio, a partir do Accept-Encoding
+    da requisição, usando as variantes comprimidas guardadas no cache. Uma
+    variante ainda não gerada é comprimida no threadpool, fora do event loop.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: bytes, snapshot: Snapshot, key: Hashable, **kwargs):
+        super().__init__(content=content, **kwargs)
+        self.snapshot = snapshot
+        self.key = key
+        self.headers["Vary"] = "Accept-Encoding"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if len(self.body) >= MIN_COMPRESS_SIZE:
+            encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+            variant = None
+            if encoding:
+                variant = self.snapshot.response_cache.get(("comprimido", encoding, self.key))
+                if variant is None:
+                    variant = await run_in_threadpool(
+                        compressed_variant, self.snapshot, self.key, self.body, encoding
+                    )
+            if variant:
+                self.body = variant
+                self.headers["Content-Encoding"] = encoding
+                self.headers["Content-Length"] = str(len(variant))
+                etag = self.headers.get("ETag")
+                if etag:
+                    # ETag forte: cada codificação é uma representação distinta
+                    self.headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+        await super().__call__(scope, receive, send)
+
+
+def cached_json_response(snapshot: Snapshot, key: Hashable, build: Callable[[], Any]) -> Response:
+    """Resposta com o corpo JSON memorizado para `key` (veja cached_fragment)"""
+    return CachedJSONResponse(cached_fragment(snapshot, key, build), snapshot, key)
+
+
+def matching_etag(if_none_match: str, etag: str) -> Optional[str]:
+    """
+    ETag de If-None-Match que corresponde ao ETag atual (comparação fraca, como
+    pede a RFC 9110), aceitando também as variantes por codificação ("...-gzip")
+
+    Returns:
+        O ETag da representação que o cliente tem (a variante comprimida, se
+        for o caso), ou None se nenhum corresponder
+    """
+    if if_none_match.strip() == "*":
+        return etag
+    opaque = etag.strip('"')
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        base, _, encoding = tag.rpartition("-")
+        if tag == opaque or (base == opaque and encoding in COMPRESSORS):
+            return f'"{tag}"'
+    return None
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Indica se If-None-Match corresponde ao ETag atual (veja matching_etag)"""
+    return matching_etag(if_none_match, etag) is not None
+
+
+def modified_since(if_modified_since: str, last_modified: float) -> bool:
+    """Indica se houve alteração depois da data de If-Modified-Since (datas inválidas contam como alteradas)"""
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is None:
+        return True
+    # O cabeçalho tem resolução de segundos
+    return int(last_modified) > since.timestamp()
+
+
+def representation_tag(request: Request) -> str:
+    """
+    Hash curto do caminho e dos parâmetros de consulta (em ordem canônica),
+    para que cada página, filtro, projeção ou formato tenha o seu próprio ETag
+    """
+    params = sorted(request.query_params.multi_items())
+    raw = json.dumps([request.url.path, params], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=4).hexdigest()
+
+
+def check_conditional(request: Request, etag: str, last_modified: float) -> None:
+    """
+    Levanta HTTPException 304 se a requisição já tiver a versão atual
+
+    If-Modified-Since só é considerado quando não há If-None-Match. Os
+    cabeçalhos ETag e Last-Modified ficam em request.state para que
+    ConditionalRoute os inclua na resposta.
+    """
+    headers = {"ETag": etag, "Last-Modified": formatdate(last_modified, usegmt=True)}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        matched = matching_etag(if_none_match, etag)
+        not_modified = matched is not None
+    else:
+        matched = etag
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = if_modified_since is not None and not modified_since(if_modified_since, last_modified)
+
+    if not_modified:
+        # O 304 repete o ETag da variante que o cliente tem (ex.: "...-gzip") e,
+        # como a resposta 200, varia com o Accept-Encoding
+        raise HTTPException(304, headers={**headers, "ETag": matched, "Vary": "Accept-Encoding"})
+    request.state.conditional_headers = headers
+
+
+class ConditionalRoute(APIRoute):
+    """Rota que acrescenta às respostas 200 os cabeçalhos preparados por check_conditional"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            response = await handler(request)
+            headers = getattr(request.state, "conditional_headers", None)
+            if headers and response.status_code == 200:
+                response.headers.update(headers)
+            return response
+
+        return route_handler
+
+
+def cached_items(snapshot: Snapshot, key: Hashable, build: Callable[[], Any]) -> List[Tuple[Any, bytes]]:
+    """
+    Itens da lista `build()` codificados um a um, como pares (id, JSON),
+    memorizados no snapshot sob ("itens", key)
+    """
+    items_key = ("itens", key)
+    items = snapshot.response_cache.get(items_key)
+    if items is None:
+        try:
+            items = [(item.get("id"), encode_json(item)) for item in build()]
+        except HTTPException as e:
+            items = CachedError(e.status_code, e.detail)
+        snapshot.response_cache[items_key] = items
+
+    if isinstance(items, CachedError):
+        raise HTTPException(items.status_code, items.detail)
+    return items
+
+
+class FragmentStore:
+    """
+    Fragmentos por unidade das visões materializadas (ex.: um item de
+    /unidades/processos), indexados pelo hash do conteúdo de origem
+
+    Ao trocar de snapshot, só as unidades cujo conteúdo mudou são
+    reconstruídas; as demais reaproveitam o fragmento já codificado.
+    Cada visão guarda apenas os fragmentos do último snapshot processado.
+    """
+
+    def __init__(self):
+        self.views: Dict[Hashable, Dict[bytes, Any]] = {}
+
+    def refresh(self, key: Hashable, digests: List[bytes], build: Callable[[int], Any]) -> List[Any]:
+        """
+        Fragmento de cada linha, na ordem de `digests`; `build(linha)` só é
+        chamado para hashes ausentes da versão anterior da visão
+        """
+        previous = self.views.get(key, {})
+        current: Dict[bytes, Any] = {}
+        fragments = []
+        for row, digest in enumerate(digests):
+            if digest in current:
+                fragment = current[digest]
+            elif digest in previous:
+                fragment = current[digest] = previous[digest]
+            else:
+                fragment = current[digest] = build(row)
+            fragments.append(fragment)
+        self.views[key] = current
+        return fragments
+
+
+fragment_store = FragmentStore()
+
+
+def materialized_items(
+    snapshot: Snapshot,
+    key: Hashable,
+    section: str,
+    item: Callable[[Any], Optional[Dict]],
+    empty_detail: Optional[str] = None,
+) -> List[Tuple[Any, bytes]]:
+    """
+    Visão de uma seção em todas as unidades, como pares (id, JSON),
+    materializada uma vez por snapshot a partir de fragment_store
+
+    `item(unit)` devolve o objeto da unidade na visão, ou None para omiti-la;
+    se nenhuma unidade tiver dados e `empty_detail` for informado, a visão
+    responde 404.
+    """
+    items_key = ("itens", key)
+    items = snapshot.response_cache.get(items_key)
+    if items is None:
+        def build(row: int) -> Optional[bytes]:
+            content = item(snapshot.units[row])
+            return None if content is None else encode_json(content)
+
+        bodies = fragment_store.refresh(key, snapshot.unit_digests(section), build)
+        items = [
+            (unit.get("id"), body)
+            for unit, body in zip(snapshot.units, bodies)
+            if body is not None
+        ]
+        if not items and empty_detail is not None:
+            items = CachedError(404, empty_detail)
+        snapshot.response_cache[items_key] = items
+
+    if isinstance(items, CachedError):
+        raise HTTPException(items.status_code, items.detail)
+    return items
+
+
+def items_response(
+    snapshot: Snapshot,
+    key: Hashable,
+    items: List[Tuple[Any, bytes]],
+    ids: Optional[Collection] = None,
+    ndjson: bool = False,
+) -> Response:
+    """Resposta (JSON, filtrada por `ids` ou NDJSON) montada a partir de itens já codificados"""
+    fragments = (body for unit_id, body in items if ids is None or unit_id in ids)
+    if ndjson:
+        return ndjson_response(fragments)
+    if ids is not None:
+        return Response(content=join_fragments(fragments), media_type="application/json")
+
+    body = snapshot.response_cache.get(key)
+    if body is None:
+        body = snapshot.response_cache[key] = join_fragments(fragments)
+    return CachedJSONResponse(body, snapshot, key)
+
+
+def cached_list_response(
+    snapshot: Snapshot,
+    key: Hashable,
+    build: Callable[[], Any],
+    ids: Optional[Collection] = None,
+    ndjson: bool = False,
+) -> Response:
+    """
+    Como cached_json_response, para listas de objetos com "id"; se `ids` for
+    informado, devolve apenas os itens dessas unidades
+
+    Cada item é codificado uma única vez por snapshot, de modo que uma lista
+    filtrada é só a junção dos itens já codificados. Com `ndjson`, os mesmos
+    itens são enviados em streaming, um por linha (veja ndjson_response).
+    """
+    if ids is None and not ndjson:
+        return cached_json_response(snapshot, key, build)
+
+    return items_response(snapshot, key, cached_items(snapshot, key, build), ids, ndjson)
+
+
+def ndjson_response(fragments: Iterable[bytes], headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """
+    Resposta NDJSON (um objeto JSON por linha) enviada à medida que os
+    fragmentos são produzidos, sem montar o corpo inteiro em memória
+    """
+    def lines() -> Iterator[bytes]:
+        for fragment in fragments:
+            yield fragment + b"\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+def join_fragments(fragments: Iterable[bytes]) -> bytes:
+    """Monta um array JSON a partir de elementos já codificados"""
+    return b"[" + b",".join(fragments) + b"]"
+
+
+def join_object(members: Iterable[Tuple[str, bytes]]) -> bytes:
+    """Monta um objeto JSON a partir de pares (chave, valor já codificado)"""
+    return b"{" + b",".join(encode_json(key) + b":" + value for key, value in members) + b"}"
+
+
+def encode_cursor(value: int) -> str:
+    """Cursor opaco de paginação a partir do último ID devolvido"""
+    return base64.urlsafe_b64encode(str(value).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Inverso de encode_cursor; levanta HTTPException 400 se o cursor for inválido"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(400, "Cursor de paginação inválido")
+
+
+# Árvore de projeção: {chave: subárvore}, com None indicando "valor inteiro"
+FieldTree = Dict[str, Optional[dict]]
+
+
+def parse_fields(fields: str, allowed: Collection[str]) -> FieldTree:
+    """
+    Converte "acervo_total,processos_em_tramitacao.TOTAL" em uma árvore de projeção
+
+    O ID é sempre incluído. Levanta HTTPException 400 se algum campo de
+    primeiro nível não pertencer a `allowed`.
+    """
+    tree: FieldTree = {"id": None}
+    for raw in fields.split(","):
+        path = [segment.strip() for segment in raw.split(".")]
+        if not path[0]:
+            continue
+        if path[0] not in allowed:
+            raise HTTPException(400, f"Campo desconhecido: {path[0]}")
+        node = tree
+        for i, segment in enumerate(path):
+            if segment in node and node[segment] is None:
+                break  # um prefixo já seleciona o valor inteiro
+            if i == len(path) - 1:
+                node[segment] = None
+            else:
+                node = node.setdefault(segment, {})
+    return tree
+
+
+def encode_projection(
+    tree: FieldTree,
+    fragment: Callable[[Tuple[str, ...]], Optional[bytes]],
+    prefix: Tuple[str, ...] = (),
+) -> bytes:
+    """
+    Codifica apenas os caminhos de `tree` presentes no documento
+
+    Cada valor selecionado vem de `fragment(caminho)`, que devolve o JSON já
+    codificado (normalmente memorizado por snapshot), ou None se o caminho não
+    existir; os objetos com subcampos selecionados são percorridos recursivamente.
+    """
+    parts = []
+    for key, subtree in tree.items():
+        path = prefix + (key,)
+        body = fragment(path)
+        if body is None:
+            continue
+        if subtree is not None and body.startswith(b"{"):
+            body = encode_projection(subtree, fragment, path)
+        parts.append(encode_json(key) + b":" + body)
+    return b"{" + b",".join(parts) + b"}"
@@ -5,6 +5,7 @@ engine = create_engine(DATABASE_URL, echo=True)
 
 def create_db_and_tables():
     from app.models.user import Cliente
+    from app.models import dados, historico
     SQLModel.metadata.create_all(engine)
 
 def get_session():
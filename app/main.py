@@ -1,6 +1,6 @@
 from fastapi import FastAPI
-from app.api.endpoints import router, router_auth, router_unidade
-from app.services.data_service import DataService
+from app.api.endpoints import router, router_auth, router_unidade, validate_snapshot
+from app.services.data_service import get_shared_data_service
 from app.core.database import create_db_and_tables
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -27,9 +27,11 @@ app.include_router(router_unidade)
 @app.on_event("startup")
 async def startup_event():
     """Carrega os dados ao iniciar a aplicação"""
-    service = DataService(auto_load=True)
+    service = get_shared_data_service()
     if not service.data:
         print("⚠ Nenhum dado encontrado. Execute o scraper primeiro.")
+    # Valida as unidades contra o schema uma única vez, antes da primeira requisição
+    validate_snapshot(service.snapshot)
     create_db_and_tables()
 
 @app.get("/", include_in_schema=False)
@@ -0,0 +1,48 @@
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from typing import Optional
+
+# Tabelas normalizadas com os dados coletados do GPS-Jus.
+# São recriadas a cada nova versão dos dados salva ou carregada pelo DataService.
+
+class Unidade(SQLModel, table=True):
+    id: int = Field(primary_key=True)  # mesmo ID usado pela API (posição no select do GPS-Jus)
+    nome: str = Field(index=True)
+    acervo_total: Optional[int] = Field(default=None, index=True)
+    acervo_total_texto: Optional[str] = None
+
+class Secao(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    nome: str = Field(index=True, unique=True)  # ex.: "processos_em_tramitacao"
+
+class Categoria(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    secao_id: int = Field(foreign_key="secao.id", index=True)
+    categoria_pai_id: Optional[int] = Field(default=None, foreign_key="categoria.id")  # ex.: "Não julgados" dentro de "CONHECIMENTO"
+    nome: str = Field(index=True)
+
+class Faixa(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    nome: str = Field(index=True, unique=True)  # ex.: "Total", "+60 dias", "+100 dias"
+
+class Metrica(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    unidade_id: int = Field(foreign_key="unidade.id", index=True)
+    categoria_id: int = Field(foreign_key="categoria.id", index=True)
+    faixa_id: int = Field(foreign_key="faixa.id", index=True)
+    valor: Optional[int] = None
+    valor_texto: Optional[str] = None
+
+class SerieMensal(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    unidade_id: int = Field(foreign_key="unidade.id", index=True)
+    categoria_id: int = Field(foreign_key="categoria.id", index=True)
+    mes: str  # rótulo original, ex.: "Set / 2024"
+    competencia: Optional[str] = Field(default=None, index=True)  # "2024-09", ordenável
+    valor: Optional[int] = None
+    valor_texto: Optional[str] = None
+
+class VersaoDados(SQLModel, table=True):
+    id: int = Field(default=1, primary_key=True)  # linha única
+    chave: Optional[str] = None  # versão e hash do snapshot gravado nas tabelas acima, ex.: "3-9f2c..."
+    sincronizado_em: datetime
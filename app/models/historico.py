@@ -0,0 +1,23 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+
+# Histórico das coletas: cada execução do scraper gera uma HistoricoColeta e
+# apenas os valores que mudaram desde a coleta anterior viram HistoricoValor.
+
+class HistoricoColeta(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    coletado_em: datetime = Field(index=True)
+    unidades: int = 0  # quantidade de unidades observadas nesta coleta
+
+class HistoricoCaminho(SQLModel, table=True):
+    # Dicionário de caminhos de métricas, ex.: "processos_em_tramitacao.TOTAL.+100 dias"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    caminho: str = Field(index=True, unique=True)
+
+class HistoricoValor(SQLModel, table=True):
+    coleta_id: int = Field(foreign_key="historicocoleta.id", primary_key=True)
+    unidade_id: int = Field(primary_key=True, index=True)
+    caminho_id: int = Field(foreign_key="historicocaminho.id", primary_key=True, index=True)
+    valor: Optional[int] = None
+    texto: Optional[str] = None  # None indica que o valor deixou de existir
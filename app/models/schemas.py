@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 class ProcessosNaoJulgados(BaseModel):
     total: Optional[str] = Field(..., example="100", alias="Total")
@@ -301,4 +301,13 @@ class UnidadeData(BaseModel):
     )
 
     class Config:
-        allow_population_by_field_name = True
\ No newline at end of file
+        allow_population_by_field_name = True
+
+class LoteUnidades(BaseModel):
+    unidades: List[int] = Field(..., min_length=1, max_length=500, example=[1, 2, 3])
+    secoes: List[str] = Field(
+        ...,
+        min_length=1,
+        example=["processos", "suspensos", "distribuicoes"],
+        description="Sufixos das rotas /unidades/{unit_id}/<secao>, ou \"unidade\" para a unidade completa"
+    )
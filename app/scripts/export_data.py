@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Script para exportação dos dados coletados em CSV ou Parquet
+"""
+
+import argparse
+import shutil
+from pathlib import Path
+
+from rich.console import Console
+from app.services.data_service import DataService
+from app.services.export import EXPORT_FORMATS, export_snapshot
+
+console = Console()
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta os dados coletados em formato tabular (uma linha por valor)")
+    parser.add_argument("--formato", choices=sorted(EXPORT_FORMATS), default="csv")
+    parser.add_argument("--saida", type=Path, help="Arquivo de destino (padrão: data/exports/)")
+    args = parser.parse_args()
+
+    data_service = DataService(auto_load=True)
+    if not data_service.snapshot.units:
+        console.print("[bold red]❌ Nenhum dado encontrado. Execute o scraper primeiro.[/]")
+        raise SystemExit(1)
+
+    # Reaproveita (ou gera) a exportação da versão atual, a mesma servida pela API
+    path = export_snapshot(data_service.snapshot, args.formato, data_service.exports_dir)
+    if args.saida is not None:
+        shutil.copyfile(path, args.saida)
+        path = args.saida
+
+    console.print(f"[bold green]✅ Dados exportados em: {path}[/]")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Script para pedir à API em execução que releia os dados coletados
+"""
+
+from rich.console import Console
+from app.services.data_service import DataService
+
+console = Console()
+
+def main():
+    data_service = DataService()
+    data_service.request_reload()
+    console.print(f"[bold green]✅ Releitura solicitada: {data_service.reload_file}[/]")
+    console.print("Os processos da API releem os dados na próxima requisição.")
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Script para execução manual do scraper
 from rich.console import Console
 from app.services.tjrn_scraper import TJRNScraper 
 from app.services.data_service import DataService
+from app.services.history_service import record_run
 
 console = Console()
 
@@ -20,6 +21,10 @@ def main():
         data_service.save_data(data)
         data_service.display_data_table()
 
+        # Acrescenta a coleta ao histórico (apenas os valores que mudaram)
+        coleta_id = record_run(data)
+        console.print(f"[green]✓ Coleta registrada no histórico (#{coleta_id})[/]")
+
         console.print("[bold green]✅ Coleta concluída com sucesso![/]")
     except Exception as e:
         console.print(f"[bold red]❌ Erro durante a coleta: {str(e)}[/]")
@@ -0,0 +1,146 @@
+import marshal
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+MAGIC = b"ADVSNAP\x00"
+FORMAT_VERSION = 2
+
+# magic, versão do formato, versão do marshal, versão do Python (major, minor),
+# versão dos dados, mtime_ns e tamanho do JSON de origem, quantidade de unidades,
+# tamanho e CRC32 do payload
+HEADER = struct.Struct("<8sHHBBQqqIQI")
+
+# Cada unidade é gravada como um registro independente: tamanho + marshal da unidade
+RECORD = struct.Struct("<I")
+
+
+class BinarySnapshot(NamedTuple):
+    data_version: int
+    source_signature: Tuple[int, int]
+    # Gerador: as unidades são decodificadas uma a uma, à medida que são consumidas
+    units: Iterator[Dict]
+
+
+def write_binary_snapshot(
+    path: Path,
+    units: Iterable[Dict],
+    source_signature: Tuple[int, int],
+    data_version: int = 0,
+) -> None:
+    """
+    Grava o conjunto de unidades em formato binário compacto (marshal)
+
+    As unidades são serializadas uma por vez (registros com prefixo de
+    tamanho), de modo que `units` pode ser um gerador e a lista inteira nunca
+    precisa existir em memória. O cabeçalho registra a assinatura
+    (mtime_ns, tamanho) do JSON de origem, permitindo que o leitor descarte o
+    binário se o JSON tiver sido alterado.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(b"\x00" * HEADER.size)
+            count = length = crc = 0
+            for unit in units:
+                blob = marshal.dumps(unit)
+                record = RECORD.pack(len(blob))
+                f.write(record)
+                f.write(blob)
+                crc = zlib.crc32(blob, zlib.crc32(record, crc))
+                length += RECORD.size + len(blob)
+                count += 1
+
+            f.seek(0)
+            f.write(HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                marshal.version,
+                sys.version_info.major,
+                sys.version_info.minor,
+                data_version,
+                source_signature[0],
+                source_signature[1],
+                count,
+                length,
+                crc,
+            ))
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _iter_records(mm: mmap.mmap, count: int) -> Iterator[Dict]:
+    """Decodifica os registros um a um; o mmap é fechado ao fim da leitura"""
+    try:
+        offset = HEADER.size
+        for _ in range(count):
+            (size,) = RECORD.unpack_from(mm, offset)
+            offset += RECORD.size
+            if offset + size > len(mm):
+                raise ValueError("Registro ultrapassa o fim do snapshot binário")
+            with memoryview(mm)[offset:offset + size] as record:
+                unit = marshal.loads(record)
+            if not isinstance(unit, dict):
+                raise ValueError("Registro do snapshot binário não é uma unidade")
+            offset += size
+            yield unit
+    finally:
+        mm.close()
+
+
+def read_binary_snapshot(
+    path: Path,
+    expected_source: Optional[Tuple[int, int]] = None,
+) -> Optional[BinarySnapshot]:
+    """
+    Abre um snapshot binário via mmap, sem passar por um parse de JSON
+
+    Cabeçalho e CRC são conferidos aqui; as unidades são decodificadas sob
+    demanda ao percorrer `units` (erros de decodificação, improváveis depois
+    do CRC, aparecem como ValueError durante a iteração).
+
+    Retorna None (para que o chamador use o JSON) se o arquivo não existir,
+    estiver corrompido, tiver sido gerado por outra versão do formato/Python
+    ou não corresponder a `expected_source`.
+    """
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if len(mm) < HEADER.size:
+            mm.close()
+            return None
+        (magic, format_version, marshal_version, py_major, py_minor,
+         data_version, source_mtime, source_size, count, length, crc) = HEADER.unpack_from(mm)
+
+        source_signature = (source_mtime, source_size)
+        if (
+            magic != MAGIC
+            or format_version != FORMAT_VERSION
+            or marshal_version != marshal.version
+            or (py_major, py_minor) != sys.version_info[:2]
+            or len(mm) != HEADER.size + length
+            or (expected_source is not None and source_signature != expected_source)
+        ):
+            mm.close()
+            return None
+
+        with memoryview(mm)[HEADER.size:] as payload:
+            valid = zlib.crc32(payload) == crc
+        if not valid:
+            mm.close()
+            return None
+    except (OSError, ValueError, struct.error):
+        mm.close()
+        return None
+
+    return BinarySnapshot(data_version, source_signature, _iter_records(mm, count))
@@ -0,0 +1,284 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from app.services.flatten import iter_section_values
+
+# Seções cujas categorias trazem uma série mensal ("mensal") e um "total"
+MONTHLY_SECTIONS = (
+    "demonstrativo_de_distribuicoes",
+    "processos_baixados",
+    "atos_judiciais_proferidos",
+)
+
+MONTH_ABBREVIATIONS = {
+    "JAN": 1, "FEV": 2, "MAR": 3, "ABR": 4, "MAI": 5, "JUN": 6,
+    "JUL": 7, "AGO": 8, "SET": 9, "OUT": 10, "NOV": 11, "DEZ": 12,
+}
+
+Path = Tuple[str, ...]
+
+# Operadores aceitos em filtros como "acervo_total__gt=5000"
+FILTER_OPERATORS = ("gt", "gte", "lt", "lte", "eq", "ne")
+
+
+def month_sort_key(label: str) -> Tuple[int, int]:
+    """Chave de ordenação cronológica para rótulos como "Set / 2024" """
+    parts = [p.strip() for p in label.split("/")]
+    if len(parts) == 2 and parts[1].isdigit():
+        month = MONTH_ABBREVIATIONS.get(parts[0][:3].upper())
+        if month:
+            return (int(parts[1]), month)
+    # Rótulos fora do padrão ficam no fim, na ordem em que apareceram
+    return (10 ** 6, 0)
+
+
+def _zeros(size: int) -> array:
+    return array("q", bytes(8 * size))
+
+
+class ColumnStore:
+    """
+    Representação colunar das métricas numéricas de todas as unidades
+
+    Cada métrica (seção, categoria, faixa) vira um `array` contíguo de inteiros
+    com uma posição por unidade, na mesma ordem de `Snapshot.units`. As séries
+    mensais viram matrizes unidades x meses armazenadas linha a linha.
+    Valores ausentes são guardados como 0 e marcados em `present`.
+    """
+
+    def __init__(self, numeric_units: List[Dict]):
+        self.size = len(numeric_units)
+        self.columns: Dict[Path, array] = {}
+        self.present: Dict[Path, bytearray] = {}
+        self.monthly: Dict[Path, array] = {}
+        self.monthly_present: Dict[Path, bytearray] = {}
+        self._paths: Dict[str, Path] = {}
+        self._rollup: Optional[Dict] = None
+        self._rankings: Dict[Tuple[Path, bool], array] = {}
+
+        monthly_rows: List[Dict[Path, Dict[str, Optional[int]]]] = []
+        month_labels: Dict[str, None] = {}
+
+        for row, unit in enumerate(numeric_units):
+            series: Dict[Path, Dict[str, Optional[int]]] = {}
+            for key, value in unit.items():
+                if key in ("id", "unidade"):
+                    continue
+                if not isinstance(value, dict):
+                    self._store(row, (key,), value)
+                    continue
+                monthly = key in MONTHLY_SECTIONS
+                for path, _, _, _, mes, item in iter_section_values(key, value):
+                    if mes is None or not monthly:
+                        self._store(row, path, item)
+                        continue
+                    # Série mensal: caminho da categoria, sem "mensal" e o mês
+                    path = path[:-2]
+                    values = series.get(path)
+                    if values is None:
+                        values = series[path] = {}
+                        # Registra o caminho na ordem do documento (usada em rollup)
+                        self._paths.setdefault(".".join(path), path)
+                    values[mes] = item
+            monthly_rows.append(series)
+
+        for series in monthly_rows:
+            for values in series.values():
+                month_labels.update(dict.fromkeys(values))
+        self.months: List[str] = sorted(month_labels, key=month_sort_key)
+        month_index = {label: i for i, label in enumerate(self.months)}
+        width = len(self.months)
+
+        for row, series in enumerate(monthly_rows):
+            for path, values in series.items():
+                if path not in self.monthly:
+                    self.monthly[path] = _zeros(self.size * width)
+                    self.monthly_present[path] = bytearray(self.size * width)
+                    self._paths[".".join(path)] = path
+                matrix = self.monthly[path]
+                mask = self.monthly_present[path]
+                for label, value in values.items():
+                    if value is None:
+                        continue
+                    offset = row * width + month_index[label]
+                    matrix[offset] = value
+                    mask[offset] = 1
+
+    def _store(self, row: int, path: Path, value) -> None:
+        if value is None:
+            return
+        column = self.columns.get(path)
+        if column is None:
+            column = self.columns[path] = _zeros(self.size)
+            self.present[path] = bytearray(self.size)
+            self._paths[".".join(path)] = path
+        column[row] = value
+        self.present[path][row] = 1
+
+    def resolve(self, path: Union[str, Path]) -> Optional[Path]:
+        """Converte "secao.categoria.faixa" (ou uma tupla) no caminho interno da métrica"""
+        if isinstance(path, tuple):
+            return path if path in self.columns or path in self.monthly else None
+        return self._paths.get(path)
+
+    def column(self, path: Union[str, Path]) -> Optional[array]:
+        """Array com o valor da métrica para cada unidade (0 onde ausente)"""
+        key = self.resolve(path)
+        return self.columns.get(key) if key else None
+
+    def sum(self, path: Union[str, Path]) -> int:
+        """Soma da métrica em todas as unidades"""
+        column = self.column(path)
+        return sum(column) if column is not None else 0
+
+    def count(self, path: Union[str, Path]) -> int:
+        """Quantidade de unidades que possuem valor para a métrica"""
+        key = self.resolve(path)
+        return sum(self.present[key]) if key in self.present else 0
+
+    def monthly_matrix(self, path: Union[str, Path]) -> Optional[array]:
+        """Matriz unidades x meses (linha a linha) de uma série mensal"""
+        key = self.resolve(path)
+        return self.monthly.get(key) if key else None
+
+    def monthly_sum(self, path: Union[str, Path]) -> Dict[str, int]:
+        """Soma mês a mês de uma série mensal em todas as unidades"""
+        matrix = self.monthly_matrix(path)
+        if matrix is None:
+            return {}
+        width = len(self.months)
+        return {
+            label: sum(matrix[i::width])
+            for i, label in enumerate(self.months)
+        }
+
+    def ranking(self, path: Union[str, Path], descending: bool = True) -> Optional[array]:
+        """
+        Posições (linhas) das unidades que têm valor para a métrica, ordenadas
+        pelo valor; empates seguem a ordem das unidades
+
+        O índice é calculado na primeira chamada para cada métrica/ordem e
+        reaproveitado depois. Retorna None se a métrica não for uma coluna.
+        """
+        key = self.resolve(path)
+        if key is None or key not in self.columns:
+            return None
+        cached = self._rankings.get((key, descending))
+        if cached is None:
+            column = self.columns[key]
+            mask = self.present[key]
+            rows = [row for row in range(self.size) if mask[row]]
+            if descending:
+                rows.sort(key=lambda row: -column[row])
+            else:
+                rows.sort(key=column.__getitem__)
+            cached = self._rankings[(key, descending)] = array("l", rows)
+        return cached
+
+    def rows_where(self, path: Union[str, Path], operator: str, value: int) -> Optional[Set[int]]:
+        """
+        Linhas das unidades cujo valor da métrica satisfaz `operator` (veja
+        FILTER_OPERATORS), por busca binária no índice ordenado de ranking
+
+        Unidades sem valor para a métrica nunca são selecionadas. Retorna None
+        se a métrica não for uma coluna.
+        """
+        rows = self.ranking(path, descending=False)
+        if rows is None:
+            return None
+        column = self.columns[self.resolve(path)]
+        start = bisect_left(rows, value, key=column.__getitem__)
+        end = bisect_right(rows, value, key=column.__getitem__)
+        if operator == "gt":
+            return set(rows[end:])
+        if operator == "gte":
+            return set(rows[start:])
+        if operator == "lt":
+            return set(rows[:start])
+        if operator == "lte":
+            return set(rows[:end])
+        if operator == "eq":
+            return set(rows[start:end])
+        if operator == "ne":
+            return set(rows[:start]) | set(rows[end:])
+        raise ValueError(f"Operador desconhecido: {operator}")
+
+    def rollup(self) -> Dict:
+        """
+        Totais de todas as métricas somadas entre as unidades, no mesmo formato
+        aninhado de uma unidade numérica (séries mensais somadas mês a mês)
+
+        Calculado uma única vez por ColumnStore.
+        """
+        if self._rollup is None:
+            self._rollup = self.group_rollup([0] * self.size, 1)[0]
+        return self._rollup
+
+    def group_rollup(self, groups: List[int], size: int) -> List[Dict]:
+        """
+        Totais por grupo de unidades em uma única passada por coluna
+
+        `groups[linha]` é o índice (0 a size-1) do grupo de cada unidade; linhas
+        com índice fora desse intervalo são ignoradas. Métricas sem valor em
+        nenhuma unidade do grupo ficam fora do resultado daquele grupo.
+        """
+        column_sums: Dict[Path, List[Optional[int]]] = {}
+        for path, column in self.columns.items():
+            sums: List[Optional[int]] = [None] * size
+            mask = self.present[path]
+            for row, value in enumerate(column):
+                group = groups[row]
+                if mask[row] and 0 <= group < size:
+                    sums[group] = (sums[group] or 0) + value
+            column_sums[path] = sums
+
+        width = len(self.months)
+        monthly_sums: Dict[Path, List[Dict[str, int]]] = {}
+        for path, matrix in self.monthly.items():
+            per_group: List[Dict[str, int]] = [{} for _ in range(size)]
+            mask = self.monthly_present[path]
+            for row in range(self.size):
+                group = groups[row]
+                if not 0 <= group < size:
+                    continue
+                totals = per_group[group]
+                base = row * width
+                for i, label in enumerate(self.months):
+                    if mask[base + i]:
+                        totals[label] = totals.get(label, 0) + matrix[base + i]
+            # Mantém a ordem cronológica dos meses
+            monthly_sums[path] = [
+                {label: totals[label] for label in self.months if label in totals}
+                for totals in per_group
+            ]
+
+        return [
+            self._tree(
+                lambda path, g=g: column_sums[path][g],
+                lambda path, g=g: monthly_sums[path][g] or None,
+            )
+            for g in range(size)
+        ]
+
+    def _tree(self, column_total, monthly_total) -> Dict:
+        """Monta o dicionário aninhado de totais, na ordem em que os caminhos aparecem nos dados"""
+        tree: Dict = {}
+        for path in self._paths.values():
+            is_monthly = path in self.monthly
+            value = monthly_total(path) if is_monthly else column_total(path)
+            if value is None:
+                continue
+            node = tree
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+                if not isinstance(node, dict):
+                    break
+            else:
+                if is_monthly:
+                    entry = node.setdefault(path[-1], {})
+                    if isinstance(entry, dict):
+                        entry["mensal"] = value
+                elif not isinstance(node.get(path[-1]), dict):
+                    node[path[-1]] = value
+        return tree
@@ -0,0 +1,153 @@
+import sys
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+class UnitShape:
+    """
+    Estrutura (chaves e aninhamento) de um dicionário de unidade, sem os valores
+
+    Unidades com a mesma estrutura compartilham o mesmo objeto UnitShape; os
+    valores folha ficam numa tupla plana, na ordem de percurso das chaves.
+    """
+
+    __slots__ = ("keys", "children", "offsets", "width", "index", "signature")
+
+    def __init__(self, keys: Tuple[str, ...], children: Tuple[Optional["UnitShape"], ...]):
+        self.keys = keys
+        self.children = children
+        self.index: Dict[str, int] = {key: i for i, key in enumerate(keys)}
+        offsets = []
+        width = 0
+        for child in children:
+            offsets.append(width)
+            width += 1 if child is None else child.width
+        self.offsets = tuple(offsets)
+        self.width = width
+        # Descrição serializável (marshal) da estrutura, usada nos hashes de conteúdo
+        self.signature = tuple(
+            (key, None if child is None else child.signature)
+            for key, child in zip(keys, children)
+        )
+
+    def build(self, values: Tuple, start: int = 0) -> Dict:
+        """Reconstrói o dicionário (formato original) a partir dos valores planos"""
+        result = {}
+        for key, child, offset in zip(self.keys, self.children, self.offsets):
+            position = start + offset
+            result[key] = values[position] if child is None else child.build(values, position)
+        return result
+
+
+class KeyTable:
+    """
+    Tabela de estruturas e rótulos compartilhada pelas unidades de um snapshot
+
+    Chaves ("Total", "+60 dias", "Set / 2024"...) e valores textuais são
+    internados, de modo que cada rótulo exista uma única vez em memória.
+    """
+
+    def __init__(self):
+        self.shapes: Dict[Tuple, UnitShape] = {}
+
+    def shape_of(self, data: Dict, values: list) -> UnitShape:
+        keys = []
+        children = []
+        for key, value in data.items():
+            keys.append(sys.intern(key) if isinstance(key, str) else key)
+            if isinstance(value, dict):
+                children.append(self.shape_of(value, values))
+            else:
+                children.append(None)
+                values.append(sys.intern(value) if type(value) is str else value)
+
+        signature = (tuple(keys), tuple(children))
+        shape = self.shapes.get(signature)
+        if shape is None:
+            shape = self.shapes[signature] = UnitShape(*signature)
+        return shape
+
+    def compact(self, unit: Dict) -> "CompactUnit":
+        """Converte o dicionário de uma unidade na representação compacta"""
+        if isinstance(unit, CompactUnit):
+            return unit
+        values: list = []
+        shape = self.shape_of(unit, values)
+        return CompactUnit(shape, tuple(values))
+
+
+class CompactUnit(Mapping):
+    """
+    Unidade armazenada como (estrutura compartilhada, tupla de valores)
+
+    Funciona como um dicionário somente leitura: cada acesso a uma seção
+    devolve um `dict` comum, reconstruído sob demanda, no formato original.
+    """
+
+    __slots__ = ("shape", "values")
+
+    def __init__(self, shape: UnitShape, values: Tuple):
+        self.shape = shape
+        self.values = values
+
+    def __getitem__(self, key: str) -> Any:
+        i = self.shape.index[key]
+        child = self.shape.children[i]
+        offset = self.shape.offsets[i]
+        return self.values[offset] if child is None else child.build(self.values, offset)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self.shape.index:
+            return default
+        return self[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.shape.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.shape.keys)
+
+    def __len__(self) -> int:
+        return len(self.shape.keys)
+
+    def __repr__(self) -> str:
+        return f"CompactUnit({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict:
+        """Dicionário completo no formato original (para serialização)"""
+        return self.shape.build(self.values)
+
+    def state(self, key: Optional[str] = None) -> Optional[Tuple]:
+        """
+        (estrutura, valores) da unidade inteira ou de um campo de primeiro
+        nível, em forma serializável (tuplas, strings e números); None se o
+        campo não existir
+        """
+        if key is None:
+            return (self.shape.signature, self.values)
+        i = self.shape.index.get(key)
+        if i is None:
+            return None
+        child = self.shape.children[i]
+        offset = self.shape.offsets[i]
+        if child is None:
+            return (None, self.values[offset])
+        return (child.signature, self.values[offset:offset + child.width])
+
+    def map_values(self, convert: Callable[[Any], Any], keep: Tuple[str, ...] = ()) -> "CompactUnit":
+        """
+        Nova unidade com a mesma estrutura e cada valor folha convertido,
+        exceto os campos de primeiro nível em `keep`
+        """
+        skip = set()
+        for key in keep:
+            i = self.shape.index.get(key)
+            if i is not None:
+                child = self.shape.children[i]
+                start = self.shape.offsets[i]
+                skip.update(range(start, start + (1 if child is None else child.width)))
+        return CompactUnit(
+            self.shape,
+            tuple(value if i in skip else convert(value) for i, value in enumerate(self.values)),
+        )
+
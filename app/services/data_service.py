@@ -1,19 +1,60 @@
 import json
+import os
+import shutil
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterable, List, Dict, Optional, Tuple
 from rich.table import Table
 from rich.console import Console
 
+from app.services.binary_snapshot import read_binary_snapshot, write_binary_snapshot
+from app.services.json_stream import iter_json_array
+from app.services.snapshot import Snapshot
+
 console = Console()
 
+
+def _fsync_dir(path: Path):
+    """Garante que renomeações no diretório cheguem ao disco (sem efeito no Windows)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _tmp_path(path: Path) -> Path:
+    """Nome temporário ao lado de `path`, único por processo e por thread"""
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _fsync_file(path: Path):
+    with open(path, "r+b") as f:
+        os.fsync(f.fileno())
+
 class DataService:
-    def __init__(self, data_file: str = None, auto_load: bool = False):
+    def __init__(
+        self,
+        data_file: str = None,
+        auto_load: bool = False,
+        keep_snapshots: int = 5,
+        sync_db: bool = False,
+    ):
         """
         Inicializa o serviço de dados
         
         Args:
             data_file: Caminho customizado para o arquivo de dados
             auto_load: Se True, carrega os dados automaticamente na inicialização
+            keep_snapshots: Quantidade de versões anteriores mantidas em disco
+            sync_db: Se True, cada nova versão carregada também é gravada nas
+                tabelas normalizadas do banco (uma vez por versão)
         """
         # Define o caminho base relativo ao arquivo atual
         base_dir = Path(__file__).parent.parent.parent  # Ajusta para a raiz do projeto
@@ -23,62 +64,395 @@ class DataService:
         
         # Converte para caminho absoluto e resolve qualquer ./
         self.data_file = self.data_file.resolve()
+
+        # Versões imutáveis gravadas por save_data (dados_tjrn-000001.json, ...) e
+        # ponteiro para a versão atual; dados_tjrn.json continua sendo atualizado
+        # para quem lê o arquivo diretamente e, se for substituído por fora,
+        # é importado como uma nova versão
+        self.snapshots_dir = self.data_file.parent / "snapshots"
+        self.current_file = self.data_file.with_suffix(".current")
+        # Arquivo tocado por request_reload() para pedir a releitura aos processos da API
+        self.reload_file = self.data_file.with_suffix(".reload")
+        self.keep_snapshots = keep_snapshots
+        # Exportações em CSV/Parquet geradas uma vez por versão (veja services/export.py)
+        self.exports_dir = self.data_file.parent / "exports"
+        self.sync_db = sync_db
         
         self.data = []
+        self._loaded = False
+        self._file_signature: Optional[Tuple] = None
+        self._reload_lock = threading.Lock()
         if auto_load:
             self.load_data()
         
         self.debug_file_path()  # Mostra informações de debug ao inicializar
+
+    @property
+    def data(self) -> List[Dict]:
+        return self.snapshot.units
+
+    @data.setter
+    def data(self, units: List[Dict]):
+        # Os índices são reconstruídos uma vez por conjunto de dados carregado;
+        # a troca do snapshot é uma única atribuição, segura para leitores concorrentes
+        self.snapshot = Snapshot(units)
+
+    @property
+    def version(self) -> int:
+        """Versão do snapshot carregado (0 quando não há versões gravadas)"""
+        return self.snapshot.version
+
+    @staticmethod
+    def _stat_signature(path: Path) -> Optional[Tuple[int, int]]:
+        """Retorna (mtime_ns, tamanho) do arquivo, ou None se ele não existir"""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
     
+    def _read_file_signature(self) -> Tuple:
+        """Assinatura do ponteiro de versão, do arquivo de dados e do pedido de releitura"""
+        return (
+            self._stat_signature(self.current_file),
+            self._stat_signature(self.data_file),
+            self._stat_signature(self.reload_file),
+        )
+
+    def is_stale(self) -> bool:
+        """Indica se o arquivo mudou (mtime/tamanho) desde a última leitura"""
+        return not self._loaded or self._read_file_signature() != self._file_signature
+
+    def refresh(self) -> bool:
+        """
+        Recarrega os dados somente se o arquivo tiver mudado desde a última leitura
+
+        Returns:
+            True se os dados foram recarregados
+        """
+        if not self.is_stale():
+            return False
+        with self._reload_lock:
+            # Outra thread pode ter recarregado enquanto esperávamos o lock
+            if not self.is_stale():
+                return False
+            self.load_data()
+            return True
+
+    def reload(self) -> List[Dict]:
+        """Força a releitura do arquivo de dados, independente de mudanças"""
+        with self._reload_lock:
+            return self.load_data()
+
+    def request_reload(self):
+        """
+        Pede a releitura dos dados a todos os processos que usam este arquivo
+
+        Atualiza o arquivo .reload ao lado do arquivo de dados; cada processo
+        da API (ex.: cada worker do uvicorn) o detecta na próxima requisição,
+        via refresh(), e relê os dados como reload().
+        """
+        self.reload_file.parent.mkdir(parents=True, exist_ok=True)
+        self.reload_file.write_text(f"{time.time_ns()}\n", encoding="utf-8")
+
+    def _snapshot_path(self, version: int) -> Path:
+        return self.snapshots_dir / f"{self.data_file.stem}-{version:06d}.json"
+
+    def _snapshot_versions(self) -> List[int]:
+        """Versões gravadas em disco, em ordem crescente"""
+        prefix = f"{self.data_file.stem}-"
+        versions = []
+        for path in self.snapshots_dir.glob(f"{prefix}*.json"):
+            suffix = path.stem[len(prefix):]
+            if suffix.isdigit():
+                versions.append(int(suffix))
+        return sorted(versions)
+
+    def _read_current_pointer(self) -> Tuple[int, Optional[Tuple[int, int]]]:
+        """
+        Retorna (versão atual, assinatura de dados_tjrn.json registrada ao publicá-la)
+
+        A assinatura é None em ponteiros gravados antes de ela ser registrada.
+        """
+        try:
+            lines = self.current_file.read_text(encoding="utf-8").split()
+            version = int(lines[0])
+        except (OSError, ValueError, IndexError):
+            return 0, None
+        try:
+            published = (int(lines[1]), int(lines[2]))
+        except (ValueError, IndexError):
+            published = None
+        return version, published
+
+    def _read_current_version(self) -> int:
+        return self._read_current_pointer()[0]
+
+    def _current_source(self) -> Tuple[int, Path]:
+        """Retorna (versão, arquivo JSON) do snapshot apontado como atual"""
+        version = self._read_current_version()
+        if version:
+            path = self._snapshot_path(version)
+            if path.exists():
+                return version, path
+        # Sem ponteiro válido: usa o arquivo de dados diretamente
+        return 0, self.data_file
+
+    def _data_file_replaced(self, version: int, source: Path) -> bool:
+        """
+        Indica se dados_tjrn.json foi substituído por fora de save_data (ex.: uma
+        cópia manual) depois que a versão atual foi publicada
+
+        Um arquivo ainda sem versão (ex.: o distribuído com o repositório) também
+        é importado, para que todo conteúdo novo receba um número de versão.
+        """
+        current = self._stat_signature(self.data_file)
+        if current is None:
+            return False
+        if not version:
+            return True
+        _, published = self._read_current_pointer()
+        if published is not None:
+            return current != published
+        # Ponteiro sem assinatura: compara com a data da versão apontada
+        source_signature = self._stat_signature(source)
+        return source_signature is not None and current[0] > source_signature[0]
+
     def load_data(self) -> List[Dict]:
-        """Carrega os dados do arquivo JSON"""
+        """Carrega os dados do snapshot atual (ou do arquivo JSON, se não houver versões)"""
+        data = self._load_snapshot()
+        if self.sync_db and self.data:
+            # Sem efeito se o banco já tiver esta versão (ex.: gravada por outro worker)
+            self._sync_db(self.snapshot)
+        return data
+
+    def _load_snapshot(self) -> List[Dict]:
+        # A assinatura é lida antes do arquivo: se ele mudar durante a leitura,
+        # a próxima chamada a refresh() detecta a diferença e recarrega
+        self._file_signature = self._read_file_signature()
+        self._loaded = True
         try:
-            if not self.data_file.exists():
+            version, source = self._current_source()
+            if self._data_file_replaced(version, source):
+                try:
+                    return self._import_data_file()
+                except json.JSONDecodeError as e:
+                    # Arquivo substituído por um JSON inválido: segue com a versão atual
+                    console.print(f"[red]❌ Erro ao decodificar {self.data_file}, mantendo a versão {version}: {str(e)}[/]")
+            if not source.exists():
                 console.print(f"[yellow]⚠ Arquivo não encontrado: {self.data_file}[/]")
                 self.data = []
                 return self.data
-                
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if not data:
-                    console.print("[yellow]⚠ Arquivo vazio ou sem dados válidos[/]")
-                self.data = data
-                return self.data
-                
+
+            source_signature = self._stat_signature(source)
+            binary = read_binary_snapshot(source.with_suffix(".bin"), expected_source=source_signature)
+            if binary is not None:
+                try:
+                    self.snapshot = Snapshot(binary.units, version=version, modified=source_signature[0] / 1e9)
+                    return self.data
+                except (ValueError, EOFError, TypeError) as e:
+                    console.print(f"[yellow]⚠ Snapshot binário inválido, lendo o JSON: {str(e)}[/]")
+
+            # Leitura incremental: cada unidade vai direto para o snapshot,
+            # sem manter o texto do arquivo inteiro em memória
+            self.snapshot = Snapshot(iter_json_array(source), version=version, modified=source_signature[0] / 1e9)
+            if not self.data:
+                console.print("[yellow]⚠ Arquivo vazio ou sem dados válidos[/]")
+
+            # Próximas inicializações (ex.: novos workers) leem o binário direto;
+            # ele é gravado unidade a unidade a partir do snapshot compacto
+            units = (unit.to_dict() for unit in self.snapshot.units)
+            self._write_binary_snapshot(units, source, source_signature, version)
+            return self.data
+
         except json.JSONDecodeError as e:
+            # Mantém o último snapshot completo carregado
             console.print(f"[red]❌ Erro ao decodificar JSON: {str(e)}[/]")
-            self.data = []
             return self.data
         except Exception as e:
             console.print(f"[red]❌ Erro inesperado: {str(e)}[/]")
-            self.data = []
             return self.data
     
-    def save_data(self, data: List[Dict], auto_load: bool = True):
+    def save_data(self, data: List[Dict], auto_load: bool = True, sync_db: bool = True):
         """
-        Salva os dados no arquivo JSON
+        Salva os dados como uma nova versão e a publica como atual
+
+        A versão é gravada em um arquivo temporário, sincronizada com o disco
+        (fsync) e só então renomeada; o ponteiro de versão atual é trocado por
+        último, também com rename atômico. Leitores concorrentes veem sempre a
+        versão anterior completa ou a nova completa.
         
         Args:
             data: Dados a serem salvos
             auto_load: Se True, carrega os dados após salvar
+            sync_db: Se True, também grava os dados nas tabelas normalizadas do banco
         """
         try:
             # Cria o diretório se não existir
-            self.data_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+
+            version, snapshot_file = self._write_new_snapshot(data)
+            signature = self._stat_signature(snapshot_file)
+            self._write_binary_snapshot(data, snapshot_file, signature, version)
+            self._publish(version, snapshot_file)
+            self._prune_snapshots(version)
                 
-            console.print(f"[green]✓ Dados salvos em: {self.data_file}[/]")
+            console.print(f"[green]✓ Dados salvos em: {self.data_file} (versão {version})[/]")
+
+            snapshot = Snapshot(data, version=version, modified=signature[0] / 1e9)
+            if sync_db:
+                self._sync_db(snapshot)
             
             if auto_load:
-                self.data = data  # Atualiza os dados em memória sem ler do arquivo
-                # Alternativa: self.load_data() se quiser ler do arquivo
+                # Atualiza os dados em memória sem ler do arquivo
+                self.snapshot = snapshot
+                self._file_signature = self._read_file_signature()
+                self._loaded = True
                 
         except Exception as e:
             console.print(f"[red]❌ Falha ao salvar dados: {str(e)}[/]")
             raise
+
+    def _write_new_snapshot(self, data: List[Dict]) -> Tuple[int, Path]:
+        """Grava `data` como a próxima versão, sem nunca sobrescrever uma versão existente"""
+        tmp_path = _tmp_path(self.snapshots_dir / f"{self.data_file.stem}.json")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            return self._add_version(tmp_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _add_version(self, tmp_path: Path) -> Tuple[int, Path]:
+        """Dá ao arquivo já gravado em `tmp_path` o próximo número de versão livre"""
+        versions = self._snapshot_versions()
+        version = max(versions[-1] if versions else 0, self._read_current_version()) + 1
+        while True:
+            target = self._snapshot_path(version)
+            try:
+                # link() falha se o destino já existir: duas gravações
+                # simultâneas nunca ficam com o mesmo número de versão
+                os.link(tmp_path, target)
+                break
+            except FileExistsError:
+                version += 1
+            except OSError:
+                # Sistema de arquivos sem suporte a hard links
+                if target.exists():
+                    version += 1
+                    continue
+                os.replace(tmp_path, target)
+                break
+
+        _fsync_dir(self.snapshots_dir)
+        return version, target
+
+    def _import_data_file(self) -> List[Dict]:
+        """
+        Importa dados_tjrn.json, alterado por fora de save_data, como uma nova versão
+
+        O arquivo é copiado e lido a partir da cópia; só depois de lido sem
+        erros ele recebe um número de versão e passa a ser o atual. Um JSON
+        inválido propaga JSONDecodeError e mantém a versão anterior.
+        """
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        # Assinatura anterior à cópia: se o arquivo mudar durante a importação,
+        # a diferença é detectada na próxima chamada a refresh()
+        data_signature = self._stat_signature(self.data_file)
+        tmp_path = _tmp_path(self.snapshots_dir / f"{self.data_file.stem}.json")
+        try:
+            shutil.copyfile(self.data_file, tmp_path)
+            _fsync_file(tmp_path)
+            snapshot = Snapshot(iter_json_array(tmp_path))
+            version, snapshot_file = self._add_version(tmp_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        self._write_pointer(version, data_signature)
+        self._prune_snapshots(version)
+        self._file_signature = (
+            self._stat_signature(self.current_file), data_signature, self._stat_signature(self.reload_file)
+        )
+        console.print(f"[green]✓ {self.data_file} importado como versão {version}[/]")
+
+        signature = self._stat_signature(snapshot_file)
+        snapshot.version = version
+        snapshot.last_modified = signature[0] / 1e9
+        self.snapshot = snapshot
+        units = (unit.to_dict() for unit in snapshot.units)
+        self._write_binary_snapshot(units, snapshot_file, signature, version)
+        return self.data
+
+    def _publish(self, version: int, snapshot_file: Path):
+        """Atualiza dados_tjrn.json e, por último, o ponteiro para a versão atual"""
+        # Cópia, e não hard link: uma alteração em dados_tjrn.json nunca
+        # atinge a versão imutável
+        tmp_data = _tmp_path(self.data_file)
+        try:
+            shutil.copyfile(snapshot_file, tmp_data)
+            _fsync_file(tmp_data)
+            os.replace(tmp_data, self.data_file)
+        finally:
+            tmp_data.unlink(missing_ok=True)
+        self._write_pointer(version, self._stat_signature(self.data_file))
+
+    def _write_pointer(self, version: int, data_signature: Optional[Tuple[int, int]]):
+        """
+        Grava o ponteiro de versão atual junto com a assinatura de dados_tjrn.json
+        correspondente a ela, usada para detectar substituições externas do arquivo
+        """
+        tmp_current = _tmp_path(self.current_file)
+        with open(tmp_current, 'w', encoding='utf-8') as f:
+            f.write(f"{version}\n")
+            if data_signature is not None:
+                f.write(f"{data_signature[0]} {data_signature[1]}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_current, self.current_file)
+        _fsync_dir(self.data_file.parent)
+
+    def _prune_snapshots(self, current_version: int):
+        """Remove as versões mais antigas, mantendo as `keep_snapshots` mais recentes"""
+        versions = self._snapshot_versions()
+        keep = set(versions[-self.keep_snapshots:]) if self.keep_snapshots > 0 else set()
+        keep.add(current_version)
+        for version in versions:
+            if version in keep:
+                continue
+            path = self._snapshot_path(version)
+            path.unlink(missing_ok=True)
+            path.with_suffix(".bin").unlink(missing_ok=True)
     
+    def _write_binary_snapshot(
+        self,
+        data: Iterable[Dict],
+        source: Path,
+        signature: Optional[Tuple[int, int]],
+        version: int = 0,
+    ):
+        """Grava a cópia binária de `source`; falhas não impedem o uso do JSON"""
+        if signature is None:
+            return
+        try:
+            write_binary_snapshot(source.with_suffix(".bin"), data, signature, data_version=version)
+        except (OSError, ValueError) as e:
+            console.print(f"[yellow]⚠ Não foi possível gravar o snapshot binário: {str(e)}[/]")
+
+    def _sync_db(self, snapshot: Snapshot):
+        """
+        Grava o snapshot nas tabelas do banco, identificado pela versão e pelo
+        hash do conteúdo; uma falha aqui não invalida os dados salvos ou carregados
+        """
+        # Import tardio: o scraper não precisa do banco para funcionar
+        from app.services.db_sync import sync_units_to_db
+        try:
+            if sync_units_to_db(snapshot.units, versao=f"{snapshot.version}-{snapshot.digest()}"):
+                console.print("[green]✓ Dados gravados no banco[/]")
+        except Exception as e:
+            console.print(f"[yellow]⚠ Não foi possível gravar os dados no banco: {str(e)}[/]")
+
     def display_data_table(self):
         if not self.data:
             console.print("[red]Nenhum dado disponível para exibição[/]")
@@ -107,4 +481,27 @@ class DataService:
         
         if self.data_file.exists():
             console.print(f"• Tamanho: {self.data_file.stat().st_size} bytes")
-            console.print(f"• Última modificação: {self.data_file.stat().st_mtime}")
\ No newline at end of file
+            console.print(f"• Última modificação: {self.data_file.stat().st_mtime}")
+
+
+_shared_service: Optional[DataService] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_data_service() -> DataService:
+    """
+    Retorna a instância única (por processo) do DataService usada pela API.
+
+    Os dados são lidos do disco apenas na primeira chamada e, depois disso,
+    somente quando o mtime ou o tamanho do arquivo mudam, ou quando outro
+    processo pede a releitura (veja request_reload). Cada versão
+    carregada é gravada também nas tabelas do banco, se ainda não estiver lá.
+    """
+    global _shared_service
+    if _shared_service is None:
+        with _shared_lock:
+            if _shared_service is None:
+                _shared_service = DataService(auto_load=True, sync_db=True)
+                return _shared_service
+    _shared_service.refresh()
+    return _shared_service
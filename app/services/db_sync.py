@@ -0,0 +1,215 @@
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert
+from sqlmodel import Session, SQLModel, select
+
+from app.core import database
+from app.models.dados import Categoria, Faixa, Metrica, Secao, SerieMensal, Unidade, VersaoDados
+from app.services.columnar import month_sort_key
+from app.services.flatten import FlatValue, iter_section_values
+from app.services.numeric import parse_br_int
+
+DATA_TABLES = [Unidade, Secao, Categoria, Faixa, Metrica, SerieMensal]
+
+_sync_lock = threading.Lock()
+
+
+def competencia(label: str) -> Optional[str]:
+    """Converte "Set / 2024" em "2024-09" (None se o rótulo não seguir o padrão)"""
+    year, month = month_sort_key(label)
+    return f"{year:04d}-{month:02d}" if month else None
+
+
+class _Rows:
+    """Acumula as linhas das tabelas, atribuindo IDs às dimensões (seção, categoria, faixa)"""
+
+    def __init__(self):
+        self.unidades: List[Dict] = []
+        self.secoes: Dict[str, int] = {}
+        self.categorias: Dict[Tuple[int, Optional[int], str], int] = {}
+        self.faixas: Dict[str, int] = {}
+        self.metricas: List[Dict] = []
+        self.series: List[Dict] = []
+
+    def secao(self, nome: str) -> int:
+        return self.secoes.setdefault(nome, len(self.secoes) + 1)
+
+    def categoria(self, secao_id: int, pai_id: Optional[int], nome: str) -> int:
+        return self.categorias.setdefault((secao_id, pai_id, nome), len(self.categorias) + 1)
+
+    def faixa(self, nome: str) -> int:
+        return self.faixas.setdefault(nome, len(self.faixas) + 1)
+
+    def metrica(self, unidade_id: int, categoria_id: int, faixa: str, valor) -> None:
+        self.metricas.append({
+            "unidade_id": unidade_id,
+            "categoria_id": categoria_id,
+            "faixa_id": self.faixa(faixa),
+            "valor": parse_br_int(valor),
+            "valor_texto": None if valor is None else str(valor),
+        })
+
+    def add_value(self, unidade_id: int, secao_id: int, value: FlatValue) -> None:
+        categoria_id = None
+        for nome in value.categorias:
+            categoria_id = self.categoria(secao_id, categoria_id, nome)
+
+        if value.mes is None:
+            self.metrica(unidade_id, categoria_id, value.faixa, value.valor)
+            return
+        self.series.append({
+            "unidade_id": unidade_id,
+            "categoria_id": categoria_id,
+            "mes": value.mes,
+            "competencia": competencia(value.mes),
+            "valor": parse_br_int(value.valor),
+            "valor_texto": None if value.valor is None else str(value.valor),
+        })
+
+    def add_unit(self, unit: Dict) -> None:
+        unidade_id = unit.get("id")
+        if unidade_id is None:
+            return
+        acervo = unit.get("acervo_total")
+        self.unidades.append({
+            "id": unidade_id,
+            "nome": unit.get("unidade") or "",
+            "acervo_total": parse_br_int(acervo),
+            "acervo_total_texto": None if acervo is None else str(acervo),
+        })
+
+        for secao, conteudo in unit.items():
+            if not isinstance(conteudo, dict):
+                continue
+            secao_id = self.secao(secao)
+            for value in iter_section_values(secao, conteudo):
+                self.add_value(unidade_id, secao_id, value)
+
+
+def sync_state(session: Session) -> Optional[VersaoDados]:
+    """Versão dos dados gravada por último nas tabelas (None se nunca houve sincronização)"""
+    return session.get(VersaoDados, 1)
+
+
+def sync_units_to_db(units: Iterable[Dict], engine=None, versao: Optional[str] = None) -> bool:
+    """
+    Substitui o conteúdo das tabelas de dados coletados pelo conjunto `units`
+
+    Args:
+        units: Unidades no formato do arquivo dados_tjrn.json
+        engine: Engine do SQLAlchemy (padrão: banco da aplicação)
+        versao: Identificação do conjunto (ex.: versão e hash do snapshot); se
+            for a mesma já registrada no banco, as tabelas não são reescritas
+
+    Returns:
+        True se as tabelas foram (re)escritas
+    """
+    engine = engine or database.engine
+    SQLModel.metadata.create_all(engine, tables=[model.__table__ for model in DATA_TABLES + [VersaoDados]])
+
+    # Vários processos podem carregar a mesma versão ao mesmo tempo: a chave
+    # evita a regravação, e uma regravação concorrente escreve o mesmo conteúdo
+    with _sync_lock:
+        if versao is not None:
+            with Session(engine) as session:
+                state = sync_state(session)
+                if state is not None and state.chave == versao:
+                    return False
+
+        rows = _Rows()
+        seen = set()
+        for unit in units:
+            # IDs repetidos: prevalece a primeira ocorrência, como na API
+            if unit.get("id") in seen:
+                continue
+            seen.add(unit.get("id"))
+            rows.add_unit(unit)
+
+        with Session(engine) as session:
+            for model in reversed(DATA_TABLES):
+                session.execute(delete(model))
+
+            if rows.unidades:
+                session.execute(insert(Unidade), rows.unidades)
+            if rows.secoes:
+                session.execute(insert(Secao), [{"id": i, "nome": n} for n, i in rows.secoes.items()])
+            if rows.categorias:
+                session.execute(insert(Categoria), [
+                    {"id": i, "secao_id": s, "categoria_pai_id": p, "nome": n}
+                    for (s, p, n), i in rows.categorias.items()
+                ])
+            if rows.faixas:
+                session.execute(insert(Faixa), [{"id": i, "nome": n} for n, i in rows.faixas.items()])
+            if rows.metricas:
+                session.execute(insert(Metrica), rows.metricas)
+            if rows.series:
+                session.execute(insert(SerieMensal), rows.series)
+            session.merge(VersaoDados(id=1, chave=versao, sincronizado_em=datetime.now(timezone.utc)))
+            session.commit()
+    return True
+
+
+def _metric_filters(statement, secao: str, categoria: str, faixa: str, subcategoria: Optional[str]):
+    statement = (
+        statement
+        .join(Categoria, Metrica.categoria_id == Categoria.id)
+        .join(Secao, Categoria.secao_id == Secao.id)
+        .join(Faixa, Metrica.faixa_id == Faixa.id)
+        .where(Secao.nome == secao, Faixa.nome == faixa)
+    )
+    if subcategoria is None:
+        return statement.where(Categoria.nome == categoria, Categoria.categoria_pai_id.is_(None))
+
+    pai = Categoria.__table__.alias("categoria_pai")
+    return (
+        statement
+        .join(pai, Categoria.categoria_pai_id == pai.c.id)
+        .where(pai.c.nome == categoria, Categoria.nome == subcategoria)
+    )
+
+
+def query_metric(
+    session: Session,
+    secao: str,
+    categoria: str,
+    faixa: str = "Total",
+    subcategoria: Optional[str] = None,
+    minimo: Optional[int] = None,
+    maximo: Optional[int] = None,
+    limite: Optional[int] = None,
+) -> Dict:
+    """
+    Consulta uma métrica em todas as unidades via SQL
+
+    Retorna a soma e a contagem entre as unidades filtradas e a lista de
+    unidades (id, nome, valor), em ordem decrescente de valor.
+    """
+    conditions = []
+    if minimo is not None:
+        conditions.append(Metrica.valor >= minimo)
+    if maximo is not None:
+        conditions.append(Metrica.valor <= maximo)
+
+    total_stmt = _metric_filters(
+        select(func.coalesce(func.sum(Metrica.valor), 0), func.count(Metrica.valor)).select_from(Metrica),
+        secao, categoria, faixa, subcategoria,
+    ).where(*conditions)
+    total, quantidade = session.exec(total_stmt).one()
+
+    units_stmt = _metric_filters(
+        select(Unidade.id, Unidade.nome, Metrica.valor).join(Metrica, Metrica.unidade_id == Unidade.id),
+        secao, categoria, faixa, subcategoria,
+    ).where(*conditions).order_by(Metrica.valor.desc(), Unidade.id)
+    if limite is not None:
+        units_stmt = units_stmt.limit(limite)
+
+    return {
+        "total": total,
+        "quantidade": quantidade,
+        "unidades": [
+            {"id": unidade_id, "unidade": nome, "valor": valor}
+            for unidade_id, nome, valor in session.exec(units_stmt).all()
+        ],
+    }
@@ -0,0 +1,130 @@
+import csv
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.services.db_sync import competencia
+from app.services.flatten import iter_unit_values
+from app.services.numeric import parse_br_int
+from app.services.snapshot import Snapshot
+
+# Uma linha por valor coletado (formato "long"/tidy)
+COLUMNS = (
+    "unidade_id",
+    "unidade",
+    "secao",
+    "categoria",
+    "subcategoria",
+    "faixa",        # "Total", "+60 dias"... ou o mês ("Set / 2024") nas séries mensais
+    "competencia",  # "2024-09" nas séries mensais
+    "valor",
+    "valor_texto",
+)
+
+Row = Tuple
+
+_export_lock = threading.Lock()
+
+
+def _value_row(base: Tuple, categoria, subcategoria, faixa: str, valor, mes: Optional[str] = None) -> Row:
+    return base + (
+        categoria,
+        subcategoria,
+        faixa,
+        competencia(mes) if mes is not None else None,
+        parse_br_int(valor),
+        None if valor is None else str(valor),
+    )
+
+
+def iter_rows(units: Iterable[Dict]) -> Iterator[Row]:
+    """
+    Percorre as unidades gerando uma linha (na ordem de COLUMNS) por valor
+    coletado, sem montar a tabela inteira em memória
+    """
+    seen = set()
+    for unit in units:
+        unidade_id = unit.get("id")
+        # IDs repetidos: prevalece a primeira ocorrência, como na API
+        if unidade_id is None or unidade_id in seen:
+            continue
+        seen.add(unidade_id)
+        nome = unit.get("unidade")
+
+        if "acervo_total" in unit:
+            yield _value_row((unidade_id, nome, "acervo_total"), None, None, "Total", unit["acervo_total"])
+
+        for value in iter_unit_values(unit):
+            categoria, *subcategorias = value.categorias
+            yield _value_row(
+                (unidade_id, nome, value.secao),
+                categoria,
+                " / ".join(subcategorias) or None,
+                value.faixa,
+                value.valor,
+                value.mes,
+            )
+
+
+def write_csv(path: Path, units: Iterable[Dict]) -> None:
+    """Grava a tabela em CSV (UTF-8, separador vírgula), linha a linha"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(iter_rows(units))
+
+
+def write_parquet(path: Path, units: Iterable[Dict]) -> None:
+    """Grava a tabela em Parquet (colunas tipadas, compressão zstd)"""
+    columns = {name: [] for name in COLUMNS}
+    for row in iter_rows(units):
+        for name, value in zip(COLUMNS, row):
+            columns[name].append(value)
+
+    schema = pa.schema([
+        (name, pa.int64() if name in ("unidade_id", "valor") else pa.string())
+        for name in COLUMNS
+    ])
+    pq.write_table(pa.table(columns, schema=schema), path, compression="zstd")
+
+
+# formato -> (extensão, função de gravação, media type)
+EXPORT_FORMATS: Dict[str, Tuple[str, Callable[[Path, Iterable[Dict]], None], str]] = {
+    "csv": (".csv", write_csv, "text/csv; charset=utf-8"),
+    "parquet": (".parquet", write_parquet, "application/vnd.apache.parquet"),
+}
+
+
+def export_snapshot(snapshot: Snapshot, formato: str, directory: Path) -> Path:
+    """
+    Arquivo de exportação do snapshot no formato pedido, gerado na primeira
+    chamada e reaproveitado enquanto os dados não mudarem
+
+    O nome do arquivo inclui a versão e o hash do conteúdo do snapshot;
+    exportações de versões anteriores no mesmo formato são removidas.
+    """
+    suffix, writer, _ = EXPORT_FORMATS[formato]
+    name = f"dados_tjrn-{snapshot.version:06d}-{snapshot.digest()}{suffix}"
+    path = directory / name
+    if path.exists():
+        return path
+
+    with _export_lock:
+        if path.exists():
+            return path
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = directory / f".{name}.{os.getpid()}.tmp"
+        try:
+            writer(tmp_path, snapshot.units)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        for old in directory.glob(f"dados_tjrn-*{suffix}"):
+            if old != path:
+                old.unlink(missing_ok=True)
+    return path
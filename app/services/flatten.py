@@ -0,0 +1,56 @@
+from typing import Any, Dict, Iterator, Mapping, NamedTuple, Optional, Tuple
+
+
+class FlatValue(NamedTuple):
+    """Um valor coletado, com a sua posição na estrutura seção -> categoria -> faixa"""
+
+    # Chaves originais até o valor, ex.: ("processos_baixados", "Baixados", "mensal", "Set / 2024")
+    path: Tuple[str, ...]
+    secao: str
+    # Categoria e subcategorias, ex.: ("CONHECIMENTO", "Não julgados")
+    categorias: Tuple[str, ...]
+    # "Total", "+60 dias"... ou o mês ("Set / 2024") nas séries mensais
+    faixa: str
+    # Rótulo do mês nas séries mensais, None nas demais faixas
+    mes: Optional[str]
+    valor: Any
+
+
+# Construtor direto da tupla: evita o __new__ em Python gerado para o NamedTuple,
+# que pesa quando o conjunto inteiro de dados é percorrido
+_new = tuple.__new__
+
+
+def _category_values(secao: str, categorias: Tuple[str, ...], path: Tuple[str, ...], valor) -> Iterator[FlatValue]:
+    if not isinstance(valor, dict):
+        # Ex.: controle_de_prisoes -> {"Preventiva": "2"}
+        yield _new(FlatValue, (path, secao, categorias, "Total", None, valor))
+        return
+
+    for chave, item in valor.items():
+        if not isinstance(item, dict):
+            yield _new(FlatValue, (path + (chave,), secao, categorias, chave, None, item))
+        elif chave == "mensal":
+            for mes, valor_mes in item.items():
+                yield _new(FlatValue, (path + (chave, mes), secao, categorias, mes, mes, valor_mes))
+        else:
+            # Ex.: "Não julgados" dentro de "CONHECIMENTO"
+            yield from _category_values(secao, categorias + (chave,), path + (chave,), item)
+
+
+def iter_section_values(secao: str, conteudo: Dict) -> Iterator[FlatValue]:
+    """Percorre os valores de uma seção (categoria -> subcategorias -> faixa ou mês)"""
+    for categoria, valor in conteudo.items():
+        yield from _category_values(secao, (categoria,), (secao, categoria), valor)
+
+
+def iter_unit_values(unit: Mapping) -> Iterator[FlatValue]:
+    """
+    Percorre os valores de todas as seções de uma unidade, na ordem do documento
+
+    Campos de primeiro nível que não são seções (id, unidade, acervo_total)
+    ficam de fora; cada consumidor os trata à sua maneira.
+    """
+    for secao, conteudo in unit.items():
+        if isinstance(conteudo, dict):
+            yield from iter_section_values(secao, conteudo)
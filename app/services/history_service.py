@@ -0,0 +1,270 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, exists, func, insert, update
+from sqlmodel import Session, SQLModel, select
+
+from app.core import database
+from app.models.historico import HistoricoCaminho, HistoricoColeta, HistoricoValor
+from app.services.flatten import iter_section_values
+from app.services.numeric import parse_br_int
+
+HISTORY_TABLES = [HistoricoColeta, HistoricoCaminho, HistoricoValor]
+
+# Política de retenção padrão: todas as coletas dos últimos 90 dias e,
+# antes disso, apenas a última coleta de cada mês
+RETENCAO_DIAS = 90
+
+
+def flatten_unit(unit: Dict) -> Dict[str, str]:
+    """
+    Achata uma unidade em {caminho: valor}, com o caminho no formato
+    "secao.categoria.faixa" (ex.: "processos_baixados.Baixados.mensal.Set / 2024")
+    """
+    flat: Dict[str, str] = {}
+    for key, value in unit.items():
+        if key == "id" or value is None:
+            continue
+        if not isinstance(value, dict):
+            flat[key] = str(value)
+            continue
+        for item in iter_section_values(key, value):
+            if item.valor is not None:
+                flat[".".join(item.path)] = str(item.valor)
+    return flat
+
+
+def _current_state(session: Session) -> Dict[int, Dict[int, Optional[str]]]:
+    """Último valor conhecido de cada caminho, por unidade, reconstruído a partir dos deltas"""
+    latest = (
+        select(
+            HistoricoValor.unidade_id,
+            HistoricoValor.caminho_id,
+            func.max(HistoricoValor.coleta_id).label("coleta_id"),
+        )
+        .group_by(HistoricoValor.unidade_id, HistoricoValor.caminho_id)
+        .subquery()
+    )
+    statement = select(HistoricoValor.unidade_id, HistoricoValor.caminho_id, HistoricoValor.texto).join(
+        latest,
+        and_(
+            HistoricoValor.unidade_id == latest.c.unidade_id,
+            HistoricoValor.caminho_id == latest.c.caminho_id,
+            HistoricoValor.coleta_id == latest.c.coleta_id,
+        ),
+    )
+    state: Dict[int, Dict[int, Optional[str]]] = {}
+    for unidade_id, caminho_id, texto in session.exec(statement).all():
+        state.setdefault(unidade_id, {})[caminho_id] = texto
+    return state
+
+
+def record_run(
+    units: Iterable[Dict],
+    coletado_em: Optional[datetime] = None,
+    engine=None,
+    retencao_dias: Optional[int] = RETENCAO_DIAS,
+) -> int:
+    """
+    Registra uma coleta no histórico, gravando apenas os valores que mudaram
+
+    Unidades ausentes da coleta (ex.: falha pontual do scraper) não são
+    consideradas removidas; dentro de uma unidade presente, um caminho que
+    deixou de existir é registrado com texto None.
+
+    Args:
+        units: Unidades no formato do arquivo dados_tjrn.json
+        coletado_em: Momento da coleta (padrão: agora, em UTC)
+        engine: Engine do SQLAlchemy (padrão: banco da aplicação)
+        retencao_dias: Se informado, aplica compact_history após o registro
+
+    Returns:
+        ID da coleta criada
+    """
+    engine = engine or database.engine
+    SQLModel.metadata.create_all(engine, tables=[model.__table__ for model in HISTORY_TABLES])
+    coletado_em = coletado_em or datetime.now(timezone.utc)
+
+    with Session(engine) as session:
+        caminhos = {c.caminho: c.id for c in session.exec(select(HistoricoCaminho)).all()}
+        state = _current_state(session)
+
+        coleta = HistoricoColeta(coletado_em=coletado_em)
+        session.add(coleta)
+        session.flush()
+
+        proximo_caminho = max(caminhos.values(), default=0) + 1
+        novos_caminhos = []
+        rows = []
+        seen = set()
+        for unit in units:
+            unidade_id = unit.get("id")
+            # IDs repetidos: prevalece a primeira ocorrência, como na API
+            if unidade_id is None or unidade_id in seen:
+                continue
+            seen.add(unidade_id)
+
+            anterior = state.get(unidade_id, {})
+            presentes = set()
+            for caminho, texto in flatten_unit(unit).items():
+                caminho_id = caminhos.get(caminho)
+                if caminho_id is None:
+                    caminho_id = caminhos[caminho] = proximo_caminho
+                    proximo_caminho += 1
+                    novos_caminhos.append({"id": caminho_id, "caminho": caminho})
+                presentes.add(caminho_id)
+                if anterior.get(caminho_id) != texto:
+                    rows.append({
+                        "coleta_id": coleta.id,
+                        "unidade_id": unidade_id,
+                        "caminho_id": caminho_id,
+                        "valor": parse_br_int(texto),
+                        "texto": texto,
+                    })
+
+            # Caminhos que sumiram desta unidade
+            for caminho_id, texto in anterior.items():
+                if texto is not None and caminho_id not in presentes:
+                    rows.append({
+                        "coleta_id": coleta.id,
+                        "unidade_id": unidade_id,
+                        "caminho_id": caminho_id,
+                        "valor": None,
+                        "texto": None,
+                    })
+
+        coleta.unidades = len(seen)
+        if novos_caminhos:
+            session.execute(insert(HistoricoCaminho), novos_caminhos)
+        if rows:
+            session.execute(insert(HistoricoValor), rows)
+        session.commit()
+        coleta_id = coleta.id
+
+    if retencao_dias is not None:
+        compact_history(engine, retencao_dias, agora=coletado_em)
+    return coleta_id
+
+
+def _runs_to_drop(coletas: List[HistoricoColeta], retencao_dias: int, agora: datetime) -> List[int]:
+    """Coletas fora da janela de retenção que não são a última do seu mês"""
+    limite = agora - timedelta(days=retencao_dias)
+    ultima_do_mes: Dict[Tuple[int, int], int] = {}
+    for coleta in coletas:
+        ultima_do_mes[(coleta.coletado_em.year, coleta.coletado_em.month)] = coleta.id
+
+    keep = set(ultima_do_mes.values())
+    keep.add(coletas[-1].id)
+    return [
+        coleta.id for coleta in coletas
+        if coleta.id not in keep and _naive_utc(coleta.coletado_em) < _naive_utc(limite)
+    ]
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # O SQLite devolve datetimes sem fuso; as comparações são feitas em UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def compact_history(engine=None, retencao_dias: int = RETENCAO_DIAS, agora: Optional[datetime] = None) -> int:
+    """
+    Aplica a política de retenção: coletas mais antigas que `retencao_dias`
+    são reduzidas à última de cada mês
+
+    Os deltas de uma coleta removida são incorporados à coleta seguinte
+    (quando esta não tem valor próprio para o mesmo caminho), de modo que o
+    valor reconstruído em qualquer coleta mantida não muda.
+
+    Returns:
+        Quantidade de coletas removidas
+    """
+    engine = engine or database.engine
+    agora = agora or datetime.now(timezone.utc)
+
+    with Session(engine) as session:
+        coletas = session.exec(select(HistoricoColeta).order_by(HistoricoColeta.id)).all()
+        if not coletas:
+            return 0
+        drop = set(_runs_to_drop(coletas, retencao_dias, agora))
+        if not drop:
+            return 0
+
+        ids = [coleta.id for coleta in coletas]
+        for position, coleta_id in enumerate(ids):
+            if coleta_id not in drop:
+                continue
+            proxima = ids[position + 1]
+            posterior = HistoricoValor.__table__.alias("posterior")
+            session.execute(
+                update(HistoricoValor)
+                .where(
+                    HistoricoValor.coleta_id == coleta_id,
+                    ~exists().where(
+                        posterior.c.coleta_id == proxima,
+                        posterior.c.unidade_id == HistoricoValor.unidade_id,
+                        posterior.c.caminho_id == HistoricoValor.caminho_id,
+                    ),
+                )
+                .values(coleta_id=proxima)
+            )
+            session.execute(delete(HistoricoValor).where(HistoricoValor.coleta_id == coleta_id))
+            session.execute(delete(HistoricoColeta).where(HistoricoColeta.id == coleta_id))
+        session.commit()
+    return len(drop)
+
+
+def list_runs(session: Session) -> List[Dict]:
+    """Coletas registradas, em ordem cronológica"""
+    coletas = session.exec(select(HistoricoColeta).order_by(HistoricoColeta.id)).all()
+    return [
+        {"id": c.id, "coletado_em": c.coletado_em.isoformat(), "unidades": c.unidades}
+        for c in coletas
+    ]
+
+
+def unit_history(session: Session, unidade_id: int, prefixo: Optional[str] = None) -> List[Dict]:
+    """
+    Série histórica de uma unidade: para cada coleta, os valores de todos os
+    caminhos (opcionalmente limitados a `prefixo`, ex.: "processos_em_tramitacao.TOTAL")
+
+    Os valores inalterados são reconstruídos a partir do último delta anterior.
+    """
+    statement = (
+        select(HistoricoValor.coleta_id, HistoricoCaminho.caminho, HistoricoValor.valor, HistoricoValor.texto)
+        .join(HistoricoCaminho, HistoricoValor.caminho_id == HistoricoCaminho.id)
+        .where(HistoricoValor.unidade_id == unidade_id)
+        .order_by(HistoricoValor.coleta_id)
+    )
+    if prefixo:
+        statement = statement.where(
+            (HistoricoCaminho.caminho == prefixo) | HistoricoCaminho.caminho.startswith(prefixo + ".")
+        )
+
+    deltas: Dict[int, List[Tuple[str, Optional[int], Optional[str]]]] = {}
+    for coleta_id, caminho, valor, texto in session.exec(statement).all():
+        deltas.setdefault(coleta_id, []).append((caminho, valor, texto))
+    if not deltas:
+        return []
+
+    coletas = session.exec(
+        select(HistoricoColeta)
+        .where(HistoricoColeta.id >= min(deltas))
+        .order_by(HistoricoColeta.id)
+    ).all()
+
+    state: Dict[str, Dict] = {}
+    serie = []
+    for coleta in coletas:
+        for caminho, valor, texto in deltas.get(coleta.id, ()):
+            if texto is None:
+                state.pop(caminho, None)
+            else:
+                state[caminho] = {"valor": valor, "texto": texto}
+        serie.append({
+            "coleta_id": coleta.id,
+            "coletado_em": coleta.coletado_em.isoformat(),
+            "valores": dict(state),
+        })
+    return serie
@@ -0,0 +1,94 @@
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterator
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Caracteres que podem continuar um número já decodificado ("12" -> "12.75", "1" -> "1e-3")
+NUMBER_CONTINUATION = frozenset("0123456789.eE+-")
+
+
+def iter_json_array(path: Path, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Percorre um arquivo contendo um array JSON, devolvendo um elemento por vez
+
+    O arquivo é lido em blocos de `chunk_size` caracteres e cada elemento é
+    decodificado assim que está completo no buffer, de modo que o texto do
+    documento inteiro nunca fica em memória.
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def read_more() -> bool:
+            nonlocal buffer, pos, eof
+            if eof:
+                return False
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def peek() -> str:
+            """Avança até o próximo caractere significativo e o retorna ("" no fim do arquivo)"""
+            nonlocal pos
+            while True:
+                pos = WHITESPACE.match(buffer, pos).end()
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not read_more():
+                    return ""
+
+        def expect_end() -> None:
+            """Depois do ']' final só pode haver espaços em branco"""
+            if peek() != "":
+                raise json.JSONDecodeError("Conteúdo inesperado depois do ']' final", buffer, pos)
+
+        if peek() != "[":
+            raise json.JSONDecodeError("Esperado '[' no início do arquivo", buffer, pos)
+        pos += 1
+        if peek() == "]":
+            pos += 1
+            expect_end()
+            return
+
+        while True:
+            peek()
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # Elemento incompleto no buffer: lê mais um bloco e tenta de novo
+                    if read_more():
+                        continue
+                    raise
+                # Um número que termina no fim do buffer (ou antes de um ponto ou
+                # expoente ainda incompleto) pode continuar no próximo bloco
+                if (
+                    isinstance(item, (int, float))
+                    and not isinstance(item, bool)
+                    and (end == len(buffer) or buffer[end] in NUMBER_CONTINUATION)
+                    and read_more()
+                ):
+                    continue
+                break
+
+            pos = end
+            yield item
+
+            separator = peek()
+            if separator == ",":
+                pos += 1
+            elif separator == "]":
+                pos += 1
+                expect_end()
+                return
+            else:
+                raise json.JSONDecodeError("Esperado ',' ou ']' entre os elementos", buffer, pos)
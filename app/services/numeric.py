@@ -0,0 +1,27 @@
+from typing import Any, Optional
+
+# Campos de identificação que não devem ser convertidos para número
+IDENTITY_FIELDS = ("id", "unidade")
+
+
+def parse_br_int(value: Any) -> Optional[int]:
+    """
+    Converte um número no formato pt-BR coletado do GPS-Jus em inteiro
+
+    Exemplos: "1.825" -> 1825, "-12" -> -12, 859 -> 859, "N/A" -> None
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if not isinstance(value, str):
+        return None
+
+    text = value.strip().replace(".", "")
+    negative = text.startswith("-")
+    digits = text[1:] if negative else text
+    if not digits or not (digits.isascii() and digits.isdigit()):
+        return None
+    number = int(digits)
+    return -number if negative else number
+
@@ -0,0 +1,87 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Números e letras viram palavras separadas: "1ª" (normalizado "1A") -> "1", "A"
+_TOKEN = re.compile(r"[A-Z]+|[0-9]+")
+
+# Palavras ignoradas nas siglas ("JUIZADO ESPECIAL CÍVEL" -> "JEC")
+STOPWORDS = frozenset({"A", "AS", "O", "OS", "E", "DE", "DA", "DAS", "DO", "DOS", "EM", "NA", "NO"})
+
+# Fração mínima dos trigramas da consulta que uma unidade precisa conter
+# (acima de 0.5, para que casar só metade dos termos não baste)
+MIN_SCORE = 0.6
+
+
+def tokenize(normalized: str) -> List[str]:
+    """Palavras de um texto já normalizado (veja normalize_name)"""
+    return _TOKEN.findall(normalized)
+
+
+def trigrams(token: str) -> Set[str]:
+    """Trigramas de uma palavra, com as bordas marcadas por espaço (" NA", "NAT", ..., "AL ")"""
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def acronym(tokens: Iterable[str]) -> str:
+    """Sigla das palavras alfabéticas, sem preposições e artigos"""
+    return "".join(t[0] for t in tokens if t.isalpha() and t not in STOPWORDS)
+
+
+class NameIndex:
+    """
+    Índice invertido de trigramas sobre os nomes normalizados das unidades
+
+    Cada nome contribui com os trigramas das suas palavras e da sigla da
+    vara (a parte depois de "COMARCA - "), de modo que "natal jec" encontre
+    "NATAL - 1º JUIZADO ESPECIAL CÍVEL" e "mossoro familia" encontre
+    "MOSSORÓ - 1ª VARA DE FAMÍLIA".
+    """
+
+    def __init__(self, names: Iterable[Tuple[int, str]]):
+        """
+        Args:
+            names: Pares (posição da unidade, nome já normalizado)
+        """
+        self.postings: Dict[str, List[int]] = {}
+        self.sizes: Dict[int, int] = {}
+        for row, normalized in names:
+            grams: Set[str] = set()
+            for token in tokenize(normalized):
+                grams |= trigrams(token)
+            vara = normalized.split(" - ", 1)[-1]
+            sigla = acronym(tokenize(vara))
+            if len(sigla) > 1:
+                grams |= trigrams(sigla)
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(row)
+            self.sizes[row] = len(grams)
+
+    def search(self, normalized: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Unidades que contêm os termos da consulta, da mais para a menos relevante
+
+        A pontuação de cada termo é a fração dos seus trigramas presentes no
+        nome; a da unidade é a média entre os termos. Empates favorecem os
+        nomes mais curtos (mais específicos) e, depois, a ordem original.
+
+        Returns:
+            Pares (posição da unidade, pontuação entre 0 e 1)
+        """
+        tokens = tokenize(normalized)
+        if not tokens:
+            return []
+
+        scores: Dict[int, float] = {}
+        for token in tokens:
+            grams = trigrams(token)
+            weight = 1.0 / (len(grams) * len(tokens))
+            for gram in grams:
+                for row in self.postings.get(gram, ()):
+                    scores[row] = scores.get(row, 0.0) + weight
+
+        ranked = sorted(
+            ((row, score) for row, score in scores.items() if score >= MIN_SCORE - 1e-9),
+            key=lambda item: (-round(item[1], 6), self.sizes[item[0]], item[0]),
+        )
+        return ranked[:limit] if limit is not None else ranked
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import time
+import unicodedata
+from typing import Any, Hashable, Iterable, List, Dict, Optional, Tuple
+
+from app.services.columnar import ColumnStore
+from app.services.compact import CompactUnit, KeyTable
+from app.services.numeric import IDENTITY_FIELDS, parse_br_int
+from app.services.search import NameIndex
+
+
+def canonical_bytes(value: Any) -> bytes:
+    """
+    Codificação determinística de um valor para hashing: depende apenas do
+    conteúdo (ao contrário do marshal, cuja saída varia com a identidade e o
+    interning dos objetos)
+    """
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def normalize_name(name: str) -> str:
+    """Remove acentos, converte para maiúsculas e colapsa espaços de um nome de unidade"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(folded.upper().split())
+
+
+def comarca_of(name: str) -> str:
+    """Comarca de uma unidade, a partir do padrão "COMARCA - VARA" do nome"""
+    return name.split(" - ", 1)[0].strip()
+
+
+class Snapshot:
+    """
+    Visão somente leitura de um conjunto de unidades carregado
+
+    Os índices são construídos uma única vez, na criação do snapshot, para que
+    as rotas por unidade não precisem percorrer a lista inteira a cada requisição.
+    Os valores coletados ("1.825") também são convertidos para inteiros aqui, em
+    `numeric_units`, mantendo `units` com as strings originais, e organizados
+    em colunas (`columns`) para consultas que agregam todas as unidades.
+
+    As unidades são guardadas como CompactUnit: unidades com a mesma estrutura
+    compartilham as chaves e rótulos, e só a tupla de valores é própria de
+    cada uma. Elas se comportam como dicionários somente leitura.
+    """
+
+    def __init__(self, units: Iterable[Dict], version: int = 0, modified: Optional[float] = None):
+        self.version = version
+        # Momento (epoch) da última alteração dos dados, ex.: mtime do arquivo de origem
+        self.last_modified = modified if modified is not None else time.time()
+        # `units` pode ser um gerador (ex.: leitura incremental do arquivo):
+        # cada unidade é indexada assim que chega
+        self.keys = KeyTable()
+        self.units: List[CompactUnit] = []
+        self.numeric_units: List[CompactUnit] = []
+        self.by_id: Dict[int, CompactUnit] = {}
+        self.by_name: Dict[str, CompactUnit] = {}
+        self._numeric_by_id: Dict[int, CompactUnit] = {}
+        # Corpos de resposta já codificados, válidos enquanto este snapshot estiver ativo
+        self.response_cache: Dict[Hashable, Any] = {}
+        # Marcado pela camada da API depois de validar as unidades contra o schema
+        self.validated = False
+        self._digests: Dict[tuple, str] = {}
+        self._unit_digests: Dict[Optional[str], List[bytes]] = {}
+        # Comarca (nome normalizado) -> nome exibido e posições das unidades em `units`
+        self.comarcas: Dict[str, str] = {}
+        self.comarca_rows: Dict[str, List[int]] = {}
+        self._comarca_rollups: Optional[Dict[str, Dict]] = None
+        self._name_index: Optional[NameIndex] = None
+
+        for raw in units:
+            unit = self.keys.compact(raw)
+            self.units.append(unit)
+            numeric = unit.map_values(parse_br_int, keep=IDENTITY_FIELDS)
+            self.numeric_units.append(numeric)
+
+            unit_id = unit.get("id")
+            if unit_id is not None:
+                # Em caso de IDs repetidos, prevalece a primeira ocorrência
+                self.by_id.setdefault(unit_id, unit)
+                self._numeric_by_id.setdefault(unit_id, numeric)
+
+            name = unit.get("unidade")
+            if isinstance(name, str):
+                self.by_name.setdefault(normalize_name(name), unit)
+                comarca = comarca_of(name)
+                key = normalize_name(comarca)
+                self.comarcas.setdefault(key, comarca)
+                self.comarca_rows.setdefault(key, []).append(len(self.units) - 1)
+
+        # Ordem estável (por ID) usada na paginação
+        self.sorted_ids: List[int] = sorted(self.by_id)
+        self.columns = ColumnStore(self.numeric_units)
+
+    def __len__(self) -> int:
+        return len(self.units)
+
+    def get_unit(self, unit_id: int) -> Optional[CompactUnit]:
+        """Busca uma unidade pelo ID"""
+        return self.by_id.get(unit_id)
+
+    def get_unit_by_name(self, name: str) -> Optional[CompactUnit]:
+        """Busca uma unidade pelo nome, ignorando acentos, caixa e espaços extras"""
+        return self.by_name.get(normalize_name(name))
+
+    def get_numeric_unit(self, unit_id: int) -> Optional[CompactUnit]:
+        """Busca a versão numérica (valores inteiros) de uma unidade pelo ID"""
+        return self._numeric_by_id.get(unit_id)
+
+    def get_comarca_units(self, comarca: str) -> Optional[List[CompactUnit]]:
+        """Unidades de uma comarca, ignorando acentos, caixa e espaços extras"""
+        rows = self.comarca_rows.get(normalize_name(comarca))
+        return [self.units[row] for row in rows] if rows is not None else None
+
+    def comarca_rollups(self) -> Dict[str, Dict]:
+        """Totais de todas as métricas por comarca, calculados uma única vez (group by em ColumnStore)"""
+        if self._comarca_rollups is None:
+            keys = list(self.comarcas)
+            groups = [-1] * len(self.units)
+            for index, key in enumerate(keys):
+                for row in self.comarca_rows[key]:
+                    groups[row] = index
+            totals = self.columns.group_rollup(groups, len(keys))
+            self._comarca_rollups = dict(zip(keys, totals))
+        return self._comarca_rollups
+
+    def get_comarca_rollup(self, comarca: str) -> Optional[Dict]:
+        """Totais de uma comarca (veja comarca_rollups)"""
+        return self.comarca_rollups().get(normalize_name(comarca))
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[CompactUnit, float]]:
+        """
+        Busca aproximada pelo nome, ignorando acentos e caixa (ex.: "natal jec")
+
+        O índice de trigramas é construído na primeira busca e reaproveitado
+        enquanto o snapshot estiver ativo.
+        """
+        if self._name_index is None:
+            self._name_index = NameIndex(
+                (row, normalize_name(unit["unidade"]))
+                for row, unit in enumerate(self.units)
+                if isinstance(unit.get("unidade"), str)
+            )
+        return [
+            (self.units[row], score)
+            for row, score in self._name_index.search(normalize_name(query), limit)
+        ]
+
+    def digest(self, section: Optional[str] = None, unit_id: Optional[int] = None) -> str:
+        """
+        Hash do conteúdo de uma seção (ou das unidades inteiras, se `section`
+        for None) em todas as unidades ou apenas em `unit_id`
+
+        Calculado sobre a estrutura e os valores compactos (veja canonical_bytes)
+        e memorizado.
+        """
+        key = (section, unit_id)
+        cached = self._digests.get(key)
+        if cached is None:
+            if unit_id is None:
+                units = self.units
+            else:
+                unit = self.get_unit(unit_id)
+                units = [unit] if unit is not None else []
+            h = hashlib.blake2b(digest_size=12)
+            for unit in units:
+                if section is not None:
+                    # As rotas por seção também devolvem o ID e o nome da unidade
+                    h.update(canonical_bytes((unit.state("id"), unit.state("unidade"))))
+                h.update(canonical_bytes(unit.state(section)))
+            cached = self._digests[key] = h.hexdigest()
+        return cached
+
+    def unit_digests(self, section: Optional[str] = None) -> List[bytes]:
+        """
+        Hash do conteúdo de cada unidade (na ordem de `units`): do ID, do nome
+        e de uma seção, ou da unidade inteira se `section` for None
+
+        Unidades com o mesmo hash em snapshots diferentes produzem os mesmos
+        corpos de resposta, o que permite reaproveitá-los (veja FragmentStore).
+        """
+        digests = self._unit_digests.get(section)
+        if digests is None:
+            digests = []
+            for unit in self.units:
+                if section is None:
+                    state = unit.state()
+                else:
+                    state = (unit.state("id"), unit.state("unidade"), unit.state(section))
+                digests.append(hashlib.blake2b(canonical_bytes(state), digest_size=16).digest())
+            self._unit_digests[section] = digests
+        return digests
@@ -0,0 +1,68 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock
+from sqlmodel import Session, create_engine
+from sqlmodel.pool import StaticPool
+from app.api.endpoints import get_current_active_user, get_data_service
+from app.core.database import get_session
+from app.main import app
+from app.services.data_service import DataService
+
+
+def mock_unit(unit_id=1, nome=None, acervo="100", total="12", mais_60="1", mais_100="0", **secoes):
+    """
+    Unidade no formato de dados_tjrn.json, com processos_em_tramitacao.TOTAL
+    preenchido e as demais seções passadas como argumentos nomeados
+    """
+    return {
+        "id": unit_id,
+        "unidade": nome or f"{unit_id}ª Vara",
+        "acervo_total": acervo,
+        "processos_em_tramitacao": {"TOTAL": {"Total": total, "+60 dias": mais_60, "+100 dias": mais_100}},
+        **secoes,
+    }
+
+
+@pytest.fixture
+def data_service(tmp_path):
+    """DataService real, com arquivos (versões, exportações) em um diretório temporário"""
+    return DataService(data_file=str(tmp_path / "dados_tjrn.json"))
+
+
+@pytest.fixture
+def client_for(data_service):
+    """
+    Fábrica de TestClient que serve as unidades informadas
+
+    Os dados podem ser trocados depois com `data_service.data = [...]`, como
+    se uma nova versão tivesse sido carregada. Por padrão a autenticação é
+    dispensada; com skip_auth=False as rotas exigem um token válido.
+    """
+    def make(units, skip_auth=True):
+        data_service.data = units
+        app.dependency_overrides[get_data_service] = lambda: data_service
+        if skip_auth:
+            app.dependency_overrides[get_current_active_user] = lambda: MagicMock(disabled=False)
+        return TestClient(app)
+
+    yield make
+    app.dependency_overrides = {}
+
+
+@pytest.fixture
+def engine():
+    """Banco SQLite em memória, compartilhado entre as conexões do teste"""
+    return create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+@pytest.fixture
+def db_client(engine):
+    """TestClient cujas rotas consultam o banco `engine`, sem autenticação"""
+    def session():
+        with Session(engine) as s:
+            yield s
+
+    app.dependency_overrides[get_session] = session
+    app.dependency_overrides[get_current_active_user] = lambda: MagicMock(disabled=False)
+    yield TestClient(app)
+    app.dependency_overrides = {}
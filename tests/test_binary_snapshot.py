@@ -0,0 +1,49 @@
+import pytest
+
+from app.services.binary_snapshot import HEADER, read_binary_snapshot, write_binary_snapshot
+
+UNIDADES = [
+    {"id": 1, "unidade": "ACARI - VARA ÚNICA", "acervo_total": "1.825", "controle_de_prisoes": {}},
+    {"id": 2, "unidade": "ALEXANDRIA - VARA ÚNICA", "acervo_total": "530"},
+]
+
+
+def test_ida_e_volta(tmp_path):
+    path = tmp_path / "dados.bin"
+    write_binary_snapshot(path, UNIDADES, (123, 456), data_version=7)
+
+    snapshot = read_binary_snapshot(path, expected_source=(123, 456))
+    assert list(snapshot.units) == UNIDADES
+    assert snapshot.data_version == 7
+    assert snapshot.source_signature == (123, 456)
+
+
+def test_grava_e_le_unidade_a_unidade(tmp_path):
+    path = tmp_path / "dados.bin"
+    write_binary_snapshot(path, (dict(u) for u in UNIDADES), (1, 2))
+
+    unidades = read_binary_snapshot(path).units
+    assert next(unidades) == UNIDADES[0]
+    assert next(unidades) == UNIDADES[1]
+    with pytest.raises(StopIteration):
+        next(unidades)
+
+
+def test_origem_diferente_descarta_binario(tmp_path):
+    path = tmp_path / "dados.bin"
+    write_binary_snapshot(path, UNIDADES, (123, 456))
+    assert read_binary_snapshot(path, expected_source=(123, 999)) is None
+
+
+def test_arquivo_corrompido_ou_ausente(tmp_path):
+    path = tmp_path / "dados.bin"
+    assert read_binary_snapshot(path) is None
+
+    write_binary_snapshot(path, UNIDADES, (1, 2))
+    conteudo = bytearray(path.read_bytes())
+    conteudo[HEADER.size + 6] ^= 0xFF
+    path.write_bytes(bytes(conteudo))
+    assert read_binary_snapshot(path) is None
+
+    path.write_bytes(b"")
+    assert read_binary_snapshot(path) is None
@@ -0,0 +1,94 @@
+from app.services.columnar import ColumnStore, month_sort_key
+from app.services.snapshot import Snapshot
+
+
+def unidades():
+    return Snapshot([
+        {
+            "id": 1,
+            "unidade": "A",
+            "acervo_total": "1.825",
+            "processos_em_tramitacao": {
+                "CONHECIMENTO": {"Total": "859", "+100 dias": "1", "Não julgados": {"Total": "615"}},
+            },
+            "processos_baixados": {
+                "Baixados": {"mensal": {"Out / 2024": "10", "Set / 2024": "5"}, "total": "15"},
+            },
+        },
+        {
+            "id": 2,
+            "unidade": "B",
+            "acervo_total": "N/A",
+            "processos_em_tramitacao": {"CONHECIMENTO": {"Total": "141", "+100 dias": "4"}},
+            "processos_baixados": {
+                "Baixados": {"mensal": {"Set / 2024": "1", "Jan / 2025": "2"}, "total": "3"},
+            },
+        },
+    ]).numeric_units
+
+
+def test_month_sort_key_cronologico():
+    assert sorted(["Jan / 2025", "Dez / 2024", "Set / 2024"], key=month_sort_key) == [
+        "Set / 2024", "Dez / 2024", "Jan / 2025"
+    ]
+
+
+def test_colunas_por_metrica():
+    store = ColumnStore(unidades())
+    assert list(store.column("processos_em_tramitacao.CONHECIMENTO.Total")) == [859, 141]
+    assert store.sum("processos_em_tramitacao.CONHECIMENTO.+100 dias") == 5
+    assert store.sum(("processos_em_tramitacao", "CONHECIMENTO", "Não julgados", "Total")) == 615
+
+
+def test_valores_ausentes_nao_contam():
+    store = ColumnStore(unidades())
+    assert store.sum("acervo_total") == 1825
+    assert store.count("acervo_total") == 1
+    assert store.column("inexistente") is None
+    assert store.sum("inexistente") == 0
+
+
+def test_series_mensais():
+    store = ColumnStore(unidades())
+    assert store.months == ["Set / 2024", "Out / 2024", "Jan / 2025"]
+    assert list(store.monthly_matrix("processos_baixados.Baixados")) == [5, 10, 0, 1, 0, 2]
+    assert store.monthly_sum("processos_baixados.Baixados") == {
+        "Set / 2024": 6, "Out / 2024": 10, "Jan / 2025": 2
+    }
+    assert store.sum("processos_baixados.Baixados.total") == 18
+
+
+def test_rollup_soma_todas_as_metricas():
+    rollup = ColumnStore(unidades()).rollup()
+    assert rollup["acervo_total"] == 1825
+    assert rollup["processos_em_tramitacao"]["CONHECIMENTO"]["Total"] == 1000
+    assert rollup["processos_em_tramitacao"]["CONHECIMENTO"]["Não julgados"] == {"Total": 615}
+    assert rollup["processos_baixados"]["Baixados"] == {
+        "mensal": {"Set / 2024": 6, "Out / 2024": 10, "Jan / 2025": 2},
+        "total": 18,
+    }
+
+
+def test_ranking_ordena_e_memoriza():
+    store = ColumnStore(unidades())
+    desc = store.ranking("processos_em_tramitacao.CONHECIMENTO.+100 dias")
+    assert list(desc) == [1, 0]
+    assert list(store.ranking("processos_em_tramitacao.CONHECIMENTO.+100 dias", descending=False)) == [0, 1]
+    assert store.ranking("processos_em_tramitacao.CONHECIMENTO.+100 dias") is desc
+    # Unidade sem valor (acervo "N/A") fica fora do ranking
+    assert list(store.ranking("acervo_total")) == [0]
+    assert store.ranking("processos_baixados.Baixados") is None
+
+
+def test_rows_where_por_busca_binaria():
+    store = ColumnStore(unidades())
+    caminho = "processos_em_tramitacao.CONHECIMENTO.Total"  # [859, 141]
+    assert store.rows_where(caminho, "gt", 141) == {0}
+    assert store.rows_where(caminho, "gte", 141) == {0, 1}
+    assert store.rows_where(caminho, "lt", 859) == {1}
+    assert store.rows_where(caminho, "lte", 859) == {0, 1}
+    assert store.rows_where(caminho, "eq", 141) == {1}
+    assert store.rows_where(caminho, "ne", 141) == {0}
+    # Unidade sem valor nunca é selecionada
+    assert store.rows_where("acervo_total", "lt", 10 ** 9) == {0}
+    assert store.rows_where("inexistente", "gt", 0) is None
@@ -0,0 +1,48 @@
+from app.services.compact import CompactUnit, KeyTable
+from app.services.numeric import IDENTITY_FIELDS, parse_br_int
+
+UNIDADE = {
+    "id": 1,
+    "unidade": "ACARI - VARA ÚNICA",
+    "acervo_total": "1.825",
+    "processos_em_tramitacao": {
+        "CONHECIMENTO": {
+            "Total": "859", "+60 dias": "49", "+100 dias": "1",
+            "Não julgados": {"Total": "615", "+60 dias": "42", "+100 dias": "1"},
+        },
+    },
+    "processos_baixados": {"Baixados": {"mensal": {"Set / 2024": "80"}, "total": "80"}},
+}
+
+
+def test_compact_preserva_formato_original():
+    unit = KeyTable().compact(UNIDADE)
+
+    assert isinstance(unit, CompactUnit)
+    assert unit.to_dict() == UNIDADE
+    assert list(unit) == list(UNIDADE)
+    assert unit["id"] == 1
+    assert unit.get("processos_em_tramitacao") == UNIDADE["processos_em_tramitacao"]
+    assert isinstance(unit.get("processos_baixados"), dict)
+    assert unit.get("inexistente", {}) == {}
+    assert "acervo_total" in unit
+    assert unit == UNIDADE
+
+
+def test_compact_compartilha_estrutura_entre_unidades():
+    table = KeyTable()
+    outra = dict(UNIDADE, id=2, acervo_total="10")
+
+    a = table.compact(UNIDADE)
+    b = table.compact(outra)
+
+    assert a.shape is b.shape
+    assert b["acervo_total"] == "10"
+
+
+def test_map_values_mantem_campos_de_identificacao():
+    numeric = KeyTable().compact(UNIDADE).map_values(parse_br_int, keep=IDENTITY_FIELDS)
+
+    assert numeric["unidade"] == "ACARI - VARA ÚNICA"
+    assert numeric["acervo_total"] == 1825
+    assert numeric["processos_em_tramitacao"]["CONHECIMENTO"]["Não julgados"]["Total"] == 615
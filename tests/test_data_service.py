@@ -0,0 +1,229 @@
+import json
+import os
+
+import pytest
+from sqlmodel import Session, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from app.core import database
+from app.models.dados import Unidade
+from app.services import data_service as data_service_module, db_sync
+from app.services.data_service import DataService, get_shared_data_service
+
+
+def escrever_dados(path, unidades):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(unidades, f, ensure_ascii=False)
+
+
+@pytest.fixture
+def arquivo_dados(tmp_path):
+    path = tmp_path / "dados.json"
+    escrever_dados(path, [{"id": 1, "unidade": "A", "acervo_total": "10"}])
+    return path
+
+
+def test_refresh_sem_mudanca_nao_recarrega(arquivo_dados, monkeypatch):
+    service = DataService(data_file=str(arquivo_dados), auto_load=True)
+    chamadas = []
+    monkeypatch.setattr(service, "load_data", lambda: chamadas.append(1))
+
+    assert service.refresh() is False
+    assert chamadas == []
+
+
+def test_refresh_recarrega_quando_arquivo_muda(arquivo_dados):
+    service = DataService(data_file=str(arquivo_dados), auto_load=True)
+    assert [u["unidade"] for u in service.data] == ["A"]
+    assert service.version == 1
+
+    escrever_dados(arquivo_dados, [{"id": 1, "unidade": "A"}, {"id": 2, "unidade": "B"}])
+    stat = arquivo_dados.stat()
+    os.utime(arquivo_dados, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert service.refresh() is True
+    assert [u["unidade"] for u in service.data] == ["A", "B"]
+    # Toda troca de conteúdo recebe uma nova versão, também sem save_data
+    assert service.version == 2
+    assert service.refresh() is False
+
+
+def test_reload_forca_releitura(arquivo_dados):
+    service = DataService(data_file=str(arquivo_dados), auto_load=True)
+    service.data = []
+
+    service.reload()
+    assert len(service.data) == 1
+
+
+def test_request_reload_e_detectado_por_outro_processo(arquivo_dados):
+    api = DataService(data_file=str(arquivo_dados), auto_load=True)
+    api.data = []
+    assert api.refresh() is False
+
+    # Ex.: python -m app.scripts.reload_data, em outro processo
+    DataService(data_file=str(arquivo_dados)).request_reload()
+
+    assert api.refresh() is True
+    assert len(api.data) == 1
+    assert api.refresh() is False
+
+
+def test_shared_data_service_reutiliza_instancia(arquivo_dados, monkeypatch):
+    service = DataService(data_file=str(arquivo_dados), auto_load=True)
+    monkeypatch.setattr(data_service_module, "_shared_service", service)
+
+    assert get_shared_data_service() is service
+    assert get_shared_data_service() is service
+
+
+def test_load_data_gera_e_usa_snapshot_binario(arquivo_dados, monkeypatch):
+    DataService(data_file=str(arquivo_dados), auto_load=True)
+    # O arquivo sem versão é importado como versão 1, com o binário ao lado
+    binario = arquivo_dados.parent / "snapshots" / "dados-000001.bin"
+    assert binario.exists()
+
+    def falhar(*args, **kwargs):
+        raise AssertionError("o JSON não deveria ser lido")
+
+    monkeypatch.setattr(data_service_module, "iter_json_array", falhar)
+    service = DataService(data_file=str(arquivo_dados), auto_load=True)
+    assert service.data == [{"id": 1, "unidade": "A", "acervo_total": "10"}]
+
+
+def test_snapshot_binario_desatualizado_usa_json(arquivo_dados):
+    DataService(data_file=str(arquivo_dados), auto_load=True)
+    escrever_dados(arquivo_dados, [{"id": 9, "unidade": "Nova versão"}])
+
+    service = DataService(data_file=str(arquivo_dados), auto_load=True)
+    assert service.data == [{"id": 9, "unidade": "Nova versão"}]
+
+
+def test_save_data_grava_snapshot_binario(tmp_path):
+    service = DataService(data_file=str(tmp_path / "dados.json"))
+    service.save_data([{"id": 1, "unidade": "A"}], sync_db=False)
+
+    recarregado = DataService(data_file=str(tmp_path / "dados.json"), auto_load=True)
+    assert (tmp_path / "snapshots" / "dados-000001.bin").exists()
+    assert recarregado.data == [{"id": 1, "unidade": "A"}]
+
+
+def test_load_data_json_invalido_resulta_em_lista_vazia(tmp_path):
+    path = tmp_path / "dados.json"
+    path.write_text('[{"id": 1}, {"id": ', encoding="utf-8")
+
+    service = DataService(data_file=str(path), auto_load=True)
+    assert service.data == []
+
+
+def test_save_data_grava_versoes_crescentes(tmp_path):
+    path = tmp_path / "dados.json"
+    service = DataService(data_file=str(path))
+
+    service.save_data([{"id": 1, "unidade": "A"}], sync_db=False)
+    assert service.version == 1
+    service.save_data([{"id": 1, "unidade": "B"}], sync_db=False)
+    assert service.version == 2
+
+    assert (tmp_path / "dados.current").read_text().split()[0] == "2"
+    assert (tmp_path / "snapshots" / "dados-000001.json").exists()
+    assert json.loads(path.read_text(encoding="utf-8")) == [{"id": 1, "unidade": "B"}]
+
+    leitor = DataService(data_file=str(path), auto_load=True)
+    assert leitor.version == 2
+    assert leitor.data == [{"id": 1, "unidade": "B"}]
+
+
+def test_save_data_remove_versoes_antigas(tmp_path):
+    service = DataService(data_file=str(tmp_path / "dados.json"), keep_snapshots=2)
+    for i in range(4):
+        service.save_data([{"id": i}], sync_db=False)
+
+    restantes = sorted(p.name for p in (tmp_path / "snapshots").glob("*.json"))
+    assert restantes == ["dados-000003.json", "dados-000004.json"]
+
+
+def test_leitor_detecta_nova_versao(tmp_path):
+    path = tmp_path / "dados.json"
+    escritor = DataService(data_file=str(path))
+    escritor.save_data([{"id": 1}], sync_db=False)
+
+    leitor = DataService(data_file=str(path), auto_load=True)
+    escritor.save_data([{"id": 1}, {"id": 2}], sync_db=False)
+
+    assert leitor.refresh() is True
+    assert leitor.version == 2
+    assert len(leitor.data) == 2
+
+
+def test_erro_de_leitura_mantem_snapshot_anterior(arquivo_dados):
+    service = DataService(data_file=str(arquivo_dados), auto_load=True)
+    arquivo_dados.write_text('[{"id": ', encoding="utf-8")
+
+    service.reload()
+    assert service.data == [{"id": 1, "unidade": "A", "acervo_total": "10"}]
+    assert service.version == 1
+
+
+def test_save_data_copia_versao_para_arquivo_de_dados(tmp_path):
+    path = tmp_path / "dados.json"
+    DataService(data_file=str(path)).save_data([{"id": 1}], sync_db=False)
+
+    versao = tmp_path / "snapshots" / "dados-000001.json"
+    assert versao.stat().st_nlink == 1
+    assert not os.path.samefile(versao, path)
+
+
+def test_arquivo_de_dados_substituido_vira_nova_versao(tmp_path):
+    path = tmp_path / "dados.json"
+    service = DataService(data_file=str(path))
+    service.save_data([{"id": 1, "unidade": "A"}], sync_db=False)
+
+    escrever_dados(path, [{"id": 2, "unidade": "Cópia manual"}])
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert service.refresh() is True
+    assert service.version == 2
+    assert service.data == [{"id": 2, "unidade": "Cópia manual"}]
+    assert (tmp_path / "dados.current").read_text().split()[0] == "2"
+    assert (tmp_path / "snapshots" / "dados-000002.json").exists()
+    assert service.refresh() is False
+
+    leitor = DataService(data_file=str(path), auto_load=True)
+    assert leitor.version == 2
+    assert leitor.data == [{"id": 2, "unidade": "Cópia manual"}]
+
+
+def test_arquivo_de_dados_substituido_por_json_invalido_mantem_versao(tmp_path):
+    path = tmp_path / "dados.json"
+    DataService(data_file=str(path)).save_data([{"id": 1}], sync_db=False)
+    path.write_text('[{"id": ', encoding="utf-8")
+
+    service = DataService(data_file=str(path), auto_load=True)
+    assert service.version == 1
+    assert service.data == [{"id": 1}]
+    assert not (tmp_path / "snapshots" / "dados-000002.json").exists()
+
+
+def test_nova_versao_carregada_e_gravada_no_banco(arquivo_dados, monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    monkeypatch.setattr(database, "engine", engine)
+
+    service = DataService(data_file=str(arquivo_dados), auto_load=True, sync_db=True)
+    with Session(engine) as session:
+        assert session.exec(select(Unidade.nome)).all() == ["A"]
+
+    escrever_dados(arquivo_dados, [{"id": 1, "unidade": "A"}, {"id": 2, "unidade": "B"}])
+    stat = arquivo_dados.stat()
+    os.utime(arquivo_dados, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert service.refresh() is True
+    with Session(engine) as session:
+        assert session.exec(select(Unidade.nome).order_by(Unidade.id)).all() == ["A", "B"]
+
+    # Outro processo carregando a mesma versão não regrava as tabelas
+    regravou = []
+    original = db_sync.sync_units_to_db
+    monkeypatch.setattr(db_sync, "sync_units_to_db", lambda *a, **kw: regravou.append(original(*a, **kw)))
+    DataService(data_file=str(arquivo_dados), auto_load=True, sync_db=True)
+    assert regravou == [False]
@@ -0,0 +1,83 @@
+import pytest
+from sqlmodel import Session, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from app.models.dados import SerieMensal, Unidade
+from app.services.db_sync import query_metric, sync_state, sync_units_to_db
+
+UNIDADES = [
+    {
+        "id": 1,
+        "unidade": "ACARI - VARA ÚNICA",
+        "acervo_total": "1.825",
+        "processos_em_tramitacao": {
+            "CONHECIMENTO": {
+                "Total": "859", "+60 dias": "49", "+100 dias": "1",
+                "Não julgados": {"Total": "615", "+60 dias": "42", "+100 dias": "1"},
+            },
+            "TOTAL": {"Total": "1.491", "+60 dias": "97", "+100 dias": "5"},
+        },
+        "controle_de_prisoes": {"Não identificada": "6", "Total": "6"},
+        "processos_baixados": {"Baixados": {"mensal": {"Set / 2024": "80", "Out / 2024": "174"}, "total": "254"}},
+    },
+    {
+        "id": 2,
+        "unidade": "NATAL - 1ª VARA CÍVEL",
+        "acervo_total": "N/A",
+        "processos_em_tramitacao": {"TOTAL": {"Total": "300", "+60 dias": "10", "+100 dias": "60"}},
+    },
+]
+
+
+@pytest.fixture
+def engine():
+    return create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+def test_sync_grava_unidades_e_series(engine):
+    assert sync_units_to_db(UNIDADES, engine=engine) is True
+    with Session(engine) as session:
+        unidades = session.exec(select(Unidade).order_by(Unidade.id)).all()
+        assert [(u.id, u.acervo_total, u.acervo_total_texto) for u in unidades] == [(1, 1825, "1.825"), (2, None, "N/A")]
+
+        series = session.exec(select(SerieMensal).order_by(SerieMensal.competencia)).all()
+        assert [(s.mes, s.competencia, s.valor) for s in series] == [("Set / 2024", "2024-09", 80), ("Out / 2024", "2024-10", 174)]
+
+
+def test_sync_substitui_dados_anteriores(engine):
+    sync_units_to_db(UNIDADES, engine=engine)
+    sync_units_to_db(UNIDADES[:1], engine=engine)
+    with Session(engine) as session:
+        assert session.exec(select(Unidade.id)).all() == [1]
+
+
+def test_sync_mesma_versao_nao_regrava(engine):
+    assert sync_units_to_db(UNIDADES[:1], engine=engine, versao="1-abc") is True
+    assert sync_units_to_db(UNIDADES, engine=engine, versao="1-abc") is False
+    with Session(engine) as session:
+        assert session.exec(select(Unidade.id)).all() == [1]
+        assert sync_state(session).chave == "1-abc"
+
+    assert sync_units_to_db(UNIDADES, engine=engine, versao="2-def") is True
+    with Session(engine) as session:
+        assert session.exec(select(Unidade.id).order_by(Unidade.id)).all() == [1, 2]
+
+
+def test_query_metric_soma_e_filtra(engine):
+    sync_units_to_db(UNIDADES, engine=engine)
+    with Session(engine) as session:
+        resultado = query_metric(session, "processos_em_tramitacao", "TOTAL", "+100 dias")
+        assert resultado["total"] == 65
+        assert [u["id"] for u in resultado["unidades"]] == [2, 1]
+
+        filtrado = query_metric(session, "processos_em_tramitacao", "TOTAL", "+100 dias", minimo=50)
+        assert filtrado["quantidade"] == 1
+        assert filtrado["unidades"] == [{"id": 2, "unidade": "NATAL - 1ª VARA CÍVEL", "valor": 60}]
+
+
+def test_query_metric_subcategoria(engine):
+    sync_units_to_db(UNIDADES, engine=engine)
+    with Session(engine) as session:
+        resultado = query_metric(session, "processos_em_tramitacao", "CONHECIMENTO", "Total", subcategoria="Não julgados")
+        assert resultado["total"] == 615
+        assert query_metric(session, "controle_de_prisoes", "Não identificada")["total"] == 6
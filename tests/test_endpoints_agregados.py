@@ -0,0 +1,69 @@
+import pytest
+
+
+def mock_units():
+    return [
+        {
+            "id": 1,
+            "unidade": "ACARI - VARA ÚNICA",
+            "acervo_total": "1.825",
+            "processos_em_tramitacao": {"TOTAL": {"Total": "1.491", "+60 dias": "97", "+100 dias": "5"}},
+            "atos_judiciais_proferidos": {"Decisões": {"mensal": {"Set / 2024": "10", "Out / 2024": "5"}, "total": "15"}},
+        },
+        {
+            "id": 2,
+            "unidade": "NATAL - 1ª VARA CÍVEL",
+            "acervo_total": "N/A",
+            "processos_em_tramitacao": {"TOTAL": {"Total": "300", "+60 dias": "10", "+100 dias": "60"}},
+            "atos_judiciais_proferidos": {"Decisões": {"mensal": {"Set / 2024": "1", "Out / 2024": "2"}, "total": "3"}},
+        },
+    ]
+
+
+@pytest.fixture
+def client(client_for):
+    return client_for(mock_units())
+
+
+def test_get_agregados(client):
+    response = client.get("/api/v1/agregados")
+    assert response.status_code == 200
+    dados = response.json()
+    assert dados["unidades"] == 2
+    assert dados["acervo_total"] == 1825
+    assert dados["processos_em_tramitacao"]["TOTAL"] == {"Total": 1791, "+60 dias": 107, "+100 dias": 65}
+    assert dados["atos_judiciais_proferidos"]["Decisões"]["mensal"] == {"Set / 2024": 11, "Out / 2024": 7}
+
+
+def test_get_agregados_secao(client):
+    response = client.get("/api/v1/agregados/atos_judiciais_proferidos")
+    assert response.status_code == 200
+    assert response.json()["Decisões"]["total"] == 18
+
+    assert client.get("/api/v1/agregados/inexistente").status_code == 404
+
+
+def test_get_agregado_metrica(client):
+    response = client.get("/api/v1/agregados/metrica", params={"caminho": "acervo_total"})
+    assert response.json() == {"caminho": "acervo_total", "total": 1825, "unidades": 1, "media": 1825.0}
+
+    mensal = client.get("/api/v1/agregados/metrica", params={"caminho": "atos_judiciais_proferidos.Decisões"})
+    assert mensal.json()["mensal"] == {"Set / 2024": 11, "Out / 2024": 7}
+
+    assert client.get("/api/v1/agregados/metrica", params={"caminho": "x.y"}).status_code == 404
+
+
+def test_get_ranking(client):
+    response = client.get("/api/v1/rankings", params={"caminho": "processos_em_tramitacao.TOTAL.+100 dias"})
+    assert response.status_code == 200
+    assert [(u["posicao"], u["id"], u["valor"]) for u in response.json()["unidades"]] == [(1, 2, 60), (2, 1, 5)]
+
+    asc = client.get("/api/v1/rankings", params={
+        "caminho": "processos_em_tramitacao.TOTAL.Total", "ordem": "asc", "limit": 1
+    })
+    assert asc.json()["unidades"] == [{"posicao": 1, "id": 2, "unidade": "NATAL - 1ª VARA CÍVEL", "valor": 300}]
+
+
+def test_get_ranking_metrica_invalida(client):
+    assert client.get("/api/v1/rankings", params={"caminho": "x.y"}).status_code == 404
+    assert client.get("/api/v1/rankings", params={"caminho": "acervo_total", "ordem": "x"}).status_code == 422
@@ -0,0 +1,41 @@
+import pytest
+
+
+@pytest.fixture
+def client(client_for):
+    return client_for([
+        {"id": 1, "unidade": "NATAL - 1º JUIZADO ESPECIAL CÍVEL", "acervo_total": "10"},
+        {"id": 2, "unidade": "NATAL - 1ª VARA CÍVEL", "acervo_total": "20"},
+        {"id": 3, "unidade": "MOSSORÓ - 1ª VARA DE FAMÍLIA", "acervo_total": "30"},
+        {"id": 4, "unidade": "MOSSORÓ - JUIZADO DE VIOLÊNCIA DOMÉSTICA E FAMILIAR CONTRA A MULHER", "acervo_total": "5"},
+        {"id": 5, "unidade": "CAICÓ - 1ª VARA", "acervo_total": "7"},
+    ])
+
+
+def test_busca_por_sigla(client):
+    response = client.get("/api/v1/unidades/busca", params={"q": "natal jec"})
+    assert response.status_code == 200
+    dados = response.json()
+    assert dados[0] == {"id": 1, "unidade": "NATAL - 1º JUIZADO ESPECIAL CÍVEL", "pontuacao": 1.0}
+    assert 2 not in [u["id"] for u in dados]
+
+
+def test_busca_ignora_acentos_e_caixa(client):
+    dados = client.get("/api/v1/unidades/busca", params={"q": "Mossoro familia"}).json()
+    assert [u["id"] for u in dados] == [3, 4]
+
+
+def test_busca_tolera_erro_de_digitacao(client):
+    dados = client.get("/api/v1/unidades/busca", params={"q": "caico"}).json()
+    assert dados[0]["id"] == 5
+    assert client.get("/api/v1/unidades/busca", params={"q": "caicoo"}).json()[0]["id"] == 5
+
+
+def test_busca_limite(client):
+    dados = client.get("/api/v1/unidades/busca", params={"q": "vara", "limit": 2}).json()
+    assert len(dados) == 2
+
+
+def test_busca_sem_resultado(client):
+    assert client.get("/api/v1/unidades/busca", params={"q": "xyz"}).status_code == 404
+    assert client.get("/api/v1/unidades/busca", params={"q": ""}).status_code == 422
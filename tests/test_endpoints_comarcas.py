@@ -0,0 +1,47 @@
+import pytest
+from tests.conftest import mock_unit
+
+
+@pytest.fixture
+def client(client_for):
+    return client_for([
+        mock_unit(1, "MOSSORÓ - 1ª VARA CÍVEL", "100", "10"),
+        mock_unit(2, "NATAL - 1ª VARA CÍVEL", "1.000", "50"),
+        mock_unit(3, "MOSSORÓ - GABINETE 1 - 2º NÚCLEO REGIONAL DAS GARANTIAS", "20", "5"),
+        mock_unit(4, "CEARÁ-MIRIM - VARA ÚNICA", "N/A", "1"),
+    ])
+
+
+def test_list_comarcas(client):
+    response = client.get("/api/v1/comarcas")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"comarca": "CEARÁ-MIRIM", "unidades": 1},
+        {"comarca": "MOSSORÓ", "unidades": 2},
+        {"comarca": "NATAL", "unidades": 1},
+    ]
+
+
+def test_get_comarca_totais_e_unidades(client):
+    response = client.get("/api/v1/comarcas/mossoro")
+    assert response.status_code == 200
+    dados = response.json()
+    assert dados["comarca"] == "MOSSORÓ"
+    assert [u["id"] for u in dados["unidades"]] == [1, 3]
+    assert dados["totais"]["acervo_total"] == 120
+    assert dados["totais"]["processos_em_tramitacao"]["TOTAL"]["Total"] == 15
+
+
+def test_get_comarca_sem_valor_omite_metrica(client):
+    dados = client.get("/api/v1/comarcas/CEARÁ-MIRIM").json()
+    assert "acervo_total" not in dados["totais"]
+
+
+def test_get_comarca_secao(client):
+    response = client.get("/api/v1/comarcas/NATAL/processos_em_tramitacao")
+    assert response.json() == {"TOTAL": {"Total": 50, "+60 dias": 1, "+100 dias": 0}}
+    assert client.get("/api/v1/comarcas/NATAL/inexistente").status_code == 404
+
+
+def test_get_comarca_inexistente(client):
+    assert client.get("/api/v1/comarcas/RECIFE").status_code == 404
@@ -0,0 +1,114 @@
+import pytest
+from app.api.responses import etag_matches, matching_etag
+from tests.conftest import mock_unit
+
+
+def unit(unit_id=1, total="12"):
+    return mock_unit(unit_id, total=total, mais_60="3", mais_100="1", controle_de_prisoes={"Preventiva": "2"})
+
+
+@pytest.fixture
+def client(client_for):
+    return client_for([unit(1), unit(2)])
+
+
+def test_etag_e_304_com_if_none_match(client):
+    response = client.get("/api/v1/unidades/processos", headers={"Accept-Encoding": "identity"})
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert "Last-Modified" in response.headers
+
+    cached = client.get("/api/v1/unidades/processos", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+
+def test_etag_muda_quando_a_secao_muda(client, data_service):
+    etag = client.get("/api/v1/unidades/processos").headers["ETag"]
+    prisoes = client.get("/api/v1/unidades/controle_de_prisoes").headers["ETag"]
+
+    data_service.data = [unit(1, total="13"), unit(2)]
+
+    assert client.get("/api/v1/unidades/processos", headers={"If-None-Match": etag}).status_code == 200
+    # Seção inalterada continua válida
+    assert client.get("/api/v1/unidades/controle_de_prisoes", headers={"If-None-Match": prisoes}).status_code == 304
+
+
+def test_etag_por_unidade(client, data_service):
+    etag_1 = client.get("/api/v1/unidades/unidades/1/processos").headers["ETag"]
+    etag_2 = client.get("/api/v1/unidades/unidades/2/processos").headers["ETag"]
+    assert etag_1 != etag_2
+
+    data_service.data = [unit(1), unit(2, total="99")]
+    assert client.get("/api/v1/unidades/unidades/1/processos", headers={"If-None-Match": etag_1}).status_code == 304
+
+
+def test_etag_da_variante_comprimida_aceito(client):
+    response = client.get("/api/v1/unidades", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"].endswith('-gzip"')
+
+    cached = client.get(
+        "/api/v1/unidades", headers={"If-None-Match": response.headers["ETag"], "Accept-Encoding": "gzip"}
+    )
+    assert cached.status_code == 304
+    # O 304 identifica a mesma variante da resposta guardada
+    assert cached.headers["ETag"] == response.headers["ETag"]
+    assert cached.headers["Vary"] == "Accept-Encoding"
+
+
+def test_etag_por_representacao(client):
+    etag = client.get("/api/v1/unidades").headers["ETag"]
+    paginado = client.get("/api/v1/unidades", params={"limit": 1}).headers["ETag"]
+    ndjson = client.get("/api/v1/unidades", params={"formato": "ndjson"}).headers["ETag"]
+    assert len({etag, paginado, ndjson}) == 3
+
+    assert client.get("/api/v1/unidades", params={"limit": 1}, headers={"If-None-Match": etag}).status_code == 200
+    # A ordem dos parâmetros não altera o ETag
+    assert (
+        client.get("/api/v1/unidades?limit=1&fields=unidade").headers["ETag"]
+        == client.get("/api/v1/unidades?fields=unidade&limit=1").headers["ETag"]
+    )
+
+
+def test_if_modified_since(client):
+    response = client.get("/api/v1/unidades/unidades/1")
+    last_modified = response.headers["Last-Modified"]
+
+    futuro = "Fri, 01 Jan 2100 00:00:00 GMT"
+    assert client.get("/api/v1/unidades/unidades/1", headers={"If-Modified-Since": futuro}).status_code == 304
+    passado = "Mon, 01 Jan 2001 00:00:00 GMT"
+    assert client.get("/api/v1/unidades/unidades/1", headers={"If-Modified-Since": passado}).status_code == 200
+    assert last_modified.endswith("GMT")
+
+
+def test_unidade_inexistente_nao_responde_304(client):
+    response = client.get("/api/v1/unidades/unidades/99", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
+
+
+def test_secao_inexistente_nao_gera_hash(client, data_service):
+    assert client.get("/api/v1/agregados/processos_em_tramitacao").status_code == 200
+    digests = dict(data_service.snapshot._digests)
+
+    for secao in ("x1", "x2", "x3"):
+        response = client.get(f"/api/v1/agregados/{secao}", headers={"If-None-Match": "*"})
+        assert response.status_code == 404
+        assert client.get(f"/api/v1/comarcas/1ª Vara/{secao}").status_code == 404
+    assert data_service.snapshot._digests == digests
+
+
+def test_etag_matches():
+    assert etag_matches('"1-abc"', '"1-abc"')
+    assert etag_matches('W/"1-abc", "x"', '"1-abc"')
+    assert etag_matches('"1-abc-gzip"', '"1-abc"')
+    assert not etag_matches('"1-abd"', '"1-abc"')
+    assert etag_matches("*", '"1-abc"')
+
+
+def test_matching_etag_devolve_a_variante():
+    assert matching_etag('"x", W/"1-abc-gzip"', '"1-abc"') == '"1-abc-gzip"'
+    assert matching_etag('"1-abc"', '"1-abc"') == '"1-abc"'
+    assert matching_etag("*", '"1-abc"') == '"1-abc"'
+    assert matching_etag('"1-abc-zip"', '"1-abc"') is None
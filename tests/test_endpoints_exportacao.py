@@ -0,0 +1,41 @@
+import csv
+import io
+
+import pyarrow.parquet as pq
+import pytest
+
+
+@pytest.fixture
+def client(client_for):
+    return client_for([
+        {"id": 1, "unidade": "ACARI - VARA ÚNICA", "acervo_total": "1.825",
+         "processos_em_tramitacao": {"TOTAL": {"Total": "10", "+60 dias": "2", "+100 dias": "1"}}},
+    ])
+
+
+def test_exportacao_csv(client, data_service):
+    response = client.get("/api/v1/exportacao/csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="dados_tjrn.csv"' in response.headers["content-disposition"]
+    linhas = list(csv.reader(io.StringIO(response.text)))
+    assert linhas[0][:3] == ["unidade_id", "unidade", "secao"]
+    assert len(linhas) == 5
+    assert len(list(data_service.exports_dir.glob("*.csv"))) == 1
+
+    # O ETag é o mesmo das demais rotas de dados
+    etag = response.headers["etag"]
+    assert client.get("/api/v1/exportacao/csv", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_exportacao_formato_invalido(client):
+    assert client.get("/api/v1/exportacao/xlsx").status_code == 404
+
+
+def test_exportacao_parquet(client):
+    response = client.get("/api/v1/exportacao/parquet")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    tabela = pq.read_table(io.BytesIO(response.content))
+    assert tabela.num_rows == 4
+    assert tabela.column("valor").to_pylist()[0] == 1825
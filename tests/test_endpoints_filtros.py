@@ -0,0 +1,73 @@
+import pytest
+from tests.conftest import mock_unit
+
+
+def unit(unit_id, nome, acervo, mais_100):
+    return mock_unit(unit_id, nome, acervo, total="10", mais_100=mais_100, controle_de_prisoes={"Preventiva": "2"})
+
+
+@pytest.fixture
+def client(client_for):
+    return client_for([
+        unit(1, "NATAL - 1ª VARA CÍVEL", "6.000", "80"),
+        unit(2, "NATAL - 2ª VARA CÍVEL", "1.000", "10"),
+        unit(3, "MOSSORÓ - 1ª VARA CÍVEL", "7.500", "50"),
+        unit(4, "ACARI - VARA ÚNICA", "N/A", "0"),
+    ])
+
+
+def ids(response):
+    assert response.status_code == 200, response.text
+    return [u["id"] for u in response.json()]
+
+
+def test_filtro_maior_que(client):
+    assert ids(client.get("/api/v1/unidades?acervo_total__gt=5000")) == [1, 3]
+    assert ids(client.get("/api/v1/unidades?acervo_total__gt=5.000")) == [1, 3]
+
+
+def test_filtro_por_comarca_e_metrica_aninhada(client):
+    assert ids(client.get("/api/v1/unidades?comarca=natal")) == [1, 2]
+    response = client.get("/api/v1/unidades", params={"comarca": "NATAL", "processos_em_tramitacao.TOTAL.+100 dias__gte": "50"})
+    assert ids(response) == [1]
+
+
+def test_filtro_igualdade(client):
+    assert ids(client.get("/api/v1/unidades/numerico", params={"processos_em_tramitacao.TOTAL.+100 dias": "10"})) == [2]
+
+
+def test_filtro_em_listas_por_secao(client):
+    response = client.get("/api/v1/unidades/controle_de_prisoes?acervo_total__lte=1000")
+    assert ids(response) == [2]
+    # Sem filtro, a lista completa continua igual
+    assert ids(client.get("/api/v1/unidades/controle_de_prisoes")) == [1, 2, 3, 4]
+
+
+def test_filtro_em_listas_por_secao_etag_acompanha_a_metrica(client, data_service):
+    url = "/api/v1/unidades/controle_de_prisoes?acervo_total__lte=1000"
+    etag = client.get(url).headers["ETag"]
+    secao = client.get("/api/v1/unidades/controle_de_prisoes").headers["ETag"]
+
+    # Mesma versão e mesma seção; só o acervo (usado no filtro) muda
+    data_service.data = [
+        unit(1, "NATAL - 1ª VARA CÍVEL", "6.000", "80"),
+        unit(2, "NATAL - 2ª VARA CÍVEL", "2.000", "10"),
+        unit(3, "MOSSORÓ - 1ª VARA CÍVEL", "7.500", "50"),
+        unit(4, "ACARI - VARA ÚNICA", "900", "0"),
+    ]
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert ids(response) == [4]
+    # Sem filtro, o ETag segue apenas a seção
+    assert client.get("/api/v1/unidades/controle_de_prisoes", headers={"If-None-Match": secao}).status_code == 304
+
+
+def test_filtro_com_paginacao_e_fields(client):
+    response = client.get("/api/v1/unidades?comarca=NATAL&limit=1&fields=acervo_total")
+    assert response.json() == [{"id": 1, "acervo_total": "6.000"}]
+    assert response.headers["X-Total-Count"] == "2"
+
+
+def test_filtro_invalido(client):
+    assert client.get("/api/v1/unidades?inexistente__gt=1").status_code == 400
+    assert client.get("/api/v1/unidades?acervo_total__entre=1").status_code == 400
+    assert client.get("/api/v1/unidades?acervo_total__gt=abc").status_code == 400
@@ -0,0 +1,69 @@
+import copy
+from datetime import datetime, timedelta
+
+import pytest
+from app.services.history_service import compact_history, record_run
+
+UNIDADE = {
+    "id": 1,
+    "unidade": "ACARI - VARA ÚNICA",
+    "acervo_total": "1.825",
+    "processos_em_tramitacao": {"TOTAL": {"Total": "1.491", "+60 dias": "97", "+100 dias": "5"}},
+}
+
+INICIO = datetime(2025, 1, 1)
+
+
+def _alterada(mais_100):
+    unit = copy.deepcopy(UNIDADE)
+    unit["processos_em_tramitacao"]["TOTAL"]["+100 dias"] = mais_100
+    return unit
+
+
+@pytest.fixture
+def client(db_client, engine):
+    # Duas coletas em janeiro e uma em abril, sem aplicar a retenção
+    record_run([UNIDADE], coletado_em=INICIO, engine=engine, retencao_dias=None)
+    record_run([_alterada("7")], coletado_em=INICIO + timedelta(days=1), engine=engine, retencao_dias=None)
+    record_run([_alterada("9")], coletado_em=INICIO + timedelta(days=90), engine=engine, retencao_dias=None)
+    return db_client
+
+
+def test_historico_coletas(client):
+    response = client.get("/api/v1/historico/coletas")
+    assert response.status_code == 200
+    coletas = response.json()
+    assert [c["id"] for c in coletas] == [1, 2, 3]
+    assert coletas[0] == {"id": 1, "coletado_em": "2025-01-01T00:00:00", "unidades": 1}
+
+
+def test_historico_unidade(client):
+    response = client.get("/api/v1/historico/unidades/1", params={"caminho": "processos_em_tramitacao.TOTAL"})
+    assert response.status_code == 200
+    serie = response.json()
+    assert [item["coleta_id"] for item in serie] == [1, 2, 3]
+    assert [item["valores"]["processos_em_tramitacao.TOTAL.+100 dias"]["valor"] for item in serie] == [5, 7, 9]
+    # Valores inalterados são reconstruídos a partir da primeira coleta
+    assert serie[2]["valores"]["processos_em_tramitacao.TOTAL.Total"] == {"valor": 1491, "texto": "1.491"}
+    assert set(serie[0]["valores"]) == {
+        "processos_em_tramitacao.TOTAL.Total",
+        "processos_em_tramitacao.TOTAL.+60 dias",
+        "processos_em_tramitacao.TOTAL.+100 dias",
+    }
+
+
+def test_historico_unidade_desconhecida(client):
+    assert client.get("/api/v1/historico/unidades/99").status_code == 404
+    assert client.get("/api/v1/historico/unidades/1", params={"caminho": "inexistente"}).status_code == 404
+    assert client.get("/api/v1/historico/unidades/abc").status_code == 422
+
+
+def test_historico_apos_compactacao(client, engine):
+    antes = client.get("/api/v1/historico/unidades/1").json()
+
+    # Fora da janela de 30 dias, janeiro fica só com a sua última coleta
+    assert compact_history(engine, retencao_dias=30, agora=INICIO + timedelta(days=90)) == 1
+
+    assert [c["id"] for c in client.get("/api/v1/historico/coletas").json()] == [2, 3]
+    depois = client.get("/api/v1/historico/unidades/1").json()
+    assert depois == antes[1:]
@@ -0,0 +1,47 @@
+import pytest
+
+
+@pytest.fixture
+def client(client_for):
+    return client_for([
+        {
+            "id": 1,
+            "unidade": "NATAL - 1ª VARA CÍVEL",
+            "acervo_total": "10",
+            "processos_em_tramitacao": {"TOTAL": {"Total": "10", "+60 dias": "2", "+100 dias": "1"}},
+            "suspensos_arquivo_provisorio": {
+                "Suspensos": {"Total": "3", "+60 dias": "1", "+100 dias": "0", "+730 dias": "0"}
+            },
+        },
+        {
+            "id": 2,
+            "unidade": "MOSSORÓ - 1ª VARA CÍVEL",
+            "acervo_total": "5",
+            "processos_em_tramitacao": {"TOTAL": {"Total": "5", "+60 dias": "0", "+100 dias": "0"}},
+        },
+    ])
+
+
+def test_lote_varias_unidades_e_secoes(client):
+    response = client.post("/api/v1/unidades/lote", json={"unidades": [1, 2], "secoes": ["processos", "suspensos"]})
+    assert response.status_code == 200
+    dados = response.json()
+    assert dados[0]["id"] == 1
+    assert dados[0]["processos"] == client.get("/api/v1/unidades/unidades/1/processos").json()
+    assert dados[0]["suspensos"]["Suspensos"]["Total"] == "3"
+    assert "erros" not in dados[0]
+    assert dados[1]["processos"]["TOTAL"]["Total"] == "5"
+    assert dados[1]["erros"]["suspensos"]["status"] == 404
+
+
+def test_lote_unidade_inexistente(client):
+    dados = client.post("/api/v1/unidades/lote", json={"unidades": [99, 1, 1], "secoes": ["unidade"]}).json()
+    assert [item["id"] for item in dados] == [99, 1]
+    assert dados[0]["erros"]["unidade"]["status"] == 404
+    assert dados[1]["unidade"]["unidade"] == "NATAL - 1ª VARA CÍVEL"
+
+
+def test_lote_secao_invalida(client):
+    response = client.post("/api/v1/unidades/lote", json={"unidades": [1], "secoes": ["inexistente"]})
+    assert response.status_code == 400
+    assert client.post("/api/v1/unidades/lote", json={"unidades": [], "secoes": ["processos"]}).status_code == 422
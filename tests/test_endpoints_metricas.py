@@ -0,0 +1,86 @@
+import pytest
+from app.services.db_sync import sync_units_to_db
+
+UNIDADES = [
+    {
+        "id": 1,
+        "unidade": "ACARI - VARA ÚNICA",
+        "acervo_total": "1.825",
+        "processos_em_tramitacao": {"TOTAL": {"Total": "1.491", "+60 dias": "97", "+100 dias": "5"}},
+    },
+    {
+        "id": 2,
+        "unidade": "NATAL - 1ª VARA CÍVEL",
+        "acervo_total": "300",
+        "processos_em_tramitacao": {"TOTAL": {"Total": "300", "+60 dias": "10", "+100 dias": "60"}},
+    },
+]
+
+
+@pytest.fixture
+def client(db_client, engine):
+    sync_units_to_db(UNIDADES, engine=engine, versao="1-abc")
+    return db_client
+
+
+def test_metricas_etag_segue_o_banco(client, engine):
+    params = {"secao": "processos_em_tramitacao", "categoria": "TOTAL", "faixa": "+100 dias"}
+    response = client.get("/api/v1/metricas", params=params)
+    etag = response.headers["ETag"]
+    assert etag.startswith('"db-1-abc-')
+    assert client.get("/api/v1/metricas", params=params, headers={"If-None-Match": etag}).status_code == 304
+
+    # Outra consulta, outro ETag
+    outra = client.get("/api/v1/metricas", params={**params, "minimo": 50}).headers["ETag"]
+    assert outra != etag
+
+    sync_units_to_db(UNIDADES[:1], engine=engine, versao="2-def")
+    assert client.get("/api/v1/metricas", params=params, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_metricas_soma_e_filtra(client):
+    params = {"secao": "processos_em_tramitacao", "categoria": "TOTAL", "faixa": "+60 dias"}
+    response = client.get("/api/v1/metricas", params=params)
+    assert response.status_code == 200
+    assert response.json() == {
+        "secao": "processos_em_tramitacao",
+        "categoria": "TOTAL",
+        "subcategoria": None,
+        "faixa": "+60 dias",
+        "total": 107,
+        "quantidade": 2,
+        "unidades": [
+            {"id": 1, "unidade": "ACARI - VARA ÚNICA", "valor": 97},
+            {"id": 2, "unidade": "NATAL - 1ª VARA CÍVEL", "valor": 10},
+        ],
+    }
+
+    filtrado = client.get("/api/v1/metricas", params={**params, "maximo": 50}).json()
+    assert (filtrado["total"], [u["id"] for u in filtrado["unidades"]]) == (10, [2])
+
+    # limit restringe a lista, não a soma
+    limitado = client.get("/api/v1/metricas", params={**params, "limit": 1}).json()
+    assert (limitado["total"], [u["id"] for u in limitado["unidades"]]) == (107, [1])
+
+
+def test_metricas_acompanha_nova_versao(client, engine):
+    params = {"secao": "processos_em_tramitacao", "categoria": "TOTAL"}
+    assert client.get("/api/v1/metricas", params=params).json()["total"] == 1791
+
+    sync_units_to_db(UNIDADES[1:], engine=engine, versao="2-def")
+    assert client.get("/api/v1/metricas", params=params).json()["total"] == 300
+
+
+def test_metricas_metrica_desconhecida(client):
+    assert client.get("/api/v1/metricas", params={"secao": "inexistente", "categoria": "TOTAL"}).status_code == 404
+    assert client.get(
+        "/api/v1/metricas", params={"secao": "processos_em_tramitacao", "categoria": "TOTAL", "minimo": 10_000}
+    ).status_code == 404
+
+
+def test_metricas_parametros_invalidos(client):
+    assert client.get("/api/v1/metricas").status_code == 422
+    assert client.get("/api/v1/metricas", params={"secao": "processos_em_tramitacao"}).status_code == 422
+    assert client.get(
+        "/api/v1/metricas", params={"secao": "processos_em_tramitacao", "categoria": "TOTAL", "minimo": "x"}
+    ).status_code == 422
@@ -0,0 +1,51 @@
+import json
+import pytest
+from tests.conftest import mock_unit
+
+
+@pytest.fixture
+def client(client_for):
+    return client_for([
+        mock_unit(2, "NATAL - 1ª VARA CÍVEL", "1.000", "50"),
+        mock_unit(1, "MOSSORÓ - 1ª VARA CÍVEL", "100", "10"),
+        mock_unit(3, "CAICÓ - 1ª VARA", "20", "5"),
+    ])
+
+
+def linhas(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.content.endswith(b"\n")
+    return [json.loads(linha) for linha in response.content.splitlines()]
+
+
+def test_unidades_ndjson_igual_a_lista_json(client):
+    lista = client.get("/api/v1/unidades").json()
+    assert linhas(client.get("/api/v1/unidades", params={"formato": "ndjson"})) == lista
+
+
+def test_unidades_ndjson_com_filtro_e_campos(client):
+    response = client.get("/api/v1/unidades", params={"formato": "ndjson", "comarca": "natal", "fields": "acervo_total"})
+    assert linhas(response) == [{"id": 2, "acervo_total": "1.000"}]
+
+
+def test_unidades_ndjson_paginado(client):
+    response = client.get("/api/v1/unidades", params={"formato": "ndjson", "limit": 2})
+    assert [u["id"] for u in linhas(response)] == [1, 2]
+    assert response.headers["X-Total-Count"] == "3"
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_secao_ndjson(client):
+    dados = linhas(client.get("/api/v1/unidades/processos", params={"formato": "ndjson", "acervo_total__gte": 100}))
+    assert [u["id"] for u in dados] == [2, 1]
+    assert dados[0]["processos_em_tramitacao"]["TOTAL"]["Total"] == "50"
+
+
+def test_numerico_ndjson(client):
+    dados = linhas(client.get("/api/v1/unidades/numerico", params={"formato": "ndjson"}))
+    assert [u["acervo_total"] for u in dados] == [1000, 100, 20]
+
+
+def test_formato_invalido(client):
+    assert client.get("/api/v1/unidades", params={"formato": "xml"}).status_code == 422
@@ -0,0 +1,69 @@
+import pytest
+
+
+def mock_units(quantidade=5):
+    return [
+        {
+            "id": i,
+            "unidade": f"{i}ª Vara",
+            "acervo_total": str(i * 10),
+            "processos_em_tramitacao": {"TOTAL": {"Total": str(i), "+60 dias": "0", "+100 dias": "0"}},
+        }
+        for i in reversed(range(1, quantidade + 1))
+    ]
+
+
+@pytest.fixture
+def client(client_for):
+    return client_for(mock_units())
+
+
+def test_list_unidades_sem_paginacao_retorna_tudo(client):
+    response = client.get("/api/v1/unidades")
+    assert response.status_code == 200
+    assert [u["id"] for u in response.json()] == [5, 4, 3, 2, 1]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_list_unidades_percorre_paginas_por_cursor(client):
+    ids = []
+    url = "/api/v1/unidades?limit=2"
+    paginas = 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == "5"
+        ids += [u["id"] for u in response.json()]
+        paginas += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        url = f"/api/v1/unidades?limit=2&cursor={cursor}" if cursor else None
+
+    assert paginas == 3
+    assert ids == [1, 2, 3, 4, 5]
+
+
+def test_list_unidades_pagina_igual_a_unidade_individual(client):
+    pagina = client.get("/api/v1/unidades?limit=1").json()
+    unidade = client.get("/api/v1/unidades/unidades/1").json()
+    assert pagina == [unidade]
+
+
+def test_list_unidades_link_aponta_para_proxima_pagina(client):
+    response = client.get("/api/v1/unidades?limit=4")
+    assert 'rel="next"' in response.headers["Link"]
+    assert f"cursor={response.headers['X-Next-Cursor']}" in response.headers["Link"]
+
+
+def test_list_unidades_cursor_invalido(client):
+    response = client.get("/api/v1/unidades?cursor=@@@")
+    assert response.status_code == 400
+
+
+def test_list_unidades_comprimida_conforme_accept_encoding(client):
+    comprimida = client.get("/api/v1/unidades", headers={"Accept-Encoding": "gzip"})
+    simples = client.get("/api/v1/unidades", headers={"Accept-Encoding": "identity"})
+
+    assert comprimida.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in simples.headers
+    assert comprimida.headers["Vary"] == "Accept-Encoding"
+    assert comprimida.json() == simples.json()
@@ -0,0 +1,62 @@
+import pytest
+
+
+def mock_unit(unit_id=1):
+    return {
+        "id": unit_id,
+        "unidade": f"{unit_id}ª Vara",
+        "acervo_total": "100",
+        "processos_em_tramitacao": {
+            "CONHECIMENTO": {"Total": "10", "+60 dias": "2", "+100 dias": "1"},
+            "TOTAL": {"Total": "12", "+60 dias": "3", "+100 dias": "1"},
+        },
+        "processos_baixados": {"Baixados": {"mensal": {"Set / 2024": "1"}, "total": "1"}},
+    }
+
+
+@pytest.fixture
+def client(client_for):
+    return client_for([mock_unit(1), mock_unit(2)])
+
+
+def test_get_unidade_com_fields(client):
+    response = client.get("/api/v1/unidades/unidades/1?fields=acervo_total,processos_em_tramitacao.TOTAL")
+    assert response.status_code == 200
+    assert response.json() == {
+        "id": 1,
+        "acervo_total": "100",
+        "processos_em_tramitacao": {"TOTAL": {"Total": "12", "+60 dias": "3", "+100 dias": "1", "Não julgados": None}},
+    }
+
+
+def test_get_unidade_projecao_igual_ao_objeto_completo(client):
+    completo = client.get("/api/v1/unidades/unidades/2").json()
+    projetado = client.get("/api/v1/unidades/unidades/2?fields=unidade,processos_baixados").json()
+    assert projetado == {k: completo[k] for k in ("id", "unidade", "processos_baixados")}
+
+
+def test_list_unidades_com_fields_e_paginacao(client):
+    todas = client.get("/api/v1/unidades?fields=acervo_total").json()
+    assert todas == [{"id": 1, "acervo_total": "100"}, {"id": 2, "acervo_total": "100"}]
+
+    pagina = client.get("/api/v1/unidades?fields=unidade&limit=1")
+    assert pagina.json() == [{"id": 1, "unidade": "1ª Vara"}]
+    assert "X-Next-Cursor" in pagina.headers
+
+
+def test_fields_desconhecido(client):
+    response = client.get("/api/v1/unidades?fields=inexistente")
+    assert response.status_code == 400
+
+
+def test_projecao_guarda_apenas_bytes_no_cache(client, data_service):
+    url = "/api/v1/unidades?fields=processos_em_tramitacao.TOTAL.Total,processos_em_tramitacao.X"
+    primeira = client.get(url).json()
+    assert primeira[0] == {"id": 1, "processos_em_tramitacao": {"TOTAL": {"Total": "12"}}}
+    assert client.get(url).json() == primeira
+
+    cache = data_service.snapshot.response_cache
+    campos = {key: value for key, value in cache.items() if key[0] == "campo"}
+    assert campos and all(isinstance(value, bytes) for value in campos.values())
+    # Nenhum corpo decodificado (dicionário) fica memorizado
+    assert not any(isinstance(value, dict) for value in cache.values())
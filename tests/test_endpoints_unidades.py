@@ -1,8 +1,5 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import MagicMock
-from app.api.endpoints import get_data_service
-from app.main import app
 
 # Remove essa linha — não use instância global do TestClient
 # client = TestClient(app)
@@ -35,13 +32,8 @@ def mock_unit():
     }
 
 @pytest.fixture
-def client_with_override():
-    mock_service = MagicMock()
-    mock_service.data = [mock_unit()]
-    mock_service.debug_file_path.return_value = None
-    app.dependency_overrides[get_data_service] = lambda: mock_service
-    yield TestClient(app)
-    app.dependency_overrides = {}
+def client_with_override(client_for):
+    return client_for([mock_unit()], skip_auth=False)
 
 def get_auth_token(client: TestClient, username="cami", password="123") -> str:
     response = client.post(
@@ -1,8 +1,4 @@
 import pytest
-from unittest.mock import MagicMock
-from fastapi.testclient import TestClient
-from app.main import app
-from app.api.endpoints import get_data_service
 from tests.test_endpoints_unidades import get_auth_token
 
 mock_unit = {
@@ -39,24 +35,14 @@ mock_unit = {
 
 
 @pytest.fixture
-def client_with_override():
-    mock_service = MagicMock()
-    mock_service.data = [mock_unit]
-    app.dependency_overrides[get_data_service] = lambda: mock_service
-    client = TestClient(app)
-    yield client
-    app.dependency_overrides = {}
+def client_with_override(client_for):
+    return client_for([mock_unit], skip_auth=False)
 
 @pytest.fixture
-def client_with_custom_data():
+def client_with_custom_data(client_for):
     def _client(data):
-        mock_service = MagicMock()
-        mock_service.data = data
-        app.dependency_overrides[get_data_service] = lambda: mock_service
-        client = TestClient(app)
-        return client
-    yield _client
-    app.dependency_overrides = {}
+        return client_for(data, skip_auth=False)
+    return _client
 
 
 def test_get_suspensos_arquivo_provisorio(client_with_override):
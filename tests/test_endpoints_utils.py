@@ -1,3 +1,4 @@
+import json
 import pytest
 from fastapi import HTTPException
 from app.api.endpoints import (
@@ -5,8 +6,11 @@ from app.api.endpoints import (
     transform_dict_with_total,
     transform_unit_data,
     transform_controle_de_prisoes,
-    find_unit_by_id
+    find_unit_by_id,
+    validate_snapshot
 )
+from app.api.responses import CachedError
+from app.services.snapshot import Snapshot
 
 # --------- transform_process_data ---------
 def test_transform_process_data_completo():
@@ -103,4 +107,46 @@ def test_find_unit_by_id_nao_encontrado():
     unidades = [{"id": 1}, {"id": 2}]
     with pytest.raises(HTTPException) as exc:
         find_unit_by_id(unidades, 3)
-    assert exc.value.status_code == 404
\ No newline at end of file
+    assert exc.value.status_code == 404
+
+
+def test_find_unit_by_id_snapshot():
+    snapshot = Snapshot([{"id": 1, "unidade": "A"}, {"id": 2, "unidade": "B"}])
+    assert find_unit_by_id(snapshot, 2)["unidade"] == "B"
+    with pytest.raises(HTTPException) as exc:
+        find_unit_by_id(snapshot, 3)
+    assert exc.value.status_code == 404
+
+
+# --------- validate_snapshot ---------
+def _unidade_valida(unit_id):
+    return {
+        "id": unit_id,
+        "unidade": f"Vara {unit_id}",
+        "acervo_total": "10",
+        "processos_em_tramitacao": {"TOTAL": {"Total": "1", "+60 dias": "0", "+100 dias": "0"}},
+    }
+
+
+def test_validate_snapshot_preenche_cache_uma_vez():
+    snapshot = Snapshot([_unidade_valida(1), _unidade_valida(2)])
+    validate_snapshot(snapshot)
+
+    assert snapshot.validated is True
+    lista = json.loads(snapshot.response_cache["unidades"])
+    assert [u["id"] for u in lista] == [1, 2]
+    assert json.loads(snapshot.response_cache[("unidade", 2)]) == lista[1]
+
+    snapshot.response_cache.clear()
+    validate_snapshot(snapshot)
+    assert snapshot.response_cache == {}
+
+
+def test_validate_snapshot_registra_unidade_invalida():
+    invalida = {"id": 3, "unidade": "Vara 3"}  # sem acervo_total nem processos
+    snapshot = Snapshot([_unidade_valida(1), invalida])
+    validate_snapshot(snapshot)
+
+    assert isinstance(snapshot.response_cache[("unidade", 3)], CachedError)
+    assert snapshot.response_cache["unidades"].status_code == 500
+    assert isinstance(snapshot.response_cache[("unidade", 1)], bytes)
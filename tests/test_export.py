@@ -0,0 +1,71 @@
+import csv
+
+import pyarrow.parquet as pq
+
+from app.services.export import COLUMNS, export_snapshot, iter_rows, write_csv
+from app.services.snapshot import Snapshot
+
+UNIDADES = [
+    {
+        "id": 1,
+        "unidade": "ACARI - VARA ÚNICA",
+        "acervo_total": "1.825",
+        "processos_em_tramitacao": {
+            "CONHECIMENTO": {
+                "Total": "859",
+                "+60 dias": "49",
+                "Não julgados": {"Total": "615"},
+            }
+        },
+        "controle_de_prisoes": {"Preventiva": "2"},
+        "processos_baixados": {"Baixados": {"mensal": {"Set / 2024": "70"}, "total": "70"}},
+    },
+    {"id": 1, "unidade": "DUPLICADA", "acervo_total": "1"},
+]
+
+
+def test_iter_rows_formato_longo():
+    rows = [dict(zip(COLUMNS, row)) for row in iter_rows(UNIDADES)]
+    assert [r["unidade"] for r in rows] == ["ACARI - VARA ÚNICA"] * 7
+    assert rows[0] == {
+        "unidade_id": 1, "unidade": "ACARI - VARA ÚNICA", "secao": "acervo_total", "categoria": None,
+        "subcategoria": None, "faixa": "Total", "competencia": None, "valor": 1825, "valor_texto": "1.825",
+    }
+    assert ("CONHECIMENTO", "Não julgados", "Total", 615) in [
+        (r["categoria"], r["subcategoria"], r["faixa"], r["valor"]) for r in rows
+    ]
+    assert ("controle_de_prisoes", "Preventiva", "Total", 2) in [
+        (r["secao"], r["categoria"], r["faixa"], r["valor"]) for r in rows
+    ]
+    mensal = [r for r in rows if r["competencia"]]
+    assert [(r["faixa"], r["competencia"], r["valor"]) for r in mensal] == [("Set / 2024", "2024-09", 70)]
+
+
+def test_write_csv(tmp_path):
+    path = tmp_path / "dados.csv"
+    write_csv(path, UNIDADES)
+    with open(path, newline="", encoding="utf-8") as f:
+        linhas = list(csv.reader(f))
+    assert linhas[0] == list(COLUMNS)
+    assert linhas[1] == ["1", "ACARI - VARA ÚNICA", "acervo_total", "", "", "Total", "", "1825", "1.825"]
+    assert len(linhas) == 8
+
+
+def test_export_snapshot_gera_uma_vez_por_versao(tmp_path):
+    snapshot = Snapshot(UNIDADES, version=3)
+    path = export_snapshot(snapshot, "csv", tmp_path)
+    assert path.name.startswith("dados_tjrn-000003-")
+    mtime = path.stat().st_mtime_ns
+    assert export_snapshot(Snapshot(UNIDADES, version=3), "csv", tmp_path) == path
+    assert path.stat().st_mtime_ns == mtime
+
+    novo = export_snapshot(Snapshot(UNIDADES[:1], version=4), "csv", tmp_path)
+    assert novo != path
+    assert [p.name for p in tmp_path.iterdir()] == [novo.name]
+
+
+def test_export_parquet(tmp_path):
+    path = export_snapshot(Snapshot(UNIDADES), "parquet", tmp_path)
+    tabela = pq.read_table(path)
+    assert tabela.column_names == list(COLUMNS)
+    assert tabela.num_rows == 7
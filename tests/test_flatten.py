@@ -0,0 +1,27 @@
+from app.services.flatten import FlatValue, iter_unit_values
+
+UNIDADE = {
+    "id": 1,
+    "unidade": "ACARI - VARA ÚNICA",
+    "acervo_total": "1.825",
+    "processos_em_tramitacao": {
+        "CONHECIMENTO": {"Total": "10", "Não julgados": {"Total": "8"}},
+    },
+    "controle_de_prisoes": {"Preventiva": "2"},
+    "processos_baixados": {"Baixados": {"mensal": {"Set / 2024": "1"}, "total": "1"}},
+}
+
+
+def test_iter_unit_values_percorre_secoes_categorias_e_meses():
+    assert list(iter_unit_values(UNIDADE)) == [
+        FlatValue(("processos_em_tramitacao", "CONHECIMENTO", "Total"),
+                  "processos_em_tramitacao", ("CONHECIMENTO",), "Total", None, "10"),
+        FlatValue(("processos_em_tramitacao", "CONHECIMENTO", "Não julgados", "Total"),
+                  "processos_em_tramitacao", ("CONHECIMENTO", "Não julgados"), "Total", None, "8"),
+        FlatValue(("controle_de_prisoes", "Preventiva"),
+                  "controle_de_prisoes", ("Preventiva",), "Total", None, "2"),
+        FlatValue(("processos_baixados", "Baixados", "mensal", "Set / 2024"),
+                  "processos_baixados", ("Baixados",), "Set / 2024", "Set / 2024", "1"),
+        FlatValue(("processos_baixados", "Baixados", "total"),
+                  "processos_baixados", ("Baixados",), "total", None, "1"),
+    ]
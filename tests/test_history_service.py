@@ -0,0 +1,109 @@
+import copy
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from app.models.historico import HistoricoColeta, HistoricoValor
+from app.services.history_service import compact_history, flatten_unit, list_runs, record_run, unit_history
+
+UNIDADE = {
+    "id": 1,
+    "unidade": "ACARI - VARA ÚNICA",
+    "acervo_total": "1.825",
+    "processos_em_tramitacao": {"TOTAL": {"Total": "1.491", "+60 dias": "97", "+100 dias": "5"}},
+    "processos_baixados": {"Baixados": {"mensal": {"Set / 2024": "80"}, "total": "80"}},
+}
+
+
+@pytest.fixture
+def engine():
+    return create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+def _alterada(**valores):
+    unit = copy.deepcopy(UNIDADE)
+    unit["processos_em_tramitacao"]["TOTAL"].update(valores)
+    return unit
+
+
+def test_flatten_unit_gera_caminhos():
+    flat = flatten_unit(UNIDADE)
+    assert flat["processos_em_tramitacao.TOTAL.+100 dias"] == "5"
+    assert flat["processos_baixados.Baixados.mensal.Set / 2024"] == "80"
+    assert "id" not in flat
+
+
+def test_record_run_grava_apenas_valores_alterados(engine):
+    inicio = datetime(2025, 1, 1)
+    record_run([UNIDADE], coletado_em=inicio, engine=engine)
+    record_run([UNIDADE], coletado_em=inicio + timedelta(days=1), engine=engine)
+    record_run([_alterada(**{"+100 dias": "7"})], coletado_em=inicio + timedelta(days=2), engine=engine)
+
+    with Session(engine) as session:
+        linhas = session.exec(select(HistoricoValor).order_by(HistoricoValor.coleta_id)).all()
+        coletas = list_runs(session)
+
+    assert len(coletas) == 3
+    por_coleta = {}
+    for linha in linhas:
+        por_coleta.setdefault(linha.coleta_id, []).append(linha)
+    assert coletas[1]["id"] not in por_coleta  # coleta idêntica não gera linhas
+    assert [(l.texto, l.valor) for l in por_coleta[coletas[2]["id"]]] == [("7", 7)]
+
+
+def test_unit_history_reconstroi_valores(engine):
+    inicio = datetime(2025, 1, 1)
+    record_run([UNIDADE], coletado_em=inicio, engine=engine)
+    record_run([_alterada(**{"+100 dias": "7"})], coletado_em=inicio + timedelta(days=1), engine=engine)
+    # Unidade ausente na coleta não é tratada como removida
+    record_run([], coletado_em=inicio + timedelta(days=2), engine=engine)
+
+    with Session(engine) as session:
+        serie = unit_history(session, 1, "processos_em_tramitacao.TOTAL")
+
+    assert len(serie) == 3
+    assert [p["valores"]["processos_em_tramitacao.TOTAL.+100 dias"]["valor"] for p in serie] == [5, 7, 7]
+    assert set(serie[0]["valores"]) == {
+        "processos_em_tramitacao.TOTAL.Total",
+        "processos_em_tramitacao.TOTAL.+60 dias",
+        "processos_em_tramitacao.TOTAL.+100 dias",
+    }
+
+
+def test_record_run_registra_caminho_removido(engine):
+    inicio = datetime(2025, 1, 1)
+    record_run([UNIDADE], coletado_em=inicio, engine=engine)
+    sem_baixados = {k: v for k, v in UNIDADE.items() if k != "processos_baixados"}
+    record_run([sem_baixados], coletado_em=inicio + timedelta(days=1), engine=engine)
+
+    with Session(engine) as session:
+        serie = unit_history(session, 1, "processos_baixados")
+
+    assert "processos_baixados.Baixados.total" in serie[0]["valores"]
+    assert serie[1]["valores"] == {}
+
+
+def test_compact_history_mantem_ultima_coleta_do_mes(engine):
+    inicio = datetime(2024, 1, 1)
+    for dia in range(40):
+        unit = _alterada(**{"+100 dias": str(dia)}) if dia % 2 else UNIDADE
+        record_run([unit], coletado_em=inicio + timedelta(days=dia), engine=engine, retencao_dias=None)
+
+    with Session(engine) as session:
+        antes = {p["coletado_em"]: p["valores"] for p in unit_history(session, 1)}
+
+    removidas = compact_history(engine, retencao_dias=30, agora=inicio + timedelta(days=60))
+
+    with Session(engine) as session:
+        coletas = session.exec(select(HistoricoColeta).order_by(HistoricoColeta.id)).all()
+        depois = {p["coletado_em"]: p["valores"] for p in unit_history(session, 1)}
+
+    # Janeiro fica reduzido à última coleta do mês; fevereiro ainda está na janela
+    datas = [c.coletado_em for c in coletas]
+    assert removidas == 30
+    assert datas[0] == datetime(2024, 1, 31)
+    assert len(datas) == 10
+    for coletado_em, valores in depois.items():
+        assert valores == antes[coletado_em]
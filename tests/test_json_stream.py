@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from app.services.json_stream import iter_json_array
+
+UNIDADES = [
+    {"id": 1, "unidade": "ACARI - VARA ÚNICA", "acervo_total": "1.825"},
+    {"id": 2, "unidade": "ALEXANDRIA - VARA ÚNICA", "processos": {"Total": "12", "lista": [1, 2]}},
+    12345,
+    "texto, com vírgula ]",
+]
+
+
+def escrever(tmp_path, conteudo):
+    path = tmp_path / "dados.json"
+    path.write_text(conteudo, encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64 * 1024])
+def test_iter_json_array_blocos_pequenos(tmp_path, chunk_size):
+    path = escrever(tmp_path, json.dumps(UNIDADES, ensure_ascii=False, indent=2))
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == UNIDADES
+
+
+def test_iter_json_array_vazio(tmp_path):
+    path = escrever(tmp_path, "  [ ] ")
+    assert list(iter_json_array(path)) == []
+
+
+def test_iter_json_array_nao_e_array(tmp_path):
+    path = escrever(tmp_path, '{"id": 1}')
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(path))
+
+
+def test_iter_json_array_truncado(tmp_path):
+    path = escrever(tmp_path, '[{"id": 1}, {"id": 2')
+    itens = iter_json_array(path, chunk_size=4)
+    assert next(itens) == {"id": 1}
+    with pytest.raises(json.JSONDecodeError):
+        next(itens)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5])
+def test_iter_json_array_numeros_divididos_entre_blocos(tmp_path, chunk_size):
+    path = escrever(tmp_path, "[12.75, 3, 1e5, -2.5E-3, 100]")
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == [12.75, 3, 1e5, -2.5e-3, 100]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 64 * 1024])
+def test_iter_json_array_conteudo_apos_fim(tmp_path, chunk_size):
+    path = escrever(tmp_path, '[{"id": 1}] lixo')
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(path, chunk_size=chunk_size))
+    path = escrever(tmp_path, "[] []")
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(path, chunk_size=chunk_size))
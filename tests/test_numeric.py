@@ -0,0 +1,19 @@
+from app.services.numeric import parse_br_int
+
+
+def test_parse_br_int_milhar():
+    assert parse_br_int("1.825") == 1825
+    assert parse_br_int(" 859 ") == 859
+    assert parse_br_int("-1.234") == -1234
+
+
+def test_parse_br_int_valores_invalidos():
+    assert parse_br_int("N/A") is None
+    assert parse_br_int("") is None
+    assert parse_br_int(None) is None
+    assert parse_br_int(True) is None
+
+
+def test_parse_br_int_inteiro_mantido():
+    assert parse_br_int(42) == 42
+
@@ -0,0 +1,187 @@
+import gzip
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.responses import (
+    COMPRESSORS,
+    FragmentStore,
+    cached_json_response,
+    compressed_variant,
+    encode_json,
+    encode_projection,
+    join_object,
+    materialized_items,
+    negotiate_encoding,
+    parse_fields,
+    precompress,
+)
+from app.services.snapshot import Snapshot
+
+
+def test_encode_json_compacto_e_utf8():
+    assert encode_json({"unidade": "ACARI - VARA ÚNICA", "id": 1}) == (
+        '{"unidade":"ACARI - VARA ÚNICA","id":1}'.encode("utf-8")
+    )
+
+
+def test_cached_json_response_constroi_uma_vez():
+    snapshot = Snapshot([])
+    chamadas = []
+
+    def build():
+        chamadas.append(1)
+        return [{"id": 1}]
+
+    primeira = cached_json_response(snapshot, "chave", build)
+    segunda = cached_json_response(snapshot, "chave", build)
+
+    assert chamadas == [1]
+    assert primeira.body == segunda.body
+    assert json.loads(segunda.body) == [{"id": 1}]
+    assert segunda.media_type == "application/json"
+
+
+def test_cached_json_response_memoriza_erro():
+    snapshot = Snapshot([])
+    chamadas = []
+
+    def build():
+        chamadas.append(1)
+        raise HTTPException(404, "Nenhum dado")
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc:
+            cached_json_response(snapshot, "vazio", build)
+        assert exc.value.status_code == 404
+    assert chamadas == [1]
+
+
+def test_novo_snapshot_descarta_cache():
+    cached_json_response(Snapshot([]), "chave", lambda: [1])
+    assert Snapshot([]).response_cache == {}
+
+
+def test_parse_fields_monta_arvore_com_id():
+    tree = parse_fields(
+        "acervo_total, processos_em_tramitacao.TOTAL,processos_em_tramitacao.CONHECIMENTO.Total",
+        ["acervo_total", "processos_em_tramitacao"],
+    )
+    assert tree == {
+        "id": None,
+        "acervo_total": None,
+        "processos_em_tramitacao": {"TOTAL": None, "CONHECIMENTO": {"Total": None}},
+    }
+
+
+def test_parse_fields_prefixo_seleciona_valor_inteiro():
+    tree = parse_fields("processos_em_tramitacao,processos_em_tramitacao.TOTAL", ["processos_em_tramitacao"])
+    assert tree == {"id": None, "processos_em_tramitacao": None}
+
+
+def test_parse_fields_campo_desconhecido():
+    with pytest.raises(HTTPException) as exc:
+        parse_fields("inexistente", ["acervo_total"])
+    assert exc.value.status_code == 400
+
+
+def test_encode_projection_omite_caminhos_ausentes():
+    document = {"id": 1, "secao": {"A": {"Total": "1"}}}
+    tree = {"id": None, "secao": {"A": None, "B": None}}
+
+    def fragment(path):
+        value = document
+        for key in path:
+            if key not in value:
+                return None
+            value = value[key]
+        return encode_json(value)
+
+    body = encode_projection(tree, fragment)
+    assert json.loads(body) == {"id": 1, "secao": {"A": {"Total": "1"}}}
+
+
+def test_negotiate_encoding_respeita_pesos():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("*") == next(iter(COMPRESSORS))
+    assert negotiate_encoding("") is None
+
+
+def test_compressed_variant_memorizada_no_snapshot():
+    snapshot = Snapshot([])
+    body = encode_json([{"unidade": "ACARI - VARA ÚNICA", "Total": "1"}] * 100)
+
+    variante = compressed_variant(snapshot, "chave", body, "gzip")
+
+    assert gzip.decompress(variante) == body
+    assert compressed_variant(snapshot, "chave", b"outro", "gzip") is variante
+
+
+def test_compressed_variant_ignora_compressao_inutil():
+    snapshot = Snapshot([])
+    assert compressed_variant(snapshot, "curto", b"[]", "gzip") is None
+
+
+def test_precompress_gera_variantes_antecipadamente():
+    snapshot = Snapshot([])
+    body = encode_json([{"unidade": "ACARI - VARA ÚNICA", "Total": "1"}] * 100)
+    snapshot.response_cache["unidades"] = body
+
+    precompress(snapshot, "unidades")
+
+    for encoding in COMPRESSORS:
+        assert ("comprimido", encoding, "unidades") in snapshot.response_cache
+    assert gzip.decompress(snapshot.response_cache[("comprimido", "gzip", "unidades")]) == body
+
+
+def test_join_object_monta_objeto_com_fragmentos():
+    corpo = join_object([("id", b"1"), ("processos", b'{"Total":"2"}')])
+    assert json.loads(corpo) == {"id": 1, "processos": {"Total": "2"}}
+
+
+def test_fragment_store_reconstroi_apenas_o_que_mudou():
+    store = FragmentStore()
+    chamadas = []
+
+    def build(row):
+        chamadas.append(row)
+        return f"f{row}".encode()
+
+    assert store.refresh("visao", [b"a", b"b", b"c"], build) == [b"f0", b"f1", b"f2"]
+    assert chamadas == [0, 1, 2]
+
+    chamadas.clear()
+    # "b" mudou para "x"; "c" trocou de posição
+    assert store.refresh("visao", [b"c", b"a", b"x"], build) == [b"f2", b"f0", b"f2"]
+    assert chamadas == [2]
+    assert set(store.views["visao"]) == {b"a", b"c", b"x"}
+
+
+def test_materialized_items_reaproveita_itens_entre_snapshots():
+    chamadas = []
+
+    def item(unit):
+        chamadas.append(unit["id"])
+        if unit.get("secao") is None:
+            return None
+        return {"id": unit["id"], "secao": unit["secao"]}
+
+    antigo = Snapshot([{"id": 1, "secao": {"a": "1"}}, {"id": 2, "secao": {"a": "2"}}, {"id": 3}])
+    assert [i for i, _ in materialized_items(antigo, "teste_materializado", "secao", item)] == [1, 2]
+    assert sorted(chamadas) == [1, 2, 3]
+
+    chamadas.clear()
+    novo = Snapshot([{"id": 1, "secao": {"a": "1"}, "outro": "x"}, {"id": 2, "secao": {"a": "5"}}, {"id": 3}])
+    items = materialized_items(novo, "teste_materializado", "secao", item)
+    assert chamadas == [2]
+    assert [json.loads(body) for _, body in items] == [{"id": 1, "secao": {"a": "1"}}, {"id": 2, "secao": {"a": "5"}}]
+
+
+def test_materialized_items_vazio():
+    snapshot = Snapshot([{"id": 1}])
+    with pytest.raises(HTTPException) as exc:
+        materialized_items(snapshot, "teste_vazio", "secao", lambda unit: None, "Nenhum dado")
+    assert exc.value.status_code == 404
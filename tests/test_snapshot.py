@@ -0,0 +1,80 @@
+from app.services.snapshot import Snapshot, normalize_name
+
+
+def unidades():
+    return [
+        {"id": 1, "unidade": "ACARI - VARA ÚNICA"},
+        {"id": 2, "unidade": "MOSSORÓ - 1ª VARA DE FAMÍLIA"},
+        {"id": 2, "unidade": "Duplicada"},
+    ]
+
+
+def test_normalize_name():
+    assert normalize_name("  Mossoró -  1ª Vara de Família ") == "MOSSORO - 1A VARA DE FAMILIA"
+
+
+def test_get_unit_por_id():
+    snapshot = Snapshot(unidades())
+    assert snapshot.get_unit(1)["unidade"] == "ACARI - VARA ÚNICA"
+    assert snapshot.get_unit(99) is None
+
+
+def test_get_unit_id_repetido_mantem_primeira_ocorrencia():
+    snapshot = Snapshot(unidades())
+    assert snapshot.get_unit(2)["unidade"] == "MOSSORÓ - 1ª VARA DE FAMÍLIA"
+
+
+def test_get_unit_by_name_ignora_acentos_e_caixa():
+    snapshot = Snapshot(unidades())
+    assert snapshot.get_unit_by_name("acari - vara unica")["id"] == 1
+    assert snapshot.get_unit_by_name("inexistente") is None
+
+
+def test_numeric_units_mantem_strings_originais():
+    snapshot = Snapshot([{"id": 1, "unidade": "A", "acervo_total": "1.825"}])
+    assert snapshot.get_numeric_unit(1)["acervo_total"] == 1825
+    assert snapshot.get_unit(1)["acervo_total"] == "1.825"
+
+
+def test_snapshot_indice_de_comarcas():
+    snapshot = Snapshot([
+        {"id": 1, "unidade": "MOSSORÓ - 1ª VARA CÍVEL", "acervo_total": "10"},
+        {"id": 2, "unidade": "NATAL - 1ª VARA CÍVEL", "acervo_total": "5"},
+        {"id": 3, "unidade": "Mossoró - 2ª Vara Cível", "acervo_total": "7"},
+    ])
+    assert snapshot.comarcas == {"MOSSORO": "MOSSORÓ", "NATAL": "NATAL"}
+    assert [u["id"] for u in snapshot.get_comarca_units("mossoró")] == [1, 3]
+    assert snapshot.get_comarca_rollup("MOSSORO") == {"acervo_total": 17}
+    assert snapshot.get_comarca_units("RECIFE") is None
+
+
+def test_search_aproximada_por_nome():
+    snapshot = Snapshot([
+        {"id": 1, "unidade": "NATAL - 1º JUIZADO ESPECIAL CÍVEL"},
+        {"id": 2, "unidade": "NATAL - 10º JUIZADO ESPECIAL CÍVEL"},
+        {"id": 3, "unidade": "NATAL - 1ª VARA CÍVEL"},
+    ])
+    resultados = snapshot.search("natal 10 jec")
+    assert resultados[0][0]["id"] == 2
+    assert resultados[0][1] == 1.0
+    assert [unit["id"] for unit, _ in snapshot.search("natal jec")] == [1, 2]
+    assert snapshot.search("!!!") == []
+
+
+def test_unit_digests_por_secao():
+    antigo = Snapshot([{"id": 1, "unidade": "A", "s": {"x": "1"}, "t": "1"}, {"id": 2, "unidade": "B", "s": {"x": "2"}}])
+    novo = Snapshot([{"id": 1, "unidade": "A", "s": {"x": "1"}, "t": "9"}, {"id": 2, "unidade": "B", "s": {"x": "3"}}])
+    assert antigo.unit_digests("s")[0] == novo.unit_digests("s")[0]
+    assert antigo.unit_digests("s")[1] != novo.unit_digests("s")[1]
+    assert antigo.unit_digests()[0] != novo.unit_digests()[0]
+
+
+def test_digest_depende_apenas_do_conteudo():
+    # Mesmo conteúdo, com e sem strings compartilhadas entre os campos
+    valor = "".join(["1", "2"])
+    compartilhado = Snapshot([{"id": 1, "unidade": "A", "secao": {"Total": valor, "+60 dias": valor}}])
+    separado = Snapshot([{"id": 1, "unidade": "A", "secao": {"Total": "12", "+60 dias": "".join(["1", "2"])}}])
+
+    assert compartilhado.digest() == separado.digest()
+    assert compartilhado.digest("secao", 1) == separado.digest("secao", 1)
+    assert compartilhado.unit_digests() == separado.unit_digests()